@@ -1,11 +1,23 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, orders, products, categories, users, carts
+from app.core.config import settings
+from app.api.endpoints import auth, orders, products, categories, users, carts, sellers, exports
 
 api_router = APIRouter()
 
+if settings.ASYNC_DB_ENABLED:
+    # Các API nóng chạy bằng AsyncSession: include TRƯỚC router sync để được khớp trước.
+    # Ẩn khỏi OpenAPI vì đường dẫn và schema giống hệt bản sync.
+    from app.api.endpoints import auth_async, products_async, categories_async, carts_async
+    api_router.include_router(auth_async.router, prefix="/auth", tags=["Auth"], include_in_schema=False)
+    api_router.include_router(products_async.router, prefix="/products", tags=["Products"], include_in_schema=False)
+    api_router.include_router(categories_async.router, prefix="/categories", tags=["Categories"], include_in_schema=False)
+    api_router.include_router(carts_async.router, prefix="/carts", tags=["carts"], include_in_schema=False)
+
 api_router.include_router(auth.router, prefix="/auth", tags=["Auth"])
 api_router.include_router(products.router, prefix="/products", tags=["Products"])
 api_router.include_router(categories.router, prefix="/categories", tags=["Categories"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(carts.router, prefix="/carts", tags=["carts"])
-api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
\ No newline at end of file
+api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
+api_router.include_router(sellers.router, prefix="/sellers", tags=["sellers"])
+api_router.include_router(exports.router, prefix="/admin/export", tags=["admin export"])
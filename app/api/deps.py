@@ -1,7 +1,7 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from jose import jwt
 
 from app.core.database import get_db
 from app.core.config import settings
@@ -14,16 +14,15 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Security(reusable_oauth2),
-) -> User:
+def get_token_user_id(token: str) -> int:
+    """Giải mã JWT và trả về UserID (dùng chung cho dependency sync và async)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Không thể xác thực thông tin đăng nhập.",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    from jose import jwt # Import khi xác thực lần đầu, không làm chậm khởi động
     try:
         payload = jwt.decode(
             token, 
@@ -36,17 +35,28 @@ def get_current_user(
         
     if token_data.sub is None:
         raise credentials_exception
-        
-    user = user_crud.get_by_id(db, user_id=int(token_data.sub))
-    
+    return int(token_data.sub)
+
+def ensure_active_user(user: Optional[User]) -> User:
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Không thể xác thực thông tin đăng nhập.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
         
     if user.IsDeleted or not user.IsActive:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Người dùng không hoạt động.")
         
     return user
 
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Security(reusable_oauth2),
+) -> User:
+    user = user_crud.get_by_id(db, user_id=get_token_user_id(token))
+    return ensure_active_user(user)
+
 def get_current_active_admin_or_moderator(current_user: User = Depends(get_current_user)) -> User:
     user_role_ids = {user_role.RoleID for user_role in current_user.user_roles}
     
@@ -60,6 +70,15 @@ def get_current_active_admin_or_moderator(current_user: User = Depends(get_curre
         detail="Không có quyền truy cập. Yêu cầu quyền Admin hoặc Moderator."
     )
 
+def get_current_active_admin(current_user: User = Depends(get_current_user)) -> User:
+    if any(user_role.RoleID == RoleID.ADMIN for user_role in current_user.user_roles):
+        return current_user
+        
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Không có quyền truy cập. Yêu cầu quyền Admin."
+    )
+
 def get_current_active_customer(current_user: User = Depends(get_current_user)) -> User:
     user_role_ids = {user_role.RoleID for user_role in current_user.user_roles}
     
@@ -0,0 +1,15 @@
+from fastapi import Depends, Security
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import reusable_oauth2, get_token_user_id, ensure_active_user
+from app.core.database_async import get_async_db
+from app.crud.crud_user_async import async_user_crud
+from app.models.sqlmodels import User
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Security(reusable_oauth2),
+) -> User:
+    """Giống deps.get_current_user nhưng đọc người dùng qua AsyncSession."""
+    user = await async_user_crud.get_by_id(db, user_id=get_token_user_id(token))
+    return ensure_active_user(user)
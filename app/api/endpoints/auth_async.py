@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database_async import get_async_db
+from app.core import security
+from app.models import schemas
+from app.crud.crud_user_async import async_user_crud
+
+# Bản async của auth.py (chỉ được include khi bật ASYNC_DB_ENABLED).
+# bcrypt chạy trong threadpool (xem crud_user_async), event loop không bị chặn khi đăng nhập.
+router = APIRouter(
+    tags=["Authentication"]
+)
+
+@router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
+async def register_user(
+    user_in: schemas.UserCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    user = await async_user_crud.get_by_email(db, email=user_in.Email)
+    if user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email đã được đăng ký. Vui lòng sử dụng email khác."
+        )
+    return await async_user_crud.create(db, obj_in=user_in)
+
+@router.post("/token", response_model=schemas.Token)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    user = await async_user_crud.authenticate(db, email=form_data.username, password=form_data.password)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Sai email hoặc mật khẩu.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    elif not user.IsActive:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Tài khoản của bạn đã bị vô hiệu hóa. Vui lòng liên hệ quản trị viên.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    access_token = security.create_access_token(subject=user.UserID)
+    user_roles = [ur.role.RoleName for ur in user.user_roles if ur.role and not ur.role.IsDeleted]
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "roles": user_roles
+    }
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any
+
+from app.api.deps_async import get_current_user_async
+from app.core.database_async import get_async_db
+from app.models import schemas, sqlmodels
+from app.crud.crud_cart_async import async_cart_crud
+
+# Bản async của carts.py (chỉ được include khi bật ASYNC_DB_ENABLED)
+router = APIRouter()
+
+@router.get("/", response_model=schemas.ShoppingCartOut)
+async def get_cart(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: sqlmodels.User = Depends(get_current_user_async)
+) -> Any:
+    return await async_cart_crud.get_user_cart(db, user_id=current_user.UserID)
+
+@router.post("/add", response_model=schemas.ShoppingCartOut)
+async def add_to_cart(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    item_in: schemas.CartItemCreate,
+    current_user: sqlmodels.User = Depends(get_current_user_async)
+) -> Any:
+    try:
+        return await async_cart_crud.add_or_update_item(db, user_id=current_user.UserID, item_in=item_in)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.delete("/remove/{product_id}", response_model=schemas.ShoppingCartOut)
+async def remove_from_cart(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    product_id: int,
+    current_user: sqlmodels.User = Depends(get_current_user_async)
+) -> Any:
+    return await async_cart_crud.remove_item(db, user_id=current_user.UserID, product_id=product_id)
+
+@router.delete("/clear", response_model=schemas.ShoppingCartOut)
+async def clear_cart(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: sqlmodels.User = Depends(get_current_user_async)
+) -> Any:
+    return await async_cart_crud.clear_cart(db, user_id=current_user.UserID)
+
+@router.put("/update", response_model=schemas.ShoppingCartOut)
+async def update_cart_item(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    item_in: schemas.CartItemUpdate,
+    current_user: sqlmodels.User = Depends(get_current_user_async)
+) -> Any:
+    try:
+        return await async_cart_crud.update_item_quantity(
+            db,
+            user_id=current_user.UserID,
+            product_id=item_in.ProductID,
+            new_qty=item_in.new_quantity
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Any
 from app.api import deps
+from app.core.database import get_read_db
 from app.models import schemas
 from app.models.sqlmodels import User
 from app.crud.crud_category import category_crud
@@ -11,7 +12,7 @@ router = APIRouter()
 
 # --- PUBLIC: Lấy danh sách category (SỬA DỤNG CRUD LAYER) ---
 @router.get("/", response_model=List[schemas.Category])
-def get_categories(db: Session = Depends(deps.get_db)) -> Any:
+def get_categories(db: Session = Depends(get_read_db)) -> Any:
     """Lấy danh sách tất cả các Category chưa bị xóa."""
     # SỬA: Sử dụng category_crud.get_all để lấy tất cả category chưa bị xóa.
     return category_crud.get_all(db)
@@ -28,7 +29,7 @@ def get_categories(db: Session = Depends(deps.get_db)) -> Any:
 @router.get("/{category_id}", response_model=schemas.Category)
 def read_category(
     category_id: int, 
-    db: Session = Depends(deps.get_db)
+    db: Session = Depends(get_read_db)
 ):
     category = category_crud.get_by_id(db, category_id=category_id)
     if not category:
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Any
+from app.core.database_async import get_async_db
+from app.models import schemas
+from app.crud.crud_category_async import async_category_crud
+
+# Bản async của các API đọc danh mục (chỉ được include khi bật ASYNC_DB_ENABLED)
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.Category])
+async def get_categories(db: AsyncSession = Depends(get_async_db)) -> Any:
+    return await async_category_crud.get_all(db)
+
+@router.get("/{category_id:int}", response_model=schemas.Category)
+async def read_category(
+    category_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    category = await async_category_crud.get_by_id(db, category_id=category_id)
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Danh mục không tồn tại."
+        )
+    return category
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.api import deps
+from app.core.database import ReplicaSessionLocal
+from app.models.sqlmodels import User
+from app.services.export_service import EXPORT_DATASETS, EXPORT_FORMATS, MEDIA_TYPES, stream_export
+
+router = APIRouter()
+
+# --- Admin: Xuất toàn bộ users / products / orders dạng CSV hoặc NDJSON (stream, không phân trang) ---
+# Ví dụ: GET /api/v1/admin/export/orders.ndjson, GET /api/v1/admin/export/users.csv
+@router.get("/{dataset}.{fmt}")
+def export_dataset(
+    dataset: str,
+    fmt: str,
+    current_user: User = Depends(deps.get_current_active_admin)
+):
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Không có dữ liệu '{dataset}'. Chọn một trong: {', '.join(EXPORT_DATASETS)}."
+        )
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Định dạng phải là một trong: {', '.join(EXPORT_FORMATS)}."
+        )
+    # Đọc từ replica (nếu có): export là truy vấn đọc lớn, không nên chiếm primary
+    return StreamingResponse(
+        stream_export(ReplicaSessionLocal, dataset, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'}
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services.warmup import readiness, check_database
+
+router = APIRouter()
+
+# --- LIVENESS: process còn chạy và event loop còn phản hồi (không đụng DB, không qua threadpool) ---
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+# --- READINESS: load balancer chỉ chuyển request tới worker đã warm-up xong và kết nối được DB ---
+@router.get("/ready")
+def ready():
+    steps = [
+        {"name": step.name, "ok": step.ok, "elapsed_ms": round(step.elapsed_ms, 1), "error": step.error}
+        for step in readiness.steps
+    ]
+    if not readiness.is_ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "steps": steps})
+    try:
+        check_database()
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "database_unavailable", "detail": str(e)})
+    return {"status": "ready", "warmup_ms": round(readiness.elapsed_ms or 0, 1), "steps": steps}
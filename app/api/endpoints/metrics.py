@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.metrics import metrics_available, render_latest
+
+router = APIRouter()
+
+# --- METRICS PROMETHEUS (chỉ mở cho mạng nội bộ / Prometheus scraper) ---
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not metrics_available():
+        return JSONResponse(status_code=503, content={"detail": "Metrics chưa bật (cần cài prometheus_client và METRICS_ENABLED=true)."})
+    # Gộp file của nhiều worker là I/O đĩa: chạy trong threadpool
+    body, content_type = await run_in_threadpool(render_latest)
+    return Response(content=body, media_type=content_type)
@@ -1,15 +1,73 @@
+import logging
+import time
 from app.core.config import settings
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.api import deps
 from app.models import schemas
 from app.crud.crud_order import order_crud
 from app.crud.crud_cart import cart_crud
+from app.services.ranking_service import product_ranking
 from app.core.database import get_db
-import requests
-from requests.auth import HTTPBasicAuth
+from app.core.metrics import CHECKOUTS, PAYPAL_LATENCY
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Giới hạn số bản ghi tối đa cho mỗi trang lịch sử
+MAX_HISTORY_PAGE_SIZE = 100
+
+# --- Lịch sử mua hàng của người dùng hiện tại ---
+@router.get("/me", response_model=schemas.OrderHistoryPage)
+def read_my_orders(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Lấy lịch sử đơn hàng (mới nhất trước). Dùng next_cursor để lấy trang tiếp theo."""
+    limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+    try:
+        orders, next_cursor = order_crud.get_history_by_buyer(
+            db, buyer_id=current_user.UserID, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": orders, "next_cursor": next_cursor}
+
+# --- Lịch sử bán hàng của Seller hiện tại ---
+@router.get("/sales", response_model=schemas.SellerSalesPage)
+def read_my_sales(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Lấy các dòng OrderDetail mà người dùng hiện tại là người bán (đơn mới nhất trước)."""
+    limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+    try:
+        details, next_cursor = order_crud.get_sales_by_seller(
+            db, seller_id=current_user.UserID, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items = [
+        schemas.SellerSaleLine(
+            OrderDetailID=d.OrderDetailID,
+            OrderID=d.OrderID,
+            ProductID=d.ProductID,
+            SellerID=d.SellerID,
+            Price=d.Price,
+            Quantity=d.Quantity,
+            OrderDate=d.order.OrderDate,
+            OrderStatus=d.order.OrderStatus,
+            ProductTitle=d.product.Title if d.product else None
+        )
+        for d in details
+    ]
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.post("/", response_model=schemas.Order)
 def create_order(
@@ -26,26 +84,61 @@ def create_order(
             payment_method_id=obj_in.PaymentMethodID,
             items_in=obj_in.items
         )
-        # Xóa giỏ hàng
-        cart_crud.clear_cart(db, user_id=current_user.UserID)
+        # Giỏ hàng được xóa ở nền (xem app/services/order_services.py)
+        for item in obj_in.items:
+            product_ranking.note_sale(item.ProductID, item.Quantity)
+        CHECKOUTS.labels(str(obj_in.PaymentMethodID), "success").inc()
         return order
     except ValueError as e:
+        CHECKOUTS.labels(str(obj_in.PaymentMethodID), "rejected").inc() # Hết hàng, sản phẩm không hợp lệ...
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
+    except Exception:
         db.rollback() # Trả lại trạng thái cũ nếu crash
-        print(f"CRITICAL CHECKOUT ERROR: {e}")
+        CHECKOUTS.labels(str(obj_in.PaymentMethodID), "error").inc()
+        logger.exception("CRITICAL CHECKOUT ERROR", extra={"payment_method_id": obj_in.PaymentMethodID})
         raise HTTPException(status_code=500, detail="Thanh toán thất bại.")
     
+# --- Moderator/Admin cập nhật trạng thái đơn hàng ---
+@router.put("/{order_id}/status", response_model=schemas.Order)
+def update_order_status(
+    order_id: int,
+    status_update: schemas.OrderStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(deps.get_current_active_admin_or_moderator)
+):
+    order = order_crud.get_by_id(db, order_id=order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Đơn hàng không tồn tại.")
+    return order_crud.update_status(db, order=order, new_status=status_update.OrderStatus)
+
+# `requests` chỉ cần cho thanh toán PayPal: import khi dùng lần đầu (khởi động app nhanh hơn)
+def _http():
+    import requests
+    return requests
+
+def _paypal_post(operation: str, url: str, **kwargs):
+    """POST tới API PayPal, ghi thời gian gọi vào PAYPAL_LATENCY (theo thao tác và kết quả)."""
+    started = time.perf_counter()
+    outcome = "exception"
+    try:
+        response = _http().post(url, **kwargs)
+        outcome = "ok" if response.status_code < 400 else f"http_{response.status_code}"
+        return response
+    finally:
+        PAYPAL_LATENCY.labels(operation, outcome).observe(time.perf_counter() - started)
+
 # 1. Hàm bổ trợ lấy Access Token từ PayPal (Thay cho Client SDK của .NET)
 def get_paypal_access_token():
     try:
+        from requests.auth import HTTPBasicAuth
         # Đảm bảo dùng đúng đường dẫn từ app.core.config
         from app.core.config import settings
         
         auth = HTTPBasicAuth(settings.PAYPAL_CLIENT_ID, settings.PAYPAL_SECRET)
-        print(f"DEBUG: Using ClientID: {settings.PAYPAL_CLIENT_ID[:10]}...") # Chỉ in 10 ký tự đầu để bảo mật
+        logger.debug("Using ClientID: %s...", settings.PAYPAL_CLIENT_ID[:10]) # Chỉ ghi 10 ký tự đầu để bảo mật
 
-        response = requests.post(
+        response = _paypal_post(
+            "token",
             f"{settings.PAYPAL_API_URL}/v1/oauth2/token",
             auth=auth,
             data={"grant_type": "client_credentials"},
@@ -53,12 +146,12 @@ def get_paypal_access_token():
         )
         
         if response.status_code != 200:
-            print(f"PAYPAL AUTH ERROR: {response.status_code} - {response.text}")
+            logger.warning("PAYPAL AUTH ERROR", extra={"status_code": response.status_code, "body": response.text[:500]})
             return None
             
         return response.json().get("access_token")
-    except Exception as e:
-        print(f"PAYPAL EXCEPTION: {str(e)}")
+    except Exception:
+        logger.exception("PAYPAL EXCEPTION")
         return None
 
 # 2. Endpoint tạo Order trên PayPal
@@ -84,10 +177,10 @@ async def create_paypal_order(
         }]
     }
     
-    res = requests.post(f"{settings.PAYPAL_API_URL}/v2/checkout/orders", json=payload, headers=headers)
+    res = _paypal_post("create_order", f"{settings.PAYPAL_API_URL}/v2/checkout/orders", json=payload, headers=headers)
     
     if res.status_code != 201:
-        print(f"PAYPAL ORDER CREATE ERROR: {res.text}")
+        logger.warning("PAYPAL ORDER CREATE ERROR", extra={"status_code": res.status_code, "body": res.text[:500]})
         raise HTTPException(status_code=400, detail="PayPal từ chối tạo đơn hàng")
         
     return res.json()
@@ -104,16 +197,20 @@ async def capture_paypal_order(
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
     
     # Capture tiền
-    res = requests.post(f"{settings.PAYPAL_API_URL}/v2/checkout/orders/{paypal_order_id}/capture", headers=headers)
+    res = _paypal_post("capture", f"{settings.PAYPAL_API_URL}/v2/checkout/orders/{paypal_order_id}/capture", headers=headers)
     
     if res.status_code in [200, 201]:
         # Tương đương đoạn lưu HoaDon/ChiTietHd trong C# của bạn
         order = order_crud.create_simple_order(
             db, user_id=current_user.UserID, 
             payment_method_id=2, # Giả sử 2 là PayPal
-            items_in=obj_in.items
+            items_in=obj_in.items,
+            transaction_code=paypal_order_id
         )
-        cart_crud.clear_cart(db, user_id=current_user.UserID)
+        for item in obj_in.items:
+            product_ranking.note_sale(item.ProductID, item.Quantity)
+        CHECKOUTS.labels("2", "success").inc()
         return {"status": "success", "order_id": order.OrderID}
     
+    CHECKOUTS.labels("2", "payment_declined").inc()
     raise HTTPException(status_code=400, detail="Thanh toán PayPal không thành công.")
\ No newline at end of file
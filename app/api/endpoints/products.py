@@ -1,39 +1,68 @@
+import logging
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
 from sqlalchemy.orm import Session
 from typing import Any, List, Optional
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
 from app.api import deps
 from app.models import schemas, sqlmodels
 from app.models.sqlmodels import User
 from app.crud.crud_product import product_crud
 from app.core.constants import ProductStatus, RoleID
 from app.services.product_service import attach_product_response_fields, product_service
+from app.services.ranking_service import product_ranking, RANKING_KINDS, BESTSELLER
+from app.services import product_import
+from app.services.view_counter import view_counter
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # --- Endpoint Public: Xem danh sách sản phẩm (Bắt buộc dùng Service để đính kèm ảnh) ---
 @router.get("/", response_model=List[schemas.Product])
 def read_products(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    image_width: int = settings.LISTING_IMAGE_WIDTH,
+    db: Session = Depends(get_read_db)
 ):
+    """image_width: PrimaryImageUrl trả về bản thu nhỏ gần nhất với độ rộng này (0 = ảnh gốc)."""
     # CHÚ Ý: Cần dùng product_service.get_products_with_primary_image 
     # Thay vì product_crud.get_multiple để đảm bảo PrimaryImageUrl được đính kèm.
     products = product_service.get_products_with_primary_image(
         db, 
         skip=skip, 
         limit=limit, 
-        status=ProductStatus.APPROVED
+        status=ProductStatus.APPROVED,
+        image_width=image_width
     )
     return products
 
+# --- Endpoint Public: Sản phẩm bán chạy / thịnh hành (đọc từ bộ nhớ, không truy vấn tổng hợp) ---
+# Phải khai báo TRƯỚC /{product_id} để không bị hiểu nhầm là product_id
+@router.get("/bestsellers", response_model=List[schemas.RankedProduct])
+def read_bestsellers(
+    kind: str = BESTSELLER,
+    category_id: Optional[int] = None,
+    limit: int = 10,
+    db: Session = Depends(get_read_db)
+):
+    """kind = "bestseller" (bán chạy) hoặc "trending" (thịnh hành). Bỏ trống category_id để lấy toàn shop."""
+    if kind not in RANKING_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"kind phải là một trong: {', '.join(RANKING_KINDS)}."
+        )
+    if not product_ranking.is_loaded:
+        # Chỉ xảy ra ở request đầu tiên nếu thread làm mới nền chưa chạy xong
+        product_ranking.refresh(db)
+    return product_ranking.get(kind, category_id=category_id, limit=max(1, limit))
+
 # --- Endpoint Public: Xem chi tiết sản phẩm (Đã sửa lỗi trùng lặp và dùng hàm đính kèm ảnh) ---
 @router.get("/{product_id}", response_model=schemas.Product)
 def read_product_detail(
     product_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     product = product_crud.get_by_id(db, product_id=product_id)
     if not product:
@@ -41,6 +70,7 @@ def read_product_detail(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Sản phẩm không tồn tại hoặc đã bị xóa."
         )
+    view_counter.record(product_id) # Đếm lượt xem (điểm thịnh hành), ghi vào primary theo lô ở nền
     # SỬ DỤNG HÀM HELPER để thêm PrimaryImageUrl
     product_out = attach_product_response_fields(product)
     return product_out
@@ -86,9 +116,10 @@ def update_product(
     is_admin_or_moderator = (
         RoleID.ADMIN in user_role_ids or RoleID.MODERATOR in user_role_ids
     )
-    print(f"--- DEBUG QUYỀN ---")
-    print(f"ID Sản phẩm thuộc về Seller: {product.SellerID}")
-    print(f"ID Bạn đang đăng nhập là: {current_user.UserID}")
+    logger.debug(
+        "Kiểm tra quyền cập nhật sản phẩm",
+        extra={"product_id": product_id, "seller_id": product.SellerID, "user_id": current_user.UserID},
+    )
 
     if product.SellerID != current_user.UserID and not is_admin_or_moderator:
         raise HTTPException(
@@ -107,7 +138,7 @@ def update_product(
 
 # --- Endpoint Protected: Tạo sản phẩm mới VỚI ẢNH ---
 @router.post("/upload", response_model=schemas.Product, status_code=status.HTTP_201_CREATED)
-def create_product_with_images(
+async def create_product_with_images(
     title: str = Form(...),
     description: Optional[str] = Form(None),
     price: Decimal = Form(...),
@@ -134,7 +165,7 @@ def create_product_with_images(
     )
     
     try:
-        new_product = product_service.create_product_and_save_images(
+        new_product = await product_service.create_product_and_save_images(
             db=db,
             product_in=product_data,
             seller_id=current_user.UserID,
@@ -155,6 +186,32 @@ def create_product_with_images(
             detail=f"Lỗi hệ thống khi đăng sản phẩm: {e}"
         )
 
+# --- Endpoint Protected: Nhập nhiều sản phẩm 1 lần (CSV/JSONL + file zip ảnh) ---
+@router.post("/import", response_model=schemas.ProductImportResult)
+def import_products(
+    file: UploadFile = File(...),
+    images: Optional[UploadFile] = File(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Mỗi dòng là 1 sản phẩm (trạng thái PENDING), cột Images là tên ảnh trong file zip.
+       Dòng lỗi được trả về trong Errors, các dòng hợp lệ vẫn được lưu."""
+    fmt = product_import.guess_format(file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File dữ liệu phải là .csv hoặc .jsonl."
+        )
+    try:
+        return product_import.import_products(
+            db, current_user.UserID, file.file, fmt, images.file if images is not None else None
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 # --- Endpoint Protected: Xóa sản phẩm (Soft Delete) ---
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_product(
@@ -186,7 +243,7 @@ def delete_product(
 # ----------------------------------------------------------------------------------
 @router.get("/moderator/all", response_model=List[schemas.Product])
 def read_moderator_products(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100
 ) -> Any:
@@ -235,7 +292,7 @@ def update_product_status(
 # ----------------------------------------------------------------------------------
 @router.get("/pending", response_model=List[schemas.Product])
 def read_pending_products(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100
 ) -> Any:
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.core.config import settings
+from app.core.database_async import get_async_db
+from app.models import schemas
+from app.crud.crud_product_async import async_product_crud
+from app.core.constants import ProductStatus
+from app.services.product_service import attach_product_response_fields
+from app.services.view_counter import view_counter
+
+# Bản async của các API đọc sản phẩm (chỉ được include khi bật ASYNC_DB_ENABLED).
+# Các API ghi vẫn nằm ở products.py.
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.Product])
+async def read_products(
+    skip: int = 0,
+    limit: int = 100,
+    image_width: int = settings.LISTING_IMAGE_WIDTH,
+    db: AsyncSession = Depends(get_async_db)
+):
+    products = await async_product_crud.get_multiple(db, skip=skip, limit=limit, status=ProductStatus.APPROVED)
+    return [attach_product_response_fields(p, image_width) for p in products]
+
+# {product_id:int}: chỉ khớp ID dạng số, để /pending, /bestsellers... vẫn rơi xuống router sync
+@router.get("/{product_id:int}", response_model=schemas.Product)
+async def read_product_detail(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    product = await async_product_crud.get_by_id(db, product_id=product_id)
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sản phẩm không tồn tại hoặc đã bị xóa."
+        )
+    view_counter.record(product_id) # Đếm lượt xem (điểm thịnh hành), ghi vào primary theo lô ở nền
+    return attach_product_response_fields(product)
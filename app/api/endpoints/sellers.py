@@ -0,0 +1,70 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.database import get_db
+from app.models import schemas
+from app.models.sqlmodels import User
+from app.crud.crud_sales import sales_stats_crud
+
+router = APIRouter()
+
+# Khoảng thời gian thống kê tối đa (ngày): giới hạn số dòng tổng hợp phải đọc
+MAX_STATS_DAYS = 366
+
+def _date_range(days: int):
+    days = max(1, min(days, MAX_STATS_DAYS))
+    to_date = datetime.utcnow().date()
+    return to_date - timedelta(days=days - 1), to_date
+
+def _build_seller_stats(db: Session, seller_id: int, from_date: date, to_date: date) -> schemas.SellerStats:
+    daily = sales_stats_crud.get_seller_daily(db, seller_id, from_date, to_date)
+    top_products = sales_stats_crud.get_seller_top_products(db, seller_id, from_date, to_date)
+    return schemas.SellerStats(
+        SellerID=seller_id,
+        FromDate=from_date,
+        ToDate=to_date,
+        OrderCount=sum(d.OrderCount for d in daily),
+        UnitsSold=sum(d.UnitsSold for d in daily),
+        Revenue=sum((Decimal(d.Revenue) for d in daily), Decimal(0)),
+        daily=[schemas.DailySales.model_validate(d) for d in daily],
+        top_products=[schemas.ProductSalesSummary.model_validate(p) for p in top_products]
+    )
+
+# --- Thống kê doanh số của Seller hiện tại (seller_dashboard) ---
+@router.get("/me/stats", response_model=schemas.SellerStats)
+def read_my_stats(
+    days: int = 30,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Doanh thu, số đơn, số sản phẩm bán được theo ngày trong `days` ngày gần nhất."""
+    from_date, to_date = _date_range(days)
+    return _build_seller_stats(db, current_user.UserID, from_date, to_date)
+
+# --- Thống kê doanh số theo danh mục (Admin/Moderator dashboard) ---
+@router.get("/stats/categories", response_model=schemas.CategoryStats)
+def read_category_stats(
+    days: int = 30,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_admin_or_moderator)
+):
+    from_date, to_date = _date_range(days)
+    daily = sales_stats_crud.get_category_daily(db, from_date, to_date)
+    return schemas.CategoryStats(
+        FromDate=from_date,
+        ToDate=to_date,
+        daily=[schemas.CategoryDailySales.model_validate(d) for d in daily]
+    )
+
+# --- Thống kê doanh số của một Seller bất kỳ (Admin/Moderator dashboard) ---
+@router.get("/{seller_id}/stats", response_model=schemas.SellerStats)
+def read_seller_stats(
+    seller_id: int,
+    days: int = 30,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_admin_or_moderator)
+):
+    from_date, to_date = _date_range(days)
+    return _build_seller_stats(db, seller_id, from_date, to_date)
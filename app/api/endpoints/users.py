@@ -1,10 +1,11 @@
 # app/api/endpoints/users.py (Đã sửa đổi - Bỏ kiểm tra Token)
 
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import Any, List
+from typing import Any, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models import schemas, sqlmodels
 from app.crud.crud_user import user_crud
 # KHÔNG CẦN NHẬP get_current_user NỮA
@@ -13,6 +14,18 @@ from app.models.schemas import UserCreate
 from app.core.constants import RoleID
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Giới hạn số bản ghi tối đa cho mỗi trang danh sách người dùng
+MAX_USER_PAGE_SIZE = 100
+
+def _read_users_by_role(db: Session, role_id: int, limit: int, cursor: Optional[str], q: Optional[str]) -> dict:
+    limit = max(1, min(limit, MAX_USER_PAGE_SIZE))
+    try:
+        users, total, next_cursor = user_crud.get_page_by_role(db, role_id=role_id, limit=limit, cursor=cursor, search=q)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": users, "total": total, "next_cursor": next_cursor}
 
 # --- 1. ROUTE TẠO MODERATOR (Không cần đăng nhập) ---
 @router.post("/moderator", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
@@ -43,34 +56,27 @@ def create_moderator_account(
         return moderator
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        print(f"Lỗi DB/Server khi tạo Moderator: {e}")
+    except Exception:
+        logger.exception("Lỗi DB/Server khi tạo Moderator")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Lỗi server khi tạo Moderator.")
 
 # --- 2. ROUTE LẤY DANH SÁCH MODERATOR (Không cần đăng nhập) ---
-@router.get("/moderator", response_model=List[schemas.User])
+@router.get("/moderator", response_model=schemas.UserPage)
 def read_moderators(
-    db: Session = Depends(get_db),
-    skip: int = 0, 
-    limit: int = 100,
+    db: Session = Depends(get_read_db),
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
     # ĐÃ XÓA: current_user: sqlmodels.User = Depends(get_current_user)
 ) -> Any:
-    """Lấy danh sách tất cả các tài khoản Moderator đang hoạt động."""
-    
-    all_users = user_crud.get_multiple(db, skip=skip, limit=limit)
-    
-    moderators = [
-        user for user in all_users 
-        if any(user_role.RoleID == RoleID.MODERATOR for user_role in user.user_roles)
-    ]
-    
-    return moderators
+    """Lấy danh sách các tài khoản Moderator (phân trang keyset, tìm theo Username/Email/FullName/ID với q)."""
+    return _read_users_by_role(db, RoleID.MODERATOR, limit, cursor, q)
 
 # --- 3. ROUTE LẤY CHI TIẾT MODERATOR THEO ID (Không cần đăng nhập) ---
 @router.get("/moderator/{user_id}", response_model=schemas.User)
 def read_moderator_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Any:
     """Lấy thông tin chi tiết của một Moderator theo UserID."""
     user = user_crud.get_by_id(db, user_id)
@@ -115,34 +121,26 @@ def update_moderator(
         return updated_user
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        print(f"Lỗi DB/Server khi cập nhật Moderator: {e}")
+    except Exception:
+        logger.exception("Lỗi DB/Server khi cập nhật Moderator")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Lỗi server khi cập nhật Moderator.")
 
 # --- 5. ROUTE LẤY DANH SÁCH KHÁCH HÀNG (RoleID=3) ---
-@router.get("/customer", response_model=List[schemas.User])
+@router.get("/customer", response_model=schemas.UserPage)
 def read_customers(
-    db: Session = Depends(get_db),
-    skip: int = 0, 
-    limit: int = 100,
+    db: Session = Depends(get_read_db),
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
 ) -> Any:
-    """Lấy danh sách tất cả các tài khoản Khách hàng (RoleID=3)."""
-    
-    all_users = user_crud.get_multiple(db, skip=skip, limit=limit)
-    
-    # Lọc ra các tài khoản có RoleID là 3 (Khách hàng)
-    customers = [
-        user for user in all_users 
-        if any(user_role.RoleID == RoleID.CUSTOMER for user_role in user.user_roles)
-    ]
-    
-    return customers
+    """Lấy danh sách các tài khoản Khách hàng (RoleID=3), phân trang keyset, tìm kiếm với q."""
+    return _read_users_by_role(db, RoleID.CUSTOMER, limit, cursor, q)
 
 # --- 6. ROUTE LẤY CHI TIẾT KHÁCH HÀNG THEO ID ---
 @router.get("/customer/{user_id}", response_model=schemas.User)
 def read_customer_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Any:
     """Lấy thông tin chi tiết của một Khách hàng theo UserID."""
     user = user_crud.get_by_id(db, user_id)
@@ -187,6 +185,6 @@ def update_customer(
         return updated_user
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        print(f"Lỗi DB/Server khi cập nhật Khách hàng: {e}")
+    except Exception:
+        logger.exception("Lỗi DB/Server khi cập nhật Khách hàng")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Lỗi server khi cập nhật Khách hàng.")
@@ -0,0 +1,56 @@
+import importlib.util
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+from app.core.static_files import accepted_encodings
+
+# Nén response động (zstd / brotli / gzip). zstd cần `zstandard`, brotli cần `brotli` (đều tùy chọn);
+# thiếu thư viện thì encoding đó bị bỏ qua khi thương lượng với client.
+
+class StreamCompressor:
+    """Nén theo luồng: compress() từng chunk, flush() khi hết dữ liệu."""
+
+    def __init__(self, compress: Callable[[bytes], bytes], flush: Callable[[], bytes]):
+        self.compress = compress
+        self.flush = flush
+
+def _gzip(level: int) -> StreamCompressor:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31) # wbits 31 = định dạng gzip
+    return StreamCompressor(compressor.compress, compressor.flush)
+
+def _brotli(level: int) -> StreamCompressor:
+    import brotli
+    compressor = brotli.Compressor(quality=level)
+    return StreamCompressor(compressor.process, compressor.finish)
+
+def _zstd(level: int) -> StreamCompressor:
+    import zstandard
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return StreamCompressor(compressor.compress, compressor.flush)
+
+# Content-Encoding -> (module cần có, hàm tạo compressor theo level)
+CODECS: Dict[str, tuple] = {
+    "zstd": ("zstandard", _zstd),
+    "br": ("brotli", _brotli),
+    "gzip": (None, _gzip),
+}
+
+@lru_cache(maxsize=None)
+def codec_available(encoding: str) -> bool:
+    module, _ = CODECS[encoding]
+    return module is None or importlib.util.find_spec(module) is not None
+
+def create_compressor(encoding: str, level: int) -> StreamCompressor:
+    return CODECS[encoding][1](level)
+
+def compress_bytes(encoding: str, level: int, data: bytes) -> bytes:
+    compressor = create_compressor(encoding, level)
+    return compressor.compress(data) + compressor.flush()
+
+def negotiate_encoding(accept_encoding: str, levels: Dict[str, int]) -> Optional[str]:
+    """Encoding đầu tiên (theo thứ tự ưu tiên của server trong `levels`) mà client chấp nhận và đã cài thư viện."""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in levels:
+        if encoding in CODECS and (encoding in accepted or "*" in accepted) and codec_available(encoding):
+            return encoding
+    return None
@@ -1,10 +1,43 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "OldShop E-Commerce API"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str = "sqlite:///./sql_app.db"
+    # Chạy migration tới head lúc khởi động (trước job worker/warm-up). Chạy nhiều worker/instance:
+    # đặt False và chạy `python -m app.manage migrate` 1 lần trước khi deploy (tránh migrate song song)
+    MIGRATE_ON_STARTUP: bool = True
+
+    # Connection pool (bỏ qua với SQLite in-memory)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30 # Giây chờ lấy kết nối từ pool
+    DB_POOL_RECYCLE: int = 1800 # Giây, đóng và mở lại kết nối cũ (tránh server DB tự ngắt)
+    DB_POOL_PRE_PING: bool = True
+
+    # PRAGMA cho SQLite (áp dụng cho mỗi kết nối mới)
+    SQLITE_JOURNAL_MODE: str = "WAL" # WAL: người đọc không bị chặn bởi người ghi
+    SQLITE_SYNCHRONOUS: str = "NORMAL" # An toàn với WAL, ít fsync hơn FULL
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000 # Chờ khóa thay vì lỗi "database is locked" ngay
+    SQLITE_MMAP_SIZE: int = 268435456 # 256 MB
+    SQLITE_CACHE_SIZE: int = -64000 # Số âm = KiB (khoảng 64 MB)
+
+    # Read replica (tùy chọn): các API chỉ đọc (danh mục, sản phẩm, danh sách người dùng) đọc từ replica
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_STICKY_SECONDS: int = 5 # Sau khi ghi, client đọc từ primary trong N giây (read-your-writes)
+    REPLICA_STICKY_COOKIE: str = "oldshop_primary_until"
+
+    # Đo số câu SQL / thời gian DB mỗi request (header Server-Timing + log)
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_STATS_TOP_N: int = 5 # Số câu chậm nhất giữ lại cho mỗi request
+    SLOW_QUERY_MS: float = 200.0 # Câu SQL chậm hơn ngưỡng này được ghi log cảnh báo
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1 # Tỉ lệ câu chậm được chạy EXPLAIN kèm theo log
+
+    # Engine async (tùy chọn) cho các API nóng: danh mục/sản phẩm, giỏ hàng, đăng nhập
+    # Cần cài thêm driver async: aiosqlite (SQLite) hoặc aioodbc (SQL Server)
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None # Bỏ trống: tự suy ra từ DATABASE_URL
     
     SECRET_KEY: str = "YOUR_SUPER_SECRET_KEY_HERE"
     ALGORITHM: str = "HS256"
@@ -15,6 +48,97 @@ class Settings(BaseSettings):
     PAYPAL_MODE: str = "sandbox" # Hoặc "live"
     PAYPAL_API_URL: str = "https://api-m.sandbox.paypal.com"
 
+    # Hàng đợi xử lý nền (BackgroundJob)
+    JOB_WORKER_ENABLED: bool = True
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 2.0 # Backoff: base * 2^(attempt - 1)
+    JOB_LOCK_TIMEOUT_SECONDS: int = 300 # Job RUNNING quá lâu (worker chết) sẽ được nhận lại
+
+    # Bảng xếp hạng sản phẩm bán chạy / thịnh hành (giữ trong bộ nhớ)
+    RANKING_SIZE: int = 20 # Số sản phẩm mỗi danh sách (toàn shop và từng danh mục)
+    RANKING_REFRESH_SECONDS: int = 300
+    BESTSELLER_WINDOW_DAYS: int = 30
+    TRENDING_WINDOW_DAYS: int = 30
+    TRENDING_CANDIDATES: int = 1000 # Số sản phẩm nhiều lượt xem nhất được xét điểm thịnh hành
+    TRENDING_GRAVITY: float = 1.5 # Điểm = ViewCount / (số giờ đã đăng + 2) ^ gravity
+    VIEW_COUNT_FLUSH_SECONDS: float = 5.0 # Lượt xem gom trong bộ nhớ, ghi vào DB theo lô (services.view_counter)
+
+    # Xuất dữ liệu CSV/NDJSON (Admin): số dòng mỗi lô đọc từ server-side cursor
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Snapshot Parquet cho phân tích (cần pyarrow): ghi tăng dần theo CreatedAt/OrderDate, chia partition theo ngày
+    ANALYTICS_SNAPSHOT_DIR: str = "analytics_snapshots"
+    ANALYTICS_SNAPSHOT_INTERVAL_SECONDS: int = 0 # 0 = không chạy trong app (dùng cron + manage snapshot)
+    ANALYTICS_SNAPSHOT_LAG_SECONDS: int = 60 # Bỏ qua dòng quá mới, transaction có thể chưa commit
+    ANALYTICS_SNAPSHOT_BATCH_SIZE: int = 10000
+
+    # Tải ảnh lên: ghi theo chunk ra thư mục tạm (ngoài transaction DB) rồi rename vào chỗ
+    UPLOAD_TMP_DIR: str = "static/images/.uploads" # Phải cùng ổ đĩa với static/images/products (rename nguyên tử)
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    UPLOAD_MAX_IMAGE_BYTES: int = 5 * 1024 * 1024
+    UPLOAD_ALLOWED_IMAGE_TYPES: List[str] = ["image/jpeg", "image/png", "image/webp", "image/gif"]
+    UPLOAD_MAX_REQUEST_BYTES: int = 100 * 1024 * 1024 # Tổng 1 request multipart (kể cả file zip khi nhập hàng loạt)
+
+    # Ảnh thu nhỏ / nhiều kích thước: tạo ở nền (job + process pool, cần Pillow) sau khi tải ảnh lên
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 1280]
+    IMAGE_VARIANT_FORMATS: List[str] = ["webp", "avif"] # Định dạng Pillow không hỗ trợ sẽ bị bỏ qua
+    IMAGE_VARIANT_QUALITY: int = 75
+    IMAGE_VARIANT_PROCESSES: int = 2
+    LISTING_IMAGE_WIDTH: int = 320 # Độ rộng PrimaryImageUrl ở API danh sách (0 = ảnh gốc)
+    LISTING_IMAGE_FORMAT: str = "webp" # Định dạng của PrimaryImageUrl/PrimaryImageSrcset (trình duyệt nào cũng hỗ trợ)
+
+    # Tài nguyên tĩnh (CSS/JS/ảnh giao diện): build đặt hash vào tên file + nén sẵn gzip/brotli
+    ASSETS_SOURCE_DIR: str = "app/templates"
+    ASSETS_BUILD_DIR: str = "build/static" # python -m app.manage build-assets
+    ASSETS_URL: str = "/assets"
+    ASSETS_BUILD_ENABLED: bool = True # False: luôn phục vụ file gốc (khi đang sửa giao diện)
+    ASSETS_COMPRESS_MIN_BYTES: int = 1024 # File nhỏ hơn không nén (không đáng)
+
+    # Nén response API (xem core.compression, benchmarks/bench_compression.py)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_PATH_PREFIXES: List[str] = ["/api"]
+    COMPRESSION_MIN_BYTES: int = 1024 # Response nhỏ hơn gửi nguyên (header nén + CPU không đáng)
+    COMPRESSION_THREADPOOL_BYTES: int = 64 * 1024 # Chunk lớn hơn được nén trong threadpool (không chặn event loop)
+    # Content-Type -> {encoding: level}, thứ tự encoding = thứ tự ưu tiên. Content-Type không có ở đây thì không nén
+    COMPRESSION_LEVELS: Dict[str, Dict[str, int]] = {
+        "application/json": {"zstd": 3, "br": 4, "gzip": 6},
+        "application/x-ndjson": {"zstd": 3, "br": 4, "gzip": 5},
+        "text/csv": {"zstd": 3, "br": 4, "gzip": 5},
+        "text/html": {"zstd": 3, "br": 5, "gzip": 6},
+    }
+
+    # Trang cửa hàng render ở server (xem services.storefront): HTML cache trong bộ nhớ theo phiên bản catalog
+    SSR_CACHE_ENABLED: bool = True
+    SSR_CACHE_TTL_SECONDS: int = 30 # Thay đổi catalog từ process/worker khác hiện ra chậm nhất sau chừng này
+    SSR_CACHE_MAX_PAGES: int = 64
+    SSR_PRODUCTS_LIMIT: int = 100 # Số sản phẩm nhúng sẵn trong shop.html (JS không phải gọi API lần nữa)
+
+    # Warm-up khi worker khởi động (xem services.warmup); /health/ready trả 503 tới khi xong
+    WARMUP_ENABLED: bool = True
+    WARMUP_CATALOG_PAGES: int = 2 # Số trang đầu của /products/ đọc trước
+    WARMUP_PAGE_SIZE: int = 100 # Bằng limit mặc định của /products/
+    WARMUP_TIMEOUT_SECONDS: int = 60 # Chờ bảng xếp hạng làm mới lần đầu tối đa chừng này
+    # Nhận SIGTERM: /health/ready trả 503 ngay, chừng này giây sau uvicorn mới ngừng nhận request
+    # (đủ để load balancer thấy worker not-ready). 0 = tắt ngay như mặc định của uvicorn
+    SHUTDOWN_PRESTOP_SECONDS: float = 5.0
+
+    # Metrics Prometheus ở /metrics (xem core.metrics, cần prometheus_client)
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: Optional[str] = None # Bắt buộc khi chạy nhiều worker; xóa sạch trước mỗi lần khởi động
+
+    # Ghi log JSON qua hàng đợi + thread nền (xem core.logging_setup)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json" # "json" hoặc "text" (dễ đọc khi phát triển)
+    LOG_QUEUE_SIZE: int = 10000 # Hàng đợi đầy thì bỏ log (không chặn request)
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01 # Tỉ lệ request giữ log DEBUG (khi LOG_LEVEL=DEBUG)
+    LOG_REQUEST_ID_HEADER: str = "X-Request-ID"
+
+    # Nhập sản phẩm hàng loạt (CSV/JSONL + zip ảnh): số dòng mỗi lô INSERT/commit
+    PRODUCT_IMPORT_BATCH_SIZE: int = 200
+    PRODUCT_IMPORT_MAX_ROWS: int = 5000
+
     model_config = SettingsConfigDict(
         env_file=".env", 
         extra='ignore',
@@ -37,6 +37,19 @@ class PaymentMethodID(IntEnum):
     CREDIT_CARD = 2      # Thẻ tín dụng
     BANK_TRANSFER = 3    # Chuyển khoản ngân hàng 
     
+# --- HẰNG SỐ CỦA BACKGROUND JOB (Hàng đợi xử lý nền) ---
+
+class JobStatus(IntEnum):
+    """Trạng thái của một job trong bảng BackgroundJob."""
+    PENDING = 0      # Đang chờ xử lý (hoặc chờ retry)
+    RUNNING = 1      # Đang được một worker xử lý
+    DONE = 2         # Đã xử lý xong
+    FAILED = 3       # Hết số lần retry, cần kiểm tra thủ công
+
+# Tên các sự kiện nghiệp vụ được phát vào hàng đợi
+ORDER_PLACED_EVENT = "order.placed"
+ORDER_STATUS_CHANGED_EVENT = "order.status_changed"
+
 # --- CÁC HẰNG SỐ KHÁC (Tùy chọn) ---
 # Ví dụ: Độ dài tối thiểu của mật khẩu/tên người dùng
 MIN_PASSWORD_LENGTH = 6
@@ -1,17 +1,49 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from typing import List
+from fastapi import Request
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, 
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Chạy mỗi khi pool mở kết nối SQLite mới."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.close()
+
+def engine_options(url: str) -> dict:
+    """Tham số pool/kết nối cho create_engine (dùng chung cho engine sync và async)."""
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if not url.startswith("sqlite"):
+        return options
+    if url.split("://", 1)[1] in ("", "/:memory:") or "mode=memory" in url:
+        # SQLite in-memory dùng pool riêng của SQLAlchemy, không nhận các tham số pool ở trên
+        options = {}
+    options["connect_args"] = {"check_same_thread": False}
+    return options
+
+def create_db_engine(url: str) -> Engine:
+    """Tạo engine với cấu hình pool từ settings (và PRAGMA nếu là SQLite)."""
+    db_engine = create_engine(url, **engine_options(url))
+    if url.startswith("sqlite"):
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False, 
@@ -19,11 +51,48 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Replica chỉ đọc: không cấu hình DATABASE_REPLICA_URL thì dùng chung engine chính
+replica_engine = create_db_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else engine
+
+ReplicaSessionLocal = sessionmaker(
+    autocommit=False, 
+    autoflush=False, 
+    bind=replica_engine
+)
+
 Base = declarative_base()
 
+def insert_returning_ids(db: Session, key, rows: List[dict]) -> List[int]:
+    """INSERT nhiều dòng, trả về khóa chính theo đúng thứ tự `rows`.
+       SQLite không có "sentinel" ngầm định nên sort_by_parameter_order khiến SQLAlchemy INSERT từng dòng
+       một; thay vào đó INSERT theo lô rồi sắp xếp khóa: SQLite cấp INTEGER PRIMARY KEY tăng dần theo thứ tự
+       dòng (và transaction ghi không xen kẽ nhau)."""
+    statement = insert(key.table)
+    if db.get_bind().dialect.name == "sqlite":
+        return sorted(db.scalars(statement.returning(key), rows).all())
+    return db.scalars(statement.returning(key, sort_by_parameter_order=True), rows).all()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def is_primary_sticky(request: Request) -> bool:
+    """Client vừa ghi dữ liệu (cookie do ReplicaStickinessMiddleware đặt) thì phải đọc từ primary,
+       tránh đọc phải dữ liệu cũ khi replica chưa đồng bộ kịp."""
+    primary_until = request.cookies.get(settings.REPLICA_STICKY_COOKIE)
+    try:
+        return float(primary_until) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+def get_read_db(request: Request):
+    """Session cho các API chỉ đọc: bind vào replica, hoặc primary nếu client đang "dính" primary."""
+    session_factory = SessionLocal if is_primary_sticky(request) else ReplicaSessionLocal
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
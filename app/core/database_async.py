@@ -0,0 +1,62 @@
+from typing import AsyncIterator, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.core.database import engine_options, _set_sqlite_pragmas
+
+# Driver async tương ứng với driver sync trong DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "mssql": "mssql+aioodbc",
+    "mssql+pyodbc": "mssql+aioodbc",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+# Engine và session factory chỉ được tạo khi dùng lần đầu:
+# không bật ASYNC_DB_ENABLED thì không cần cài driver async (aiosqlite/aioodbc)
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+def get_async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    scheme, rest = settings.DATABASE_URL.split("://", 1)
+    if scheme not in ASYNC_DRIVERS:
+        raise RuntimeError(f"Không suy ra được driver async cho '{scheme}', hãy đặt ASYNC_DATABASE_URL.")
+    return f"{ASYNC_DRIVERS[scheme]}://{rest}"
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_database_url()
+        _async_engine = create_async_engine(url, **engine_options(url))
+        if url.startswith("sqlite"):
+            event.listen(_async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+        if settings.QUERY_STATS_ENABLED:
+            from app.core.query_stats import install_query_instrumentation
+            install_query_instrumentation(_async_engine.sync_engine)
+    return _async_engine
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        # expire_on_commit=False: AsyncSession không lazy load được thuộc tính sau commit
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _async_session_factory
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_session_factory()() as db:
+        yield db
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
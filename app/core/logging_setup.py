@@ -0,0 +1,142 @@
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from app.core.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+# Ghi log không chặn request: logger -> QueueHandler (chỉ đưa record vào hàng đợi, trong thread của
+# request) -> QueueListener (thread nền) -> stdout dạng JSON mỗi dòng 1 record.
+# - request_id: gắn tự động vào mọi record trong request (RequestIdMiddleware đặt, lấy từ header
+#   X-Request-ID nếu client/proxy gửi lên) để nối log của cùng 1 request.
+# - Log DEBUG (hoặc record có extra={"sample_rate": ...}) chỉ giữ lại 1 phần: chọn theo request_id,
+#   request được chọn thì giữ đủ mọi dòng của nó.
+# - Hàng đợi đầy: bỏ record và đếm (không bao giờ chờ stdout).
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Dùng lại X-Request-ID hợp lệ của client/proxy, không thì tạo mới."""
+    if incoming and _REQUEST_ID_RE.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+# Thuộc tính có sẵn của LogRecord: phần còn lại là `extra` của lời gọi log
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "sample_rate"}
+
+class RequestContextFilter(logging.Filter):
+    """Gắn request_id và lấy mẫu log khối lượng lớn. Chạy trong thread ghi log (trước khi vào hàng đợi)."""
+
+    def __init__(self, debug_sample_rate: float):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        rate = getattr(record, "sample_rate", None)
+        if rate is None and record.levelno <= logging.DEBUG:
+            rate = self.debug_sample_rate
+        if rate is None or rate >= 1:
+            return True
+        if record.request_id:
+            # Cùng 1 request luôn cùng kết quả: giữ trọn hoặc bỏ trọn log debug của request đó
+            return zlib.crc32(record.request_id.encode()) / 2**32 < rate
+        return zlib.crc32(f"{record.created}{record.lineno}".encode()) / 2**32 < rate
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler không chờ khi hàng đợi đầy (bỏ record, tăng `dropped`)."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Ghép args vào message và đổi traceback thành chuỗi ngay tại đây (đối tượng có thể đổi sau đó),
+        # nhưng KHÔNG format JSON: việc đó để thread nền làm
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+# --- CÀI ĐẶT / DỪNG (gọi trong lifespan của app) ---
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+def setup_logging() -> None:
+    """Đưa root logger (và log của uvicorn) qua hàng đợi + thread ghi nền. Gọi nhiều lần không sao."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(sys.stdout)
+        if settings.LOG_FORMAT == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _queue_handler.addFilter(RequestContextFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(settings.LOG_LEVEL.upper())
+        # uvicorn tự cấu hình handler riêng (ghi thẳng, đồng bộ): chuyển về root để đi qua hàng đợi
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+        _listener = QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+
+def stop_logging() -> None:
+    """Ghi nốt các record còn trong hàng đợi rồi dừng thread ghi."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        # Gỡ handler trước: log phát sinh sau đó (lúc tắt) đi thẳng ra stderr thay vì nằm lại hàng đợi
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+        if _queue_handler.dropped:
+            sys.stderr.write(f"Log: đã bỏ {_queue_handler.dropped} record do hàng đợi đầy\n")
@@ -0,0 +1,124 @@
+import os
+from typing import Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+# Metrics dạng Prometheus (cần `prometheus_client`, tùy chọn; chưa cài thì mọi metric là no-op và
+# /metrics trả 503). Chạy nhiều worker (uvicorn --workers N): đặt METRICS_MULTIPROC_DIR tới 1 thư mục
+# rỗng và XÓA SẠCH thư mục đó trước mỗi lần khởi động; mỗi worker ghi metric ra file riêng ở đó và
+# /metrics (worker nào trả lời cũng được) cộng gộp file của mọi worker.
+if settings.METRICS_MULTIPROC_DIR:
+    # prometheus_client đọc biến môi trường lúc import: phải đặt trước
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.METRICS_MULTIPROC_DIR)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>" # Request không khớp route nào (404): gộp chung, tránh nổ số nhãn
+
+def metrics_available() -> bool:
+    return settings.METRICS_ENABLED and prometheus_client is not None
+
+def multiprocess_dir() -> Optional[str]:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+class _NoopMetric:
+    """Thay cho metric khi chưa cài prometheus_client / tắt METRICS_ENABLED."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+def _metric(kind: str, name: str, documentation: str, labels: Tuple[str, ...], **kwargs):
+    if not metrics_available():
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labels, **kwargs)
+
+# --- ĐỊNH NGHĨA METRIC ---
+# Gauge dùng multiprocess_mode="livesum": cộng giá trị của các worker còn sống
+REQUEST_LATENCY = _metric(
+    "Histogram", "http_request_duration_seconds", "Thời gian xử lý request theo route (mẫu đường dẫn)",
+    ("method", "route", "status"), buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = _metric(
+    "Gauge", "http_requests_in_progress", "Số request đang xử lý", ("method",), multiprocess_mode="livesum"
+)
+DB_POOL_CONNECTIONS = _metric(
+    "Gauge", "db_pool_connections", "Kết nối DB trong pool: open = đang mở, checked_out = đang được dùng",
+    ("engine", "state"), multiprocess_mode="livesum"
+)
+CACHE_REQUESTS = _metric(
+    "Counter", "cache_requests_total", "Số lần tra cache trong process (hit / miss)", ("cache", "result")
+)
+CHECKOUTS = _metric(
+    "Counter", "checkout_total", "Kết quả đặt hàng theo PaymentMethodID", ("payment_method_id", "outcome")
+)
+PAYPAL_LATENCY = _metric(
+    "Histogram", "paypal_request_duration_seconds", "Thời gian gọi API PayPal", ("operation", "outcome"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+)
+LOG_RECORDS_DROPPED = _metric(
+    "Counter", "log_records_dropped_total", "Số log bị bỏ do hàng đợi ghi log đầy (xem core.logging_setup)", ()
+)
+
+# --- HÀM TIỆN ÍCH ---
+def route_template(scope) -> str:
+    """Mẫu đường dẫn của route đã khớp (vd. /api/v1/products/{product_id}), không phải đường dẫn thật:
+       giữ số nhãn của histogram cố định. route.path của router được include chỉ là phần sau prefix
+       nên ghép lại từ đường dẫn thật: bỏ phần khớp với route rồi nối mẫu của route vào."""
+    route = scope.get("route")
+    path = scope.get("path", "")
+    if route is None:
+        # Mount (StaticFiles...): dùng đường dẫn mount; không khớp gì: gộp chung
+        return scope.get("root_path") or UNMATCHED_ROUTE
+    path_format = getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+    try:
+        concrete = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    if concrete and path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + path_format
+    return path_format
+
+def instrument_pool(db_engine: Engine, name: str) -> None:
+    """Theo dõi số kết nối đang mở / đang dùng của pool qua event của SQLAlchemy."""
+    if not metrics_available():
+        return
+    opened = DB_POOL_CONNECTIONS.labels(name, "open")
+    checked_out = DB_POOL_CONNECTIONS.labels(name, "checked_out")
+    event.listen(db_engine, "connect", lambda *args: opened.inc())
+    event.listen(db_engine, "close", lambda *args: opened.dec())
+    event.listen(db_engine, "checkout", lambda *args: checked_out.inc())
+    event.listen(db_engine, "checkin", lambda *args: checked_out.dec())
+
+def render_latest() -> Tuple[bytes, str]:
+    """Nội dung cho /metrics. Nhiều worker: gộp file của mọi worker trong PROMETHEUS_MULTIPROC_DIR."""
+    if multiprocess_dir():
+        from prometheus_client import multiprocess
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+def mark_process_dead() -> None:
+    """Gọi khi worker tắt: bỏ gauge "live" của process này khỏi kết quả gộp."""
+    if metrics_available() and multiprocess_dir():
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,219 @@
+import logging
+import time
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.core.compression import StreamCompressor, create_compressor, negotiate_encoding
+from app.core.query_stats import start_request_stats, end_request_stats
+from app.core.metrics import REQUEST_LATENCY, REQUESTS_IN_PROGRESS, route_template
+from app.core.logging_setup import new_request_id, request_id_var
+
+logger = logging.getLogger(__name__)
+
+# Các method có thể ghi dữ liệu
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+class ReplicaStickinessMiddleware(BaseHTTPMiddleware):
+    """Sau một request ghi thành công, đặt cookie để các request đọc tiếp theo của client này
+       dùng primary trong REPLICA_STICKY_SECONDS giây (read-your-writes, xem database.get_read_db)."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method in MUTATING_METHODS and response.status_code < 400:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE,
+                str(time.time() + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="lax"
+            )
+        return response
+
+class UploadSizeLimitMiddleware:
+    """Giới hạn tổng dung lượng request multipart (UPLOAD_MAX_REQUEST_BYTES) trước khi Starlette đọc và
+       lưu tạm body: Content-Length vượt giới hạn -> 413 ngay, không đọc body; không khai báo (Transfer-Encoding:
+       chunked) hoặc khai báo sai -> đếm số byte thực nhận, vượt giới hạn thì dừng đọc và trả 413.
+       Giới hạn từng ảnh kiểm tra ở upload_storage. ASGI thuần: BaseHTTPMiddleware không bọc được `receive`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            return await self.app(scope, receive, send)
+        limit = settings.UPLOAD_MAX_REQUEST_BYTES
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > limit:
+            return await _upload_too_large()(scope, receive, send)
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Ném từ lúc đọc body: FastAPI ném lại HTTPException của middleware -> response 413
+                    raise HTTPException(status_code=413, detail=_upload_too_large_detail())
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            # Body được đọc ngoài route (không qua ExceptionMiddleware): tự trả 413
+            if e.status_code != 413 or received <= limit or response_started:
+                raise
+            await _upload_too_large()(scope, receive, send)
+
+def _upload_too_large_detail() -> str:
+    return f"Dữ liệu tải lên vượt quá {settings.UPLOAD_MAX_REQUEST_BYTES // (1024 * 1024)} MB."
+
+def _upload_too_large() -> JSONResponse:
+    return JSONResponse(status_code=413, content={"detail": _upload_too_large_detail()})
+
+async def _replay(chunks):
+    for chunk in chunks:
+        yield chunk
+
+async def _compressed(compressor: StreamCompressor, head: list, rest):
+    """Nén phần đã đọc trước (head) rồi tới phần còn lại của body, không gom cả body vào bộ nhớ."""
+    async def compress(chunk: bytes) -> bytes:
+        if len(chunk) > settings.COMPRESSION_THREADPOOL_BYTES:
+            return await run_in_threadpool(compressor.compress, chunk)
+        return compressor.compress(chunk)
+
+    for chunk in head:
+        output = await compress(chunk)
+        if output:
+            yield output
+    async for chunk in rest:
+        output = await compress(chunk)
+        if output:
+            yield output
+    yield compressor.flush()
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """Nén response của API (COMPRESSION_PATH_PREFIXES) bằng zstd/brotli/gzip theo Accept-Encoding.
+       Level theo Content-Type (COMPRESSION_LEVELS); body nhỏ hơn COMPRESSION_MIN_BYTES gửi nguyên.
+       Hoạt động cả với StreamingResponse (xuất CSV/NDJSON): nén từng chunk khi gửi."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method == "HEAD" or not request.url.path.startswith(tuple(settings.COMPRESSION_PATH_PREFIXES)):
+            return response
+        media_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        levels = settings.COMPRESSION_LEVELS.get(media_type)
+        if not levels or "content-encoding" in response.headers or response.status_code in (204, 304):
+            return response
+        vary = response.headers.get("vary", "")
+        if "accept-encoding" not in vary.lower():
+            response.headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), levels)
+        if encoding is None:
+            return response
+
+        # Đọc trước tới ngưỡng để biết body có đủ lớn không (body nhỏ thì trả nguyên như cũ)
+        body = response.body_iterator.__aiter__()
+        head, size = [], 0
+        while size < settings.COMPRESSION_MIN_BYTES:
+            try:
+                chunk = await body.__anext__()
+            except StopAsyncIteration:
+                response.body_iterator = _replay(head)
+                return response
+            head.append(chunk)
+            size += len(chunk)
+
+        del response.headers["content-length"]
+        response.headers["Content-Encoding"] = encoding
+        etag = response.headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            response.headers["ETag"] = f"W/{etag}" # Bản nén khác byte với bản gốc
+        response.body_iterator = _compressed(create_compressor(encoding, levels[encoding]), head, body)
+        return response
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """Đếm số câu SQL và tổng thời gian DB của mỗi request (xem core.query_stats).
+       Trả về qua header Server-Timing (xem được trong DevTools) và ghi log có cấu trúc."""
+
+    async def dispatch(self, request: Request, call_next):
+        stats, token = start_request_stats()
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            end_request_stats(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        timings = [f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"', f"app;dur={total_ms:.1f}"]
+        if stats.slowest:
+            timings.append(f"db-slowest;dur={stats.slowest[0].duration_ms:.1f}")
+        response.headers.append("Server-Timing", ", ".join(timings))
+
+        logger.info(
+            "request_db_stats method=%s path=%s status=%s queries=%d db_ms=%.1f",
+            request.method, request.url.path, response.status_code, stats.count, stats.total_ms,
+            extra={
+                "event": "request_db_stats",
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "queries": stats.count,
+                "db_ms": round(stats.total_ms, 1),
+                "duration_ms": round(total_ms, 1),
+                "slowest": [
+                    {"duration_ms": round(q.duration_ms, 1), "statement": q.statement} for q in stats.slowest
+                ],
+            }
+        )
+        return response
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Histogram thời gian xử lý theo route (mẫu đường dẫn) và số request đang xử lý (xem core.metrics).
+       Đo tới khi có header response: với response streaming (export) là thời gian tới byte đầu tiên."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path == "/metrics" or request.url.path.startswith("/health/"):
+            return await call_next(request)
+        in_progress = REQUESTS_IN_PROGRESS.labels(request.method)
+        in_progress.inc()
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            in_progress.dec()
+            REQUEST_LATENCY.labels(request.method, route_template(request.scope), str(status)).observe(
+                time.perf_counter() - started
+            )
+
+class RequestIdMiddleware(BaseHTTPMiddleware):
+    """Mã tương quan cho mỗi request: gắn vào mọi dòng log trong request (core.logging_setup)
+       và trả lại qua header LOG_REQUEST_ID_HEADER để đối chiếu với log của proxy/client."""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = new_request_id(request.headers.get(settings.LOG_REQUEST_ID_HEADER))
+        token = request_id_var.set(request_id)
+        try:
+            response = await call_next(request)
+        finally:
+            request_id_var.reset(token)
+        response.headers[settings.LOG_REQUEST_ID_HEADER] = request_id
+        return response
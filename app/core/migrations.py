@@ -0,0 +1,41 @@
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from app.core.database import engine, Base
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+def get_alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    # Không để fileConfig của Alembic ghi đè cấu hình logging của app
+    config.attributes["configure_logger"] = False
+    return config
+
+def _legacy_revision(connection: Connection) -> Optional[str]:
+    """Database cũ tạo bằng Base.metadata.create_all (chưa có bảng alembic_version):
+       trả về revision tương ứng với các bảng đang có để stamp trước khi upgrade."""
+    tables = set(inspect(connection).get_table_names())
+    if "alembic_version" in tables or "Product" not in tables:
+        return None
+    return "0002" if "BackgroundJob" in tables else "0001"
+
+def upgrade_database(revision: str = "head") -> None:
+    """Áp dụng migration tới `revision` (thay cho Base.metadata.create_all)."""
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        legacy = _legacy_revision(connection)
+        if legacy:
+            command.stamp(config, legacy)
+        command.upgrade(config, revision)
+
+def reset_database() -> None:
+    """Xóa toàn bộ bảng rồi tạo lại bằng migration (chỉ dùng cho môi trường dev)."""
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    upgrade_database()
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.constants import ProductStatus, RoleID
+from app.models.sqlmodels import (
+    Product, ProductImage, ShoppingCartItem, Order, OrderDetail, Review, ProductDailySales, User, UserRole
+)
+
+@dataclass
+class QueryPlan:
+    name: str
+    sql: str
+    plan: List[str]
+    uses_index: bool
+
+# Các truy vấn nóng, viết lại đúng dạng điều kiện mà CRUD/service đang dùng
+HOT_QUERIES: List[tuple] = [
+    ("Danh sách sản phẩm đã duyệt", lambda: select(Product).where(
+        Product.IsDeleted == False, Product.Status == ProductStatus.APPROVED
+    ).offset(0).limit(100)),
+    ("Danh sách sản phẩm cho Moderator", lambda: select(Product).where(
+        Product.IsDeleted == False, Product.Status.in_([ProductStatus.PENDING, ProductStatus.APPROVED])
+    ).offset(0).limit(100)),
+    ("Ứng viên thịnh hành", lambda: select(Product.ProductID, Product.ViewCount).where(
+        Product.Status == ProductStatus.APPROVED, Product.IsDeleted == False,
+        Product.CreatedAt >= datetime.utcnow() - timedelta(days=30)
+    ).order_by(Product.ViewCount.desc()).limit(1000)),
+    ("Ảnh của danh sách sản phẩm", lambda: select(ProductImage).where(ProductImage.ProductID.in_([1, 2, 3]))),
+    ("Món hàng trong giỏ", lambda: select(ShoppingCartItem).where(ShoppingCartItem.CartID == 1)),
+    ("Lịch sử mua hàng", lambda: select(Order).where(Order.BuyerID == 1).order_by(
+        Order.OrderDate.desc(), Order.OrderID.desc()
+    ).limit(21)),
+    ("Chi tiết của các đơn hàng", lambda: select(OrderDetail).where(OrderDetail.OrderID.in_([1, 2, 3]))),
+    ("Lịch sử bán hàng", lambda: select(OrderDetail).where(OrderDetail.SellerID == 1).order_by(
+        OrderDetail.OrderID.desc(), OrderDetail.OrderDetailID.desc()
+    ).limit(21)),
+    ("Đánh giá của sản phẩm", lambda: select(Review).where(Review.ProductID == 1, Review.IsDeleted == False)),
+    ("Top sản phẩm của Seller", lambda: select(ProductDailySales).where(
+        ProductDailySales.SellerID == 1, ProductDailySales.SalesDate >= datetime.utcnow().date()
+    )),
+    ("Danh sách người dùng theo vai trò", lambda: select(User).join(UserRole, UserRole.UserID == User.UserID).where(
+        UserRole.RoleID == RoleID.MODERATOR, User.IsDeleted == False, UserRole.UserID > 0
+    ).order_by(UserRole.UserID).limit(21)),
+]
+
+def _explain_sqlite(db: Session, sql: str) -> List[str]:
+    return [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+def _explain_mssql(db: Session, sql: str) -> List[str]:
+    connection = db.connection()
+    connection.exec_driver_sql("SET SHOWPLAN_TEXT ON")
+    try:
+        return [row[0].strip() for row in connection.exec_driver_sql(sql)]
+    finally:
+        connection.exec_driver_sql("SET SHOWPLAN_TEXT OFF")
+
+def _plan_uses_index(dialect: str, plan: List[str]) -> bool:
+    if dialect == "sqlite":
+        # "SCAN <bảng>" không kèm USING ... INDEX là quét toàn bảng
+        return not any(line.startswith("SCAN ") and "INDEX" not in line for line in plan)
+    return not any("Table Scan" in line or "Clustered Index Scan" in line for line in plan)
+
+def explain_hot_queries(db: Session) -> List[QueryPlan]:
+    dialect = db.get_bind().dialect
+    explain: Callable[[Session, str], List[str]]
+    if dialect.name == "sqlite":
+        explain = _explain_sqlite
+    elif dialect.name == "mssql":
+        explain = _explain_mssql
+    else:
+        raise RuntimeError(f"Chưa hỗ trợ EXPLAIN cho '{dialect.name}'.")
+
+    results = []
+    for name, build in HOT_QUERIES:
+        sql = str(build().compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        plan = explain(db, sql)
+        results.append(QueryPlan(name=name, sql=sql, plan=plan, uses_index=_plan_uses_index(dialect.name, plan)))
+    return results
@@ -0,0 +1,89 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SlowQuery:
+    duration_ms: float
+    statement: str
+    plan: Optional[List[str]] = None
+
+@dataclass
+class RequestQueryStats:
+    """Thống kê SQL của 1 request: số câu lệnh, tổng thời gian DB và các câu chậm nhất."""
+    count: int = 0
+    total_ms: float = 0.0
+    slowest: List[SlowQuery] = field(default_factory=list)
+    statements: Optional[List[str]] = None # Chỉ ghi lại khi cần (kiểm tra ngân sách truy vấn)
+
+    def record(self, statement: str, duration_ms: float) -> SlowQuery:
+        self.count += 1
+        self.total_ms += duration_ms
+        if self.statements is not None:
+            self.statements.append(statement)
+        entry = SlowQuery(duration_ms, statement)
+        self.slowest.append(entry)
+        self.slowest.sort(key=lambda q: q.duration_ms, reverse=True)
+        del self.slowest[settings.QUERY_STATS_TOP_N:]
+        return entry
+
+# Gắn với request hiện tại (middleware đặt giá trị). Endpoint sync chạy trong threadpool
+# vẫn thấy cùng object vì context được copy sang thread.
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+def start_request_stats(capture_statements: bool = False) -> Tuple[RequestQueryStats, object]:
+    stats = RequestQueryStats(statements=[] if capture_statements else None)
+    return stats, _current_stats.set(stats)
+
+def end_request_stats(token) -> None:
+    _current_stats.reset(token)
+
+def get_request_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+def _explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    """EXPLAIN câu lệnh chậm trên chính kết nối DBAPI (không qua SQLAlchemy để tránh đệ quy event)."""
+    if conn.dialect.name != "sqlite" or not statement.lstrip().upper().startswith("SELECT"):
+        return None # SQL Server: SHOWPLAN phải chạy ở batch riêng, dùng python -m app.manage check-indexes
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    stats = _current_stats.get()
+    entry = stats.record(statement, duration_ms) if stats is not None else SlowQuery(duration_ms, statement)
+
+    if duration_ms < settings.SLOW_QUERY_MS:
+        return
+    if random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+        entry.plan = _explain(conn, statement, parameters)
+    logger.warning(
+        "slow_query duration_ms=%.1f", duration_ms,
+        extra={"event": "slow_query", "duration_ms": round(duration_ms, 1), "statement": statement, "plan": entry.plan}
+    )
+
+def install_query_instrumentation(engine: Engine) -> None:
+    """Đăng ký event đo thời gian từng câu SQL trên engine (gọi 1 lần cho mỗi engine)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
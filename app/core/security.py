@@ -1,9 +1,8 @@
 import os
 import secrets # Dùng secrets.token_hex thay vì os.urandom.hex() để đơn giản và an toàn hơn
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Any
-from jose import jwt
-from passlib.context import CryptContext
 
 from app.core.config import settings # Giả định import settings thành công
 import secrets
@@ -12,8 +11,11 @@ def generate_random_key(length: int = 32) -> str:
     """Sinh khóa API ngẫu nhiên (hexadecimal)"""
     return secrets.token_hex(length)
 
-# Sử dụng bcrypt để hash mật khẩu
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Sử dụng bcrypt để hash mật khẩu. passlib/bcrypt và jose chỉ import khi dùng lần đầu (khởi động app nhanh hơn)
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # --- 1. Xử lý Mật khẩu ---
 
@@ -32,14 +34,14 @@ def get_password_hash(password: str, salt: str) -> str:
     """
     # Nối salt (RandomKey) vào mật khẩu trước khi hash
     salted_password = password + salt 
-    return pwd_context.hash(salted_password)
+    return get_pwd_context().hash(salted_password)
 
 # 🔥 Cải thiện bảo mật: Sử dụng bcrypt để verify
 def verify_password(plain_password: str, hashed_password: str, salt: str) -> bool:
     """Kiểm tra mật khẩu thường và mật khẩu đã hash bằng bcrypt."""
     salted_password = plain_password + salt
     try:
-        return pwd_context.verify(salted_password, hashed_password)
+        return get_pwd_context().verify(salted_password, hashed_password)
     except ValueError:
         # Xảy ra nếu hashed_password không phải là định dạng bcrypt hợp lệ (ví dụ: hash cũ)
         return False
@@ -57,6 +59,7 @@ def create_access_token(
     
     to_encode = {"exp": expire, "sub": str(subject)}
     
+    from jose import jwt
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.SECRET_KEY, 
@@ -65,6 +68,7 @@ def create_access_token(
     return encoded_jwt
 
 def decode_access_token(token: str):
+    from jose import jwt
     try:
         payload = jwt.decode(
             token, 
@@ -0,0 +1,68 @@
+import mimetypes
+import os
+from typing import Sequence, Set
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable" # File có hash trong tên/đường dẫn
+REVALIDATE_CACHE_CONTROL = "no-cache" # Được cache nhưng phải hỏi lại server (ETag -> 304) mỗi lần dùng
+
+# Thứ tự ưu tiên bản nén sẵn: (Content-Encoding, đuôi file)
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles gắn thêm header Cache-Control cho mọi file trả về (dùng cho thư mục chứa file bất biến)."""
+
+    def __init__(self, *args, cache_control: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Các encoding trong Accept-Encoding có q > 0 ("*" được giữ nguyên)."""
+    accepted = set()
+    for part in header.split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.lower())
+    return accepted
+
+class PrecompressedStaticFiles(CachedStaticFiles):
+    """Phục vụ bản nén sẵn <file>.br / <file>.gz (tạo bởi manage build-assets) theo Accept-Encoding.
+       ETag/304 và Range request do FileResponse của Starlette xử lý; mỗi bản nén có ETag riêng.
+       extra_directories: thư mục dự phòng, tìm lần lượt sau `directory` (vd. mã nguồn khi chưa build)."""
+
+    def __init__(self, *args, extra_directories: Sequence[str] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.all_directories.extend(extra_directories)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted and "*" not in accepted:
+                continue
+            try:
+                compressed_stat = os.stat(f"{full_path}{suffix}")
+            except FileNotFoundError:
+                continue
+            response = super().file_response(f"{full_path}{suffix}", compressed_stat, scope, status_code)
+            if response.status_code != 304:
+                response.headers["Content-Encoding"] = encoding
+                content_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+                response.headers["Content-Type"] = f"{content_type}; charset=utf-8" if content_type.startswith("text/") else content_type
+            break
+        else:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
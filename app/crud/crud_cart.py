@@ -1,17 +1,21 @@
 from datetime import datetime
 from fastapi import HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import Optional, List
 from app.models.sqlmodels import ShoppingCart, ShoppingCartItem, Product
 from app.models import schemas
 from app.core.constants import ProductStatus
 
 class CRUDCart:
+    def _load_cart(self, db: Session, user_id: int) -> Optional[ShoppingCart]:
+        # Load items, product của item và ảnh sản phẩm (trả về trong giỏ) bằng số câu SQL cố định.
+        # Dùng lại sau khi ghi thay cho db.refresh(cart): refresh không tải lại ảnh -> mỗi item 1 câu SQL.
+        return db.query(ShoppingCart).filter(ShoppingCart.UserID == user_id).options(
+            joinedload(ShoppingCart.items).joinedload(ShoppingCartItem.product).selectinload(Product.images)
+        ).populate_existing().first()
+
     def get_user_cart(self, db: Session, user_id: int) -> Optional[ShoppingCart]:
-        # SỬA DÒNG NÀY: Load items VÀ Load luôn product nằm trong item đó
-        cart = db.query(ShoppingCart).filter(ShoppingCart.UserID == user_id).options(
-            joinedload(ShoppingCart.items).joinedload(ShoppingCartItem.product)
-        ).first()
+        cart = self._load_cart(db, user_id)
         
         if not cart:
             cart = self.create_cart(db, user_id)
@@ -71,8 +75,7 @@ class CRUDCart:
         db.add(cart) # Thêm dòng này để chắc chắn giỏ hàng được cập nhật LastUpdated
         
         db.commit()
-        db.refresh(cart)
-        return cart
+        return self._load_cart(db, user_id)
     
     def remove_item(self, db: Session, user_id: int, product_id: int) -> ShoppingCart:
         cart = self.get_user_cart(db, user_id)
@@ -80,15 +83,14 @@ class CRUDCart:
         if cart_item:
             db.delete(cart_item)
             db.commit()
-            db.refresh(cart)
+            return self._load_cart(db, user_id)
         return cart
 
     def clear_cart(self, db: Session, user_id: int) -> ShoppingCart:
         cart = self.get_user_cart(db, user_id)
         db.query(ShoppingCartItem).filter(ShoppingCartItem.CartID == cart.CartID).delete(synchronize_session=False)
         db.commit()
-        db.refresh(cart)
-        return cart
+        return self._load_cart(db, user_id)
     
     def update_item_quantity(self, db: Session, user_id: int, product_id: int, new_qty: int) -> ShoppingCart:
         cart = self.get_user_cart(db, user_id)
@@ -105,7 +107,6 @@ class CRUDCart:
         item.Quantity = new_qty
         db.add(item)
         db.commit()
-        db.refresh(cart)
-        return cart
+        return self._load_cart(db, user_id)
 
 cart_crud = CRUDCart()
\ No newline at end of file
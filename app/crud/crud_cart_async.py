@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models.sqlmodels import ShoppingCart, ShoppingCartItem, Product
+from app.models import schemas
+from app.core.constants import ProductStatus
+
+class AsyncCRUDCart:
+    """Bản async của CRUDCart. Sau mỗi thay đổi, giỏ hàng được đọc lại kèm items -> product -> images
+       (populate_existing) vì AsyncSession không lazy load được khi trả về response."""
+
+    async def _load_cart(self, db: AsyncSession, user_id: int) -> Optional[ShoppingCart]:
+        result = await db.execute(
+            select(ShoppingCart).where(ShoppingCart.UserID == user_id).options(
+                selectinload(ShoppingCart.items).selectinload(ShoppingCartItem.product).selectinload(Product.images)
+            ).execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def get_user_cart(self, db: AsyncSession, user_id: int) -> ShoppingCart:
+        cart = await self._load_cart(db, user_id)
+        if not cart:
+            db.add(ShoppingCart(UserID=user_id, LastUpdated=datetime.utcnow()))
+            await db.commit()
+            cart = await self._load_cart(db, user_id)
+        return cart
+
+    async def get_item_by_product(self, db: AsyncSession, cart_id: int, product_id: int) -> Optional[ShoppingCartItem]:
+        result = await db.execute(select(ShoppingCartItem).where(
+            ShoppingCartItem.CartID == cart_id,
+            ShoppingCartItem.ProductID == product_id
+        ))
+        return result.scalars().first()
+
+    async def add_or_update_item(self, db: AsyncSession, user_id: int, item_in: schemas.CartItemCreate) -> ShoppingCart:
+        cart = await self.get_user_cart(db, user_id)
+
+        result = await db.execute(select(Product).where(
+            Product.ProductID == item_in.ProductID,
+            Product.Status == ProductStatus.APPROVED,
+            Product.IsDeleted == False
+        ))
+        product = result.scalars().first()
+        if not product:
+            raise ValueError("Sản phẩm không tồn tại hoặc không còn bán.")
+
+        cart_item = await self.get_item_by_product(db, cart.CartID, item_in.ProductID)
+        if cart_item:
+            target_quantity = cart_item.Quantity + item_in.Quantity
+            if target_quantity > product.Quantity:
+                raise ValueError(f"Vượt quá kho.")
+            cart_item.Quantity = target_quantity
+        else:
+            db.add(ShoppingCartItem(
+                CartID=cart.CartID,
+                ProductID=item_in.ProductID,
+                Quantity=item_in.Quantity,
+                AddedDate=datetime.utcnow()
+            ))
+
+        cart.LastUpdated = datetime.utcnow()
+        await db.commit()
+        return await self._load_cart(db, user_id)
+
+    async def remove_item(self, db: AsyncSession, user_id: int, product_id: int) -> ShoppingCart:
+        cart = await self.get_user_cart(db, user_id)
+        cart_item = await self.get_item_by_product(db, cart.CartID, product_id)
+        if not cart_item:
+            return cart
+        await db.delete(cart_item)
+        await db.commit()
+        return await self._load_cart(db, user_id)
+
+    async def clear_cart(self, db: AsyncSession, user_id: int) -> ShoppingCart:
+        cart = await self.get_user_cart(db, user_id)
+        await db.execute(delete(ShoppingCartItem).where(ShoppingCartItem.CartID == cart.CartID))
+        await db.commit()
+        return await self._load_cart(db, user_id)
+
+    async def update_item_quantity(self, db: AsyncSession, user_id: int, product_id: int, new_qty: int) -> ShoppingCart:
+        cart = await self.get_user_cart(db, user_id)
+        item = await self.get_item_by_product(db, cart.CartID, product_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Sản phẩm không có trong giỏ.")
+
+        product = await db.get(Product, product_id)
+        if new_qty > product.Quantity:
+            raise ValueError(f"Kho chỉ còn {product.Quantity} sản phẩm.")
+
+        item.Quantity = new_qty
+        await db.commit()
+        return await self._load_cart(db, user_id)
+
+async_cart_crud = AsyncCRUDCart()
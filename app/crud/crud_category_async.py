@@ -0,0 +1,20 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.sqlmodels import Category
+
+class AsyncCRUDCategory:
+    """Bản async (chỉ đọc) của CRUDCategory, dùng cho API công khai khi bật ASYNC_DB_ENABLED."""
+
+    async def get_by_id(self, db: AsyncSession, category_id: int) -> Optional[Category]:
+        result = await db.execute(select(Category).where(
+            Category.CategoryID == category_id,
+            Category.IsDeleted == False
+        ))
+        return result.scalars().first()
+
+    async def get_all(self, db: AsyncSession) -> List[Category]:
+        result = await db.execute(select(Category).where(Category.IsDeleted == False))
+        return list(result.scalars().all())
+
+async_category_crud = AsyncCRUDCategory()
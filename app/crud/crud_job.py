@@ -0,0 +1,121 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import event, or_, and_, update
+from sqlalchemy.orm import Session
+from app.models.sqlmodels import BackgroundJob
+from app.core.config import settings
+from app.core.constants import JobStatus
+
+# Tiền tố JobType của các job "sự kiện" (sẽ được worker fan-out thành job cho từng handler)
+EVENT_JOB_PREFIX = "event:"
+
+# Đánh thức worker ngay khi có job mới được COMMIT trong cùng process
+job_available = threading.Event()
+
+@event.listens_for(Session, "after_commit")
+def _notify_new_jobs(session: Session) -> None:
+    if session.info.pop("has_new_jobs", False):
+        job_available.set()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_new_jobs(session: Session) -> None:
+    session.info.pop("has_new_jobs", None)
+
+class CRUDJob:
+    def enqueue(
+        self, db: Session, job_type: str, payload: Dict[str, Any],
+        max_attempts: Optional[int] = None, run_after: Optional[datetime] = None
+    ) -> BackgroundJob:
+        """Thêm job vào hàng đợi. KHÔNG commit: job được lưu cùng transaction của nghiệp vụ
+           (nếu nghiệp vụ rollback thì job cũng biến mất)."""
+        db_job = BackgroundJob(
+            JobType=job_type,
+            Payload=json.dumps(payload, default=str),
+            Status=JobStatus.PENDING,
+            Attempts=0,
+            MaxAttempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            RunAfter=run_after or datetime.utcnow()
+        )
+        db.add(db_job)
+        db.info["has_new_jobs"] = True
+        return db_job
+
+    def publish_event(self, db: Session, event_name: str, payload: Dict[str, Any]) -> BackgroundJob:
+        """Phát một sự kiện nghiệp vụ. Worker sẽ tạo job riêng cho từng handler đã đăng ký."""
+        return self.enqueue(db, f"{EVENT_JOB_PREFIX}{event_name}", payload)
+
+    def claim_next(self, db: Session) -> Optional[BackgroundJob]:
+        """Nhận 1 job đến hạn để xử lý. Dùng UPDATE có điều kiện trên Status nên
+           nhiều worker (kể cả ở nhiều process) không nhận trùng một job."""
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+        candidates = db.query(
+            BackgroundJob.JobID, BackgroundJob.Status, BackgroundJob.LockedAt, BackgroundJob.Attempts, BackgroundJob.MaxAttempts
+        ).filter(or_(
+            and_(BackgroundJob.Status == JobStatus.PENDING, BackgroundJob.RunAfter <= now),
+            # Job RUNNING bị treo (worker chết / chạy quá JOB_LOCK_TIMEOUT_SECONDS)
+            and_(BackgroundJob.Status == JobStatus.RUNNING, BackgroundJob.LockedAt < stale_before)
+        )).order_by(BackgroundJob.RunAfter, BackgroundJob.JobID).limit(10).all()
+
+        for job_id, job_status, locked_at, attempts, max_attempts in candidates:
+            # So khớp cả LockedAt để 2 worker không cùng nhận lại một job RUNNING bị treo
+            lock_condition = (
+                BackgroundJob.LockedAt.is_(None) if locked_at is None else BackgroundJob.LockedAt == locked_at
+            )
+            if job_status == JobStatus.RUNNING and attempts >= max_attempts:
+                # Hết lượt: FAILED luôn thay vì nhận lại mãi (job làm chết worker hoặc chạy quá lâu
+                # sẽ bị chạy lặp lại, có khi 2 bản cùng lúc)
+                db.execute(
+                    update(BackgroundJob)
+                    .where(BackgroundJob.JobID == job_id, BackgroundJob.Status == job_status, lock_condition)
+                    .values(
+                        Status=JobStatus.FAILED,
+                        LockedAt=None,
+                        LastError=f"Quá {settings.JOB_LOCK_TIMEOUT_SECONDS} giây không xong ở lần chạy cuối (hết lượt thử)",
+                        UpdatedAt=now
+                    )
+                )
+                db.commit()
+                continue
+            result = db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.JobID == job_id, BackgroundJob.Status == job_status, lock_condition)
+                .values(
+                    Status=JobStatus.RUNNING,
+                    LockedAt=now,
+                    Attempts=BackgroundJob.Attempts + 1,
+                    UpdatedAt=now
+                )
+            )
+            db.commit()
+            if result.rowcount == 1:
+                return db.get(BackgroundJob, job_id)
+        return None
+
+    def mark_done(self, db: Session, job: BackgroundJob) -> None:
+        """Đánh dấu hoàn thành. Không commit: worker commit cùng với thay đổi của handler."""
+        job.Status = JobStatus.DONE
+        job.LockedAt = None
+        job.LastError = None
+        db.add(job)
+
+    def mark_failed(self, db: Session, job_id: int, error: str) -> Optional[BackgroundJob]:
+        """Ghi nhận lỗi: lên lịch retry với exponential backoff, hoặc FAILED nếu hết lượt."""
+        job = db.get(BackgroundJob, job_id)
+        if not job:
+            return None
+        job.LastError = error
+        job.LockedAt = None
+        if job.Attempts >= job.MaxAttempts:
+            job.Status = JobStatus.FAILED
+        else:
+            delay = settings.JOB_RETRY_BASE_SECONDS * (2 ** (job.Attempts - 1))
+            job.Status = JobStatus.PENDING
+            job.RunAfter = datetime.utcnow() + timedelta(seconds=delay)
+        db.add(job)
+        db.commit()
+        return job
+
+job_crud = CRUDJob()
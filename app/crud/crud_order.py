@@ -1,17 +1,102 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload, selectinload
 # BỎ 'CartItem' ra khỏi dòng này vì file sqlmodels.py của bạn không có tên này
 from app.models.sqlmodels import ContactInfo, Order, OrderDetail, Product, User 
 from app.models import schemas
+from app.crud.crud_job import job_crud
+from app.core.constants import ORDER_PLACED_EVENT, ORDER_STATUS_CHANGED_EVENT
+
+# --- Cursor cho keyset pagination ---
+# Cursor là chuỗi "<khóa sắp xếp>_<ID>" của bản ghi cuối cùng ở trang trước.
+def _encode_cursor(sort_key, row_id: int) -> str:
+    if isinstance(sort_key, datetime):
+        sort_key = sort_key.isoformat()
+    return f"{sort_key}_{row_id}"
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        sort_key, row_id = cursor.rsplit("_", 1)
+        return sort_key, int(row_id)
+    except ValueError:
+        raise ValueError("Cursor phân trang không hợp lệ.")
 
 class CRUDOrder:
     def get_multi_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Order]:
-        return db.query(Order).filter(Order.UserID == user_id).offset(skip).limit(limit).all()
+        return db.query(Order).filter(
+            Order.BuyerID == user_id,
+            Order.IsDeleted == False
+        ).options(
+            selectinload(Order.details)
+        ).order_by(Order.OrderDate.desc(), Order.OrderID.desc()).offset(skip).limit(limit).all()
+
+    def get_history_by_buyer(
+        self, db: Session, buyer_id: int, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Order], Optional[str]]:
+        """Lịch sử mua hàng (mới nhất trước), phân trang keyset theo (OrderDate, OrderID).
+           Dùng index IX_Order_BuyerID_OrderDate nên không phụ thuộc số lượng đơn đã có."""
+        query = db.query(Order).filter(
+            Order.BuyerID == buyer_id,
+            Order.IsDeleted == False
+        )
+        if cursor:
+            sort_key, last_id = _decode_cursor(cursor)
+            try:
+                last_date = datetime.fromisoformat(sort_key)
+            except ValueError:
+                raise ValueError("Cursor phân trang không hợp lệ.")
+            query = query.filter(or_(
+                Order.OrderDate < last_date,
+                and_(Order.OrderDate == last_date, Order.OrderID < last_id)
+            ))
+
+        # Lấy dư 1 bản ghi để biết còn trang sau hay không
+        orders = query.options(
+            selectinload(Order.details)
+        ).order_by(Order.OrderDate.desc(), Order.OrderID.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = _encode_cursor(orders[-1].OrderDate, orders[-1].OrderID)
+        return orders, next_cursor
+
+    def get_sales_by_seller(
+        self, db: Session, seller_id: int, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[OrderDetail], Optional[str]]:
+        """Lịch sử bán hàng: các dòng OrderDetail của người bán (đơn mới nhất trước),
+           phân trang keyset theo (OrderID, OrderDetailID), dùng index IX_OrderDetail_SellerID_OrderID."""
+        query = db.query(OrderDetail).filter(OrderDetail.SellerID == seller_id)
+        if cursor:
+            last_order_id, last_detail_id = _decode_cursor(cursor)
+            try:
+                last_order_id = int(last_order_id)
+            except ValueError:
+                raise ValueError("Cursor phân trang không hợp lệ.")
+            query = query.filter(or_(
+                OrderDetail.OrderID < last_order_id,
+                and_(OrderDetail.OrderID == last_order_id, OrderDetail.OrderDetailID < last_detail_id)
+            ))
+
+        details = query.options(
+            joinedload(OrderDetail.order).load_only(Order.OrderDate, Order.OrderStatus),
+            joinedload(OrderDetail.product).load_only(Product.Title)
+        ).order_by(OrderDetail.OrderID.desc(), OrderDetail.OrderDetailID.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(details) > limit:
+            details = details[:limit]
+            next_cursor = _encode_cursor(details[-1].OrderID, details[-1].OrderDetailID)
+        return details, next_cursor
 
     def get_by_id(self, db: Session, order_id: int) -> Optional[Order]:
         return db.query(Order).options(joinedload(Order.details)).filter(Order.OrderID == order_id).first()
 
-    def create_simple_order(self, db: Session, user_id: int, payment_method_id: int, items_in: List[schemas.OrderDetailCreate]) -> Order:
+    def create_simple_order(
+        self, db: Session, user_id: int, payment_method_id: int, items_in: List[schemas.OrderDetailCreate],
+        transaction_code: Optional[str] = None
+    ) -> Order:
         user = db.query(User).filter(User.UserID == user_id).first()
         if not user:
             raise ValueError("Người dùng không tồn tại.")
@@ -56,8 +141,19 @@ class CRUDOrder:
             )
             db_order.details = order_details
             db.add(db_order)
+            db.flush() # Lấy OrderID cho sự kiện
 
-            # TẠM THỜI CHƯA XÓA GIỎ HÀNG Ở ĐÂY ĐỂ TRÁNH LỖI IMPORT
+            # Xóa giỏ hàng, ghi Transaction/SystemLog, báo người bán... chạy nền qua hàng đợi.
+            # Sự kiện được lưu cùng transaction với đơn hàng nên không bị mất nếu server dừng.
+            job_crud.publish_event(db, ORDER_PLACED_EVENT, {
+                "order_id": db_order.OrderID,
+                "buyer_id": user_id,
+                "payment_method_id": payment_method_id,
+                "amount": str(db_order.TotalAmount + db_order.ShippingFee),
+                "product_ids": sorted({d.ProductID for d in order_details}),
+                "seller_ids": sorted({d.SellerID for d in order_details}),
+                "transaction_code": transaction_code
+            })
             db.commit()
             db.refresh(db_order)
             return db_order
@@ -67,8 +163,16 @@ class CRUDOrder:
             raise e
 
     def update_status(self, db: Session, order: Order, new_status: int) -> Order:
+        old_status = order.OrderStatus
         order.OrderStatus = new_status
         db.add(order)
+        if old_status != new_status:
+            # Bảng tổng hợp doanh số được cập nhật ở nền (hủy đơn thì trừ doanh số)
+            job_crud.publish_event(db, ORDER_STATUS_CHANGED_EVENT, {
+                "order_id": order.OrderID,
+                "old_status": old_status,
+                "new_status": new_status
+            })
         db.commit()
         db.refresh(order)
         return order
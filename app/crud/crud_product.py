@@ -35,8 +35,8 @@ class CRUDProduct:
             Product.ProductID == product_id, 
             Product.IsDeleted == False
         ).options(
-            # Tải trước ProductImage, chỉ cần lấy ImageUrl và IsDefault
-            joinedload(Product.images).load_only(sqlmodels.ProductImage.ImageUrl, sqlmodels.ProductImage.IsDefault)
+            # Tải trước ProductImage (đủ các cột schemas.ProductImage trả về: thiếu cột nào là mỗi ảnh thêm 1 câu SQL)
+            joinedload(Product.images)
         ).first()
 
     def get_multiple(
@@ -58,7 +58,7 @@ class CRUDProduct:
                 # Sử dụng so sánh bằng cho một trạng thái
                 query = query.filter(Product.Status == status)
         query = query.options(
-            joinedload(Product.images).load_only(sqlmodels.ProductImage.ImageUrl, sqlmodels.ProductImage.IsDefault)
+            joinedload(Product.images)
         )
         return query.offset(skip).limit(limit).all()
     
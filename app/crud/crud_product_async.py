@@ -0,0 +1,36 @@
+from typing import List, Optional, Union
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models.sqlmodels import Product
+from app.core.constants import ProductStatus
+
+class AsyncCRUDProduct:
+    """Bản async (chỉ đọc) của CRUDProduct. AsyncSession không lazy load được,
+       nên ảnh sản phẩm luôn được tải trước bằng selectinload."""
+
+    async def get_by_id(self, db: AsyncSession, product_id: int) -> Optional[Product]:
+        result = await db.execute(select(Product).where(
+            Product.ProductID == product_id,
+            Product.IsDeleted == False
+        ).options(selectinload(Product.images)))
+        return result.scalars().first()
+
+    async def get_multiple(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[Union[int, List[int]]] = ProductStatus.APPROVED
+    ) -> List[Product]:
+        query = select(Product).where(Product.IsDeleted == False)
+        if status is not None:
+            if isinstance(status, list):
+                query = query.where(Product.Status.in_(status))
+            else:
+                query = query.where(Product.Status == status)
+        query = query.options(selectinload(Product.images)).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+async_product_crud = AsyncCRUDProduct()
@@ -0,0 +1,38 @@
+from datetime import date
+from typing import List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.sqlmodels import SellerDailySales, ProductDailySales, CategoryDailySales, Product
+
+class CRUDSalesStats:
+    """Đọc dữ liệu từ các bảng tổng hợp doanh số theo ngày (không quét OrderDetail)."""
+
+    def get_seller_daily(self, db: Session, seller_id: int, from_date: date, to_date: date) -> List[SellerDailySales]:
+        return db.query(SellerDailySales).filter(
+            SellerDailySales.SellerID == seller_id,
+            SellerDailySales.SalesDate >= from_date,
+            SellerDailySales.SalesDate <= to_date
+        ).order_by(SellerDailySales.SalesDate).all()
+
+    def get_seller_top_products(
+        self, db: Session, seller_id: int, from_date: date, to_date: date, limit: int = 5
+    ) -> list:
+        units = func.sum(ProductDailySales.UnitsSold)
+        return db.query(
+            ProductDailySales.ProductID,
+            Product.Title,
+            units.label("UnitsSold"),
+            func.sum(ProductDailySales.Revenue).label("Revenue")
+        ).join(Product, Product.ProductID == ProductDailySales.ProductID).filter(
+            ProductDailySales.SellerID == seller_id,
+            ProductDailySales.SalesDate >= from_date,
+            ProductDailySales.SalesDate <= to_date
+        ).group_by(ProductDailySales.ProductID, Product.Title).order_by(units.desc()).limit(limit).all()
+
+    def get_category_daily(self, db: Session, from_date: date, to_date: date) -> List[CategoryDailySales]:
+        return db.query(CategoryDailySales).filter(
+            CategoryDailySales.SalesDate >= from_date,
+            CategoryDailySales.SalesDate <= to_date
+        ).order_by(CategoryDailySales.SalesDate, CategoryDailySales.CategoryID).all()
+
+sales_stats_crud = CRUDSalesStats()
@@ -1,5 +1,6 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import Optional, List
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Optional, List, Tuple
 from datetime import datetime
 # Import các models cần thiết
 from app.models.sqlmodels import User, Role, UserRole, ShoppingCart 
@@ -38,7 +39,49 @@ class CRUDUser:
 
     def get_multiple(self, db: Session, skip: int = 0, limit: int = 100) -> List[User]:
         """Lấy danh sách người dùng (không bao gồm người dùng đã xóa)."""
-        return db.query(User).filter(User.IsDeleted == False).offset(skip).limit(limit).all()
+        # Các API danh sách lọc theo user_roles: tải trước để tránh mỗi người dùng 1 câu SQL
+        return db.query(User).filter(User.IsDeleted == False).options(
+            selectinload(User.user_roles)
+        ).offset(skip).limit(limit).all()
+
+    def get_page_by_role(
+        self, db: Session, role_id: int, limit: int = 20, cursor: Optional[str] = None, search: Optional[str] = None
+    ) -> Tuple[List[User], int, Optional[str]]:
+        """Danh sách người dùng có vai trò role_id, lọc trong SQL (JOIN UserRole) thay vì lọc sau khi phân trang.
+           Phân trang keyset theo UserID (cursor = UserID cuối trang trước), dùng index IX_UserRole_RoleID_UserID.
+           search: tìm trong Username/Email/FullName (không phân biệt hoa thường), hoặc đúng UserID nếu là số.
+           Trả về (users, tổng số bản ghi khớp bộ lọc, next_cursor)."""
+        query = db.query(User).join(UserRole, UserRole.UserID == User.UserID).filter(
+            UserRole.RoleID == role_id,
+            User.IsDeleted == False
+        )
+        if search:
+            search = search.strip()
+            conditions = [
+                User.Username.icontains(search, autoescape=True),
+                User.Email.icontains(search, autoescape=True),
+                User.FullName.icontains(search, autoescape=True)
+            ]
+            if search.isdigit():
+                conditions.append(User.UserID == int(search))
+            query = query.filter(or_(*conditions))
+
+        total = query.with_entities(func.count(UserRole.UserID)).scalar()
+
+        if cursor:
+            try:
+                last_id = int(cursor)
+            except ValueError:
+                raise ValueError("Cursor phân trang không hợp lệ.")
+            query = query.filter(UserRole.UserID > last_id)
+
+        # Lấy dư 1 bản ghi để biết còn trang sau hay không
+        users = query.order_by(UserRole.UserID).limit(limit + 1).all()
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = str(users[-1].UserID)
+        return users, total, next_cursor
 
     def create(self, db: Session, obj_in: schemas.UserCreate) -> User:
         """Tạo người dùng mới, bao gồm mã hóa mật khẩu và gán vai trò."""
@@ -0,0 +1,60 @@
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models.sqlmodels import User, UserRole, ShoppingCart
+from app.models import schemas
+from app.core.security import get_password_hash, create_random_key, verify_password
+from app.core.constants import DEFAULT_USER_ROLE_ID
+
+class AsyncCRUDUser:
+    """Bản async của các hàm CRUDUser dùng cho đăng ký/đăng nhập.
+       Hash/verify bcrypt tốn CPU nên chạy trong threadpool, không chặn event loop."""
+
+    def _select_active(self):
+        return select(User).where(User.IsDeleted == False).options(
+            selectinload(User.user_roles).selectinload(UserRole.role)
+        )
+
+    async def get_by_id(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        result = await db.execute(self._select_active().where(User.UserID == user_id))
+        return result.scalars().first()
+
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
+        result = await db.execute(self._select_active().where(User.Email == email))
+        return result.scalars().first()
+
+    async def create(self, db: AsyncSession, obj_in: schemas.UserCreate) -> User:
+        """Tạo người dùng mới với vai trò mặc định và giỏ hàng (giống CRUDUser.create)."""
+        random_key = create_random_key()
+        hashed_password = await run_in_threadpool(get_password_hash, obj_in.Password, random_key)
+
+        db_user = User(
+            Username=obj_in.Username,
+            Email=obj_in.Email,
+            PasswordHash=hashed_password,
+            RandomKey=random_key,
+            FullName=obj_in.FullName,
+            PhoneNumber=obj_in.PhoneNumber,
+            Address=obj_in.Address,
+            IsActive=True,
+            IsDeleted=False
+        )
+        db.add(db_user)
+        await db.flush() # Flush để lấy UserID
+
+        db.add(UserRole(UserID=db_user.UserID, RoleID=DEFAULT_USER_ROLE_ID))
+        db.add(ShoppingCart(UserID=db_user.UserID))
+        await db.commit()
+        return await self.get_by_id(db, db_user.UserID)
+
+    async def authenticate(self, db: AsyncSession, email: str, password: str) -> Optional[User]:
+        user = await self.get_by_email(db, email=email)
+        if not user:
+            return None
+        if await run_in_threadpool(verify_password, password, user.PasswordHash, user.RandomKey):
+            return user
+        return None
+
+async_user_crud = AsyncCRUDUser()
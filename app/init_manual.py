@@ -1,17 +1,15 @@
 # init_manual.py
-from app.core.database import SessionLocal, Base, engine
-from app.models import sqlmodels
-from app.initial_data import init_db
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from app.core.database import SessionLocal, Base, engine
+from app.core.database import SessionLocal
+from app.core.migrations import reset_database
+from app.models import sqlmodels
+from app.initial_data import init_db
 
 def reset_and_init_db():
     print("👉 Bắt đầu reset và khởi tạo lại database...")
-    # 1. Xóa toàn bộ bảng (nếu muốn reset hoàn toàn)
-    Base.metadata.drop_all(bind=engine)
-    # 2. Tạo lại tất cả bảng
-    Base.metadata.create_all(bind=engine)
+    # 1 + 2. Xóa toàn bộ bảng rồi tạo lại bằng migration Alembic
+    reset_database()
     print("✅ Database tables created.")
 
     # 3. Chạy khởi tạo dữ liệu mẫu
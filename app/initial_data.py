@@ -1,3 +1,5 @@
+from typing import List
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from app.models.sqlmodels import Role, Category, User, UserRole, PaymentMethod
 from app.core import security 
@@ -26,30 +28,23 @@ PAYMENT_METHODS_DATA = [
 ]
 
 # --- Hàm Seeder ---
+def _insert_missing(db: Session, model, key: str, rows: List[dict]) -> int:
+    """Upsert theo tập: 1 câu SELECT các khóa đã có + 1 câu INSERT (executemany) cho các dòng còn thiếu.
+       Dòng đã tồn tại được giữ nguyên nên chạy lại nhiều lần vẫn an toàn."""
+    column = getattr(model, key)
+    existing = set(db.scalars(select(column).where(column.in_([row[key] for row in rows]))))
+    missing = [row for row in rows if row[key] not in existing]
+    if missing:
+        db.execute(insert(model), missing)
+    return len(missing)
+
 def init_db(db: Session) -> None:
     print("Bắt đầu khởi tạo dữ liệu mẫu...")
     
-    # 1. Seed Roles
-    for role_data in ROLES_DATA:
-        role = db.query(Role).filter(Role.RoleID == role_data["RoleID"]).first()
-        if not role:
-            db_role = Role(**role_data)
-            db.add(db_role)
-    
-    # 2. Seed Categories
-    for cat_data in CATEGORIES_DATA:
-        category = db.query(Category).filter(Category.CategoryID == cat_data["CategoryID"]).first()
-        if not category:
-            db_cat = Category(**cat_data)
-            db.add(db_cat)
-
-    # 3. Seed Payment Methods
-    for method_data in PAYMENT_METHODS_DATA:
-        method = db.query(PaymentMethod).filter(PaymentMethod.PaymentMethodID == method_data["PaymentMethodID"]).first()
-        if not method:
-            db_method = PaymentMethod(**method_data)
-            db.add(db_method)
-    
+    # 1-3. Seed Roles, Categories, Payment Methods (mỗi bảng 2 câu SQL, không phụ thuộc số dòng)
+    _insert_missing(db, Role, "RoleID", ROLES_DATA)
+    _insert_missing(db, Category, "CategoryID", CATEGORIES_DATA)
+    _insert_missing(db, PaymentMethod, "PaymentMethodID", PAYMENT_METHODS_DATA)
     db.commit()
 
     # 4. Seed Admin User 
@@ -1,121 +1,242 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi.responses import HTMLResponse
-import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
-from app.core.database import engine, Base
 from app.models import sqlmodels 
-from app.initial_data import init_db
 from app.core.database import SessionLocal 
 from app.api.base import api_router
+from app.core.middleware import (
+    ReplicaStickinessMiddleware, QueryStatsMiddleware, UploadSizeLimitMiddleware, CompressionMiddleware, MetricsMiddleware,
+    RequestIdMiddleware,
+)
+from app.core.logging_setup import setup_logging, stop_logging
+from app.core.metrics import instrument_pool, mark_process_dead, metrics_available
+from app.core.query_stats import install_query_instrumentation
+from app.core.static_files import (
+    CachedStaticFiles, PrecompressedStaticFiles, IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+)
+from app.core.database import engine, replica_engine
 from fastapi import APIRouter
-from app.api.endpoints import auth, products, categories
-
-
-# --- 🛠️ HÀM TẠO BẢNG DATABASE (ĐƯỢC KÍCH HOẠT LẠI) ---
+from app.api.endpoints import auth, products, categories, health, metrics
+from app.services.job_queue import create_worker_pool
+from app.services.ranking_service import product_ranking, RankingRefresher
+from app.services.analytics_snapshot import AnalyticsSnapshotter
+from app.core.database import ReplicaSessionLocal
+from app.services import order_services, sales_rollup # Đăng ký các handler xử lý nền cho đơn hàng
+from app.services import image_variants # Handler tạo ảnh thu nhỏ (process pool)
+from app.services.image_store import IMAGE_STORE_DIR, IMAGE_STORE_URL
+from app.services.static_assets import load_asset_build
+from app.services.storefront import StorefrontRenderer
+from app.services.warmup import readiness, build_warmup_tasks
+from app.services.view_counter import view_counter
+
+logger = logging.getLogger(__name__)
+
+
+# --- 🛠️ HÀM TẠO/CẬP NHẬT SCHEMA DATABASE (Alembic migration) ---
 def create_tables():
-    """Tạo tất cả các bảng dựa trên Base.metadata."""
-    # Đảm bảo các models đã được import (như dòng 6) trước khi gọi Base.metadata.create_all
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully or already exist.")
+    """Áp dụng migration tới head (thay cho Base.metadata.create_all).
+       Database cũ tạo bằng create_all sẽ được stamp tự động rồi upgrade tiếp."""
+    from app.core.migrations import upgrade_database # Alembic nặng, chỉ import khi cần
+    upgrade_database()
+    logger.info("Database schema is up to date.")
 
 # --- 🛠️ HÀM KHỞI TẠO DỮ LIỆU BAN ĐẦU (ĐƯỢC KÍCH HOẠT LẠI) ---
 def initialize_database():
     """Tạo bảng và chèn dữ liệu khởi tạo."""
     create_tables() 
+    from app.initial_data import init_db
     try:
         db = SessionLocal()
         init_db(db)
-        print("Initial data inserted successfully.")
-    except Exception as e:
+        logger.info("Initial data inserted successfully.")
+    except Exception:
         # Lỗi này thường xảy ra nếu init_db được chạy nhiều lần.
-        print(f"Lỗi khi khởi tạo DB/Dữ liệu ban đầu (có thể do dữ liệu đã tồn tại): {e}")
+        logger.exception("Lỗi khi khởi tạo DB/Dữ liệu ban đầu (có thể do dữ liệu đã tồn tại)")
     finally:
         if 'db' in locals() and db:
             db.close() 
 
 # Khởi tạo Database ngay khi module main.py được loade
 # initialize_database()
+# (Migration tới head chạy trong lifespan nếu MIGRATE_ON_STARTUP; dữ liệu mẫu: gọi initialize_database thủ công)
+
+# --- VÒNG ĐỜI APP (lifespan) ---
+# Import module không có tác dụng phụ (không tạo thư mục, không chạy thread); mọi thứ cần chạy
+# được khởi động ở đây và dừng theo thứ tự ngược lại khi tắt.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging() # Trước tiên: log của các bước khởi động cũng đi qua hàng đợi
+    # Schema phải có trước khi job worker / bảng xếp hạng / warm-up đọc DB
+    if settings.MIGRATE_ON_STARTUP:
+        create_tables()
+    IMAGE_STORE_DIR.mkdir(parents=True, exist_ok=True)
+    storefront.precompile()
+    if settings.JOB_WORKER_ENABLED:
+        job_worker_pool.start()
+    ranking_refresher.start()
+    view_counter.start()
+    if settings.ANALYTICS_SNAPSHOT_INTERVAL_SECONDS > 0:
+        analytics_snapshotter.start()
+    # Warm-up chạy nền: /health/live trả lời ngay, /health/ready chờ warm-up xong
+    if settings.WARMUP_ENABLED:
+        readiness.start(build_warmup_tasks(storefront, ranking_refresher))
+    else:
+        readiness.mark_ready()
+    # SIGTERM: báo not-ready trước, SHUTDOWN_PRESTOP_SECONDS giây sau uvicorn mới ngừng nhận request
+    restore_signal_handler = readiness.drain_on_signal(settings.SHUTDOWN_PRESTOP_SECONDS)
+    try:
+        yield
+    finally:
+        if restore_signal_handler:
+            restore_signal_handler()
+        readiness.mark_not_ready()
+        analytics_snapshotter.stop()
+        view_counter.stop() # Ghi nốt lượt xem còn trong bộ nhớ
+        ranking_refresher.stop()
+        job_worker_pool.stop()
+        image_variants.shutdown_pool()
+        if settings.ASYNC_DB_ENABLED:
+            from app.core.database_async import dispose_async_engine
+            await dispose_async_engine()
+        mark_process_dead()
+        stop_logging() # Sau cùng: ghi nốt log của quá trình tắt
 
 # --- KHỞI TẠO APP FASTAPI ---
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
-# Cấu hình Static và Templates
-app.mount("/static", StaticFiles(directory="static"), name="static")
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-templates = Jinja2Templates(directory="app/templates")
+# Read-your-writes: sau khi ghi, client đọc từ primary một thời gian ngắn (chỉ cần khi có replica)
+if settings.DATABASE_REPLICA_URL:
+    app.add_middleware(ReplicaStickinessMiddleware)
+
+# Chặn sớm request tải lên quá lớn (theo Content-Length)
+app.add_middleware(UploadSizeLimitMiddleware)
 
-app.mount("/templates", StaticFiles(directory="app/templates"), name="templates")
-@app.get("/")
+# Nén response JSON/CSV/NDJSON của API theo Accept-Encoding (zstd/brotli/gzip)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Đo số câu SQL / thời gian DB của từng request (Server-Timing + log câu chậm)
+if settings.QUERY_STATS_ENABLED:
+    install_query_instrumentation(engine)
+    install_query_instrumentation(replica_engine)
+    app.add_middleware(QueryStatsMiddleware)
+
+# Metrics Prometheus (/metrics): thêm sau cùng -> middleware ngoài cùng, đo cả thời gian nén/đếm SQL
+if metrics_available():
+    instrument_pool(engine, "primary")
+    if replica_engine is not engine:
+        instrument_pool(replica_engine, "replica")
+    app.add_middleware(MetricsMiddleware)
+
+# Mã tương quan X-Request-ID: ngoài cùng để mọi log trong request (kể cả của middleware khác) đều có
+app.add_middleware(RequestIdMiddleware)
+
+# --- HÀNG ĐỢI XỬ LÝ NỀN (BackgroundJob) ---
+job_worker_pool = create_worker_pool(SessionLocal)
+
+# --- BẢNG XẾP HẠNG SẢN PHẨM (làm mới định kỳ ở nền) ---
+ranking_refresher = RankingRefresher(product_ranking, SessionLocal, settings.RANKING_REFRESH_SECONDS)
+
+# --- SNAPSHOT PARQUET CHO PHÂN TÍCH (chỉ khi ANALYTICS_SNAPSHOT_INTERVAL_SECONDS > 0) ---
+analytics_snapshotter = AnalyticsSnapshotter(ReplicaSessionLocal, settings.ANALYTICS_SNAPSHOT_INTERVAL_SECONDS)
+
+# Cấu hình Static và Templates
+# Ảnh lưu theo hash nội dung: URL bất biến -> cache 1 năm (mount trước "/static" để được khớp trước)
+# check_dir=False: thư mục được tạo trong lifespan, không phải lúc import
+app.mount(IMAGE_STORE_URL, CachedStaticFiles(
+    directory=IMAGE_STORE_DIR, check_dir=False, cache_control=IMMUTABLE_CACHE_CONTROL
+), name="product_images")
+app.mount("/static", PrecompressedStaticFiles(directory="static", cache_control=REVALIDATE_CACHE_CONTROL), name="static")
+
+# CSS/JS/ảnh giao diện: sau khi chạy `python -m app.manage build-assets`, HTML tham chiếu tới
+# ASSETS_URL/<tên có hash> (cache 1 năm, nén sẵn br/gzip). Chưa build -> phục vụ file gốc như trước.
+asset_build = load_asset_build()
+template_dirs = [str(asset_build / "templates"), settings.ASSETS_SOURCE_DIR] if asset_build else [settings.ASSETS_SOURCE_DIR]
+if asset_build:
+    app.mount(settings.ASSETS_URL, PrecompressedStaticFiles(directory=asset_build / "assets", cache_control=IMMUTABLE_CACHE_CONTROL), name="assets")
+templates = Jinja2Templates(directory=template_dirs)
+app.mount("/templates", PrecompressedStaticFiles(
+    directory=template_dirs[0], extra_directories=template_dirs[1:], cache_control=REVALIDATE_CACHE_CONTROL
+), name="templates")
+
+# --- TRANG HTML (render ở server + cache, xem services.storefront) ---
+storefront = StorefrontRenderer(templates, SessionLocal) # Đọc primary: không cache dữ liệu cũ của replica
+
+@app.get("/", response_class=HTMLResponse)
 def read_root(request: Request):
     """Render trang index.html."""
-    return templates.TemplateResponse("index.html", {"request": request})
-app.mount("/templates", StaticFiles(directory="app/templates"), name="templates")
+    return storefront.serve(request, "index.html")
 
-@app.get("/cart") # Đổi đường dẫn
+@app.get("/cart", response_class=HTMLResponse) # Đổi đường dẫn
 def cart_page(request: Request):
-    return templates.TemplateResponse("cart.html", {"request": request})
+    return storefront.serve(request, "cart.html")
 
-@app.get("/shop") # Đổi đường dẫn
+@app.get("/shop", response_class=HTMLResponse) # Đổi đường dẫn
 def shop_page(request: Request):
-    return templates.TemplateResponse("shop.html", {"request": request})
+    return storefront.serve(request, "shop.html")
 
-@app.get("/details") # Đổi đường dẫn
+@app.get("/details", response_class=HTMLResponse) # Đổi đường dẫn
 def details_page(request: Request):
-    return templates.TemplateResponse("details.html", {"request": request})
+    return storefront.serve(request, "details.html")
 
 # Router Dashboard Người dùng Quản lý:
 @app.get("/user/seller_dashboard.html", response_class=HTMLResponse)
-async def seller_dashboard_page(request: Request):
-    return templates.TemplateResponse("user/seller_dashboard.html", {"request": request})
+def seller_dashboard_page(request: Request):
+    return storefront.serve(request, "user/seller_dashboard.html")
 
 # Router Dashboard Moderator:
 @app.get("/moderator/moderator_dashboard.html", response_class=HTMLResponse)
-async def moderator_dashboard(request: Request):
+def moderator_dashboard(request: Request):
     """Phục vụ tệp HTML cho trang kiểm duyệt viên."""
-    return templates.TemplateResponse("moderator/moderator_dashboard.html", {"request": request})
+    return storefront.serve(request, "moderator/moderator_dashboard.html")
 @app.get("/moderator/moderator_products.html", response_class=HTMLResponse)
-async def moderator_product_page(request: Request):
-    return templates.TemplateResponse("moderator/moderator_products.html", {"request": request})
+def moderator_product_page(request: Request):
+    return storefront.serve(request, "moderator/moderator_products.html")
 @app.get("/moderator/moderator_users.html", response_class=HTMLResponse)
-async def moderator_users_page(request: Request):
-    return templates.TemplateResponse("moderator/moderator_users.html", {"request": request})
+def moderator_users_page(request: Request):
+    return storefront.serve(request, "moderator/moderator_users.html")
 @app.get("/moderator/moderator_profile.html", response_class=HTMLResponse)
-async def moderator_users_page(request: Request):
-    return templates.TemplateResponse("moderator/moderator_profile.html", {"request": request})
+def moderator_profile_page(request: Request):
+    return storefront.serve(request, "moderator/moderator_profile.html")
 
 # Router Dashboard Admin:
 @app.get("/admin/dashboard_admin.html", response_class=HTMLResponse)
-async def admin_dashboard(request: Request):
+def admin_dashboard(request: Request):
     """Phục vụ tệp HTML cho trang quản trị."""
-    return templates.TemplateResponse("admin/dashboard_admin.html", {"request": request})
+    return storefront.serve(request, "admin/dashboard_admin.html")
 
 # Router Admin Quản lý các tài khoản:
 @app.get("/admin/admin_moderators.html", response_class=HTMLResponse)
-async def admin_moderators_page(request: Request):
-    return templates.TemplateResponse("admin/admin_moderators.html", {"request": request})
+def admin_moderators_page(request: Request):
+    return storefront.serve(request, "admin/admin_moderators.html")
 @app.get("/admin/admin_users.html", response_class=HTMLResponse)
-async def admin_users_page(request: Request): 
-    return templates.TemplateResponse("admin/admin_users.html", {"request": request})
+def admin_users_page(request: Request): 
+    return storefront.serve(request, "admin/admin_users.html")
 @app.get("/admin/admin_categories.html", response_class=HTMLResponse)
-async def admin_users_page(request: Request): 
-    return templates.TemplateResponse("admin/admin_categories.html", {"request": request})
+def admin_categories_page(request: Request): 
+    return storefront.serve(request, "admin/admin_categories.html")
 @app.get("/admin/admin_products.html", response_class=HTMLResponse)
-async def admin_users_page(request: Request): 
-    return templates.TemplateResponse("admin/admin_products.html", {"request": request})
+def admin_products_page(request: Request): 
+    return storefront.serve(request, "admin/admin_products.html")
 @app.get("/admin/admin_profile.html", response_class=HTMLResponse)
-async def admin_users_page(request: Request): 
-    return templates.TemplateResponse("admin/admin_profile.html", {"request": request})
+def admin_profile_page(request: Request): 
+    return storefront.serve(request, "admin/admin_profile.html")
 
 # ROUTE CHÍNH
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(products.router, prefix="/api/products")
+app.include_router(health.router, prefix="/health", tags=["Health"]) # Cho load balancer / orchestrator
+app.include_router(metrics.router)
 
 if __name__ == "__main__":
     # Đảm bảo uvicorn chạy đúng file app
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,264 @@
+# manage.py - Các lệnh quản trị chạy từ dòng lệnh
+# Ví dụ: python -m app.manage rebuild-rollups | migrate | check-indexes | export orders -f ndjson -o orders.ndjson | snapshot
+#        python -m app.manage import-products --seller-id 3 products.csv --images images.zip
+#        python -m app.manage generate --users 100000 --products 1000000 --orders 500000 --seed 42
+import argparse
+from contextlib import nullcontext
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.core.database import SessionLocal
+from app.models import sqlmodels
+
+def cmd_rebuild_rollups(args) -> None:
+    """Dựng lại các bảng tổng hợp doanh số theo ngày từ OrderDetail."""
+    from app.services.sales_rollup import rebuild_rollups
+    db = SessionLocal()
+    try:
+        result = rebuild_rollups(db)
+        for table, count in result.items():
+            print(f"✅ {table}: {count} dòng")
+    finally:
+        db.close()
+
+def cmd_migrate(args) -> None:
+    """Áp dụng migration Alembic tới revision chỉ định (mặc định: head)."""
+    from app.core.migrations import upgrade_database
+    upgrade_database(args.revision)
+    print(f"✅ Database đã ở revision {args.revision}")
+
+def cmd_check_indexes(args) -> None:
+    """Chạy EXPLAIN cho các truy vấn nóng, báo lỗi nếu có truy vấn quét toàn bảng."""
+    from app.core.query_plans import explain_hot_queries
+    db = SessionLocal()
+    try:
+        results = explain_hot_queries(db)
+    finally:
+        db.close()
+    for result in results:
+        print(f"{'✅' if result.uses_index else '❌'} {result.name}")
+        for line in result.plan:
+            print(f"     {line}")
+        if args.verbose:
+            print(f"     SQL: {result.sql}")
+    missing = [r.name for r in results if not r.uses_index]
+    if missing:
+        print(f"❌ {len(missing)} truy vấn chưa dùng index: {', '.join(missing)}")
+        sys.exit(1)
+
+def cmd_export(args) -> None:
+    """Xuất users/products/orders ra CSV hoặc NDJSON (stream theo lô, bộ nhớ không đổi)."""
+    from app.services.export_service import stream_export
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for chunk in stream_export(SessionLocal, args.dataset, args.format):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+    if args.output:
+        print(f"✅ Đã xuất {args.dataset} ra {args.output}", file=sys.stderr)
+
+def cmd_snapshot(args) -> None:
+    """Ghi snapshot Parquet tăng dần (theo high-water mark) cho phân tích offline."""
+    from app.core.database import ReplicaSessionLocal
+    from app.services.analytics_snapshot import reset_snapshot, run_snapshot
+    tables = args.tables or None
+    if args.reset:
+        reset_snapshot(args.directory, tables)
+    counts = run_snapshot(ReplicaSessionLocal, args.directory, tables)
+    for table, count in counts.items():
+        print(f"✅ {table}: {count} dòng mới")
+
+def cmd_import_products(args) -> None:
+    """Nhập sản phẩm hàng loạt từ CSV/JSONL (+ file zip ảnh) cho 1 người bán."""
+    from app.services.product_import import guess_format, import_products
+    fmt = args.format or guess_format(args.file)
+    if fmt is None:
+        print("❌ Không xác định được định dạng, dùng -f csv|jsonl", file=sys.stderr)
+        sys.exit(2)
+    db = SessionLocal()
+    try:
+        with open(args.file, "rb") as rows, (open(args.images, "rb") if args.images else nullcontext()) as archive:
+            result = import_products(db, args.seller_id, rows, fmt, archive)
+    finally:
+        db.close()
+    print(f"✅ Đã tạo {result.Created} sản phẩm")
+    for error in result.Errors:
+        print(f"❌ Dòng {error.Row}: {error.Error}")
+    if result.Errors:
+        sys.exit(1)
+
+def cmd_generate(args) -> None:
+    """Sinh dữ liệu giả lập khối lượng lớn (cùng seed -> cùng dữ liệu) để đo hiệu năng."""
+    from app.core.migrations import upgrade_database
+    from app.initial_data import init_db
+    from app.synthetic_data import GeneratorConfig, SYNTHETIC_PASSWORD, generate
+    upgrade_database()
+    config = GeneratorConfig(
+        users=args.users, products=args.products, orders=args.orders, seed=args.seed, batch_size=args.batch_size,
+        popularity_skew=args.popularity_skew, seller_skew=args.seller_skew, days=args.days
+    )
+    db = SessionLocal()
+    try:
+        init_db(db)
+        generate(db, config)
+    finally:
+        db.close()
+    print(f"✅ Đăng nhập bằng synthetic0@example.com ... synthetic{config.moderators + config.login_users - 1}@example.com, mật khẩu '{SYNTHETIC_PASSWORD}' (synthetic0-{config.moderators - 1} là Moderator)")
+
+def cmd_image_variants(args) -> None:
+    """Tạo ảnh thu nhỏ cho các ảnh chưa có (ảnh tải lên trước khi có tính năng, hoặc job bị lỗi)."""
+    from app.models.sqlmodels import ProductImage
+    from app.services.image_variants import generate_for_images, pillow_available, reuse_existing_variants, shutdown_pool
+    if not pillow_available():
+        print("❌ Cần cài Pillow: pip install Pillow", file=sys.stderr)
+        sys.exit(2)
+    db = SessionLocal()
+    last_id, total = 0, 0
+    try:
+        while True:
+            # Phân trang theo khóa (ImageID) thay vì OFFSET
+            images = db.query(ProductImage).filter(
+                ProductImage.ImageID > last_id,
+                ProductImage.Variants.is_(None),
+                ProductImage.IsDeleted == False
+            ).order_by(ProductImage.ImageID).limit(args.batch_size).all()
+            if not images:
+                break
+            last_id = images[-1].ImageID
+            total += generate_for_images(reuse_existing_variants(db, images))
+            db.commit()
+            print(f"... ImageID <= {last_id}")
+    finally:
+        db.close()
+        shutdown_pool()
+    print(f"✅ Đã tạo ảnh thu nhỏ cho {total} ảnh")
+
+def cmd_store_images(args) -> None:
+    """Chuyển ảnh cũ (product_{id}_{index}) sang kho ảnh theo hash. File cũ được giữ lại (có thể còn URL cũ trong cache)."""
+    from app.models.sqlmodels import ProductImage
+    from app.services.image_store import store_image
+    from app.services.image_variants import local_path
+    from app.services.upload_storage import UploadRejected, stage_stream
+    db = SessionLocal()
+    last_id, moved = 0, 0
+    try:
+        while True:
+            images = db.query(ProductImage).filter(
+                ProductImage.ImageID > last_id, ProductImage.ContentHash.is_(None)
+            ).order_by(ProductImage.ImageID).limit(args.batch_size).all()
+            if not images:
+                break
+            last_id = images[-1].ImageID
+            for image in images:
+                source = local_path(image.ImageUrl)
+                if source is None or not source.exists():
+                    continue
+                try:
+                    with source.open("rb") as stream:
+                        staged = stage_stream(stream, source.name)
+                except UploadRejected as e:
+                    print(f"❌ ImageID={image.ImageID}: {e}")
+                    continue
+                image.ImageUrl = store_image(staged)
+                image.ContentHash = staged.sha256
+                image.Variants = None # Tạo lại bằng: python -m app.manage image-variants
+                moved += 1
+            db.commit()
+    finally:
+        db.close()
+    print(f"✅ Đã chuyển {moved} ảnh sang kho theo hash")
+
+def cmd_gc_images(args) -> None:
+    """Xóa ảnh trong kho theo hash không còn ProductImage nào tham chiếu."""
+    from app.services.image_store import collect_garbage
+    db = SessionLocal()
+    try:
+        removed = collect_garbage(db, args.grace_hours * 3600, dry_run=args.dry_run)
+    finally:
+        db.close()
+    for path in removed:
+        print(f"{'(dry-run) ' if args.dry_run else ''}🗑 {path}")
+    print(f"✅ {len(removed)} file không còn được tham chiếu")
+
+def cmd_build_assets(args) -> None:
+    """Đặt hash vào tên file CSS/JS/ảnh giao diện, nén sẵn gzip/brotli và đổi tham chiếu trong HTML."""
+    from app.services.static_assets import build_assets
+    try:
+        import brotli
+    except ImportError:
+        print("⚠️ Chưa cài brotli: chỉ tạo bản nén gzip (pip install brotli)")
+    manifest = build_assets()
+    print(f"✅ Đã build {len(manifest)} tài nguyên tĩnh (khởi động lại app để dùng bản build)")
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description="Lệnh quản trị OldShop")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser("rebuild-rollups", help="Dựng lại bảng tổng hợp doanh số theo ngày")
+    rebuild.set_defaults(func=cmd_rebuild_rollups)
+
+    migrate = subparsers.add_parser("migrate", help="Áp dụng migration Alembic (thay cho create_all)")
+    migrate.add_argument("revision", nargs="?", default="head")
+    migrate.set_defaults(func=cmd_migrate)
+
+    check_indexes = subparsers.add_parser("check-indexes", help="EXPLAIN các truy vấn nóng, kiểm tra có dùng index")
+    check_indexes.add_argument("-v", "--verbose", action="store_true", help="In kèm câu SQL")
+    check_indexes.set_defaults(func=cmd_check_indexes)
+
+    from app.services.export_service import EXPORT_DATASETS, EXPORT_FORMATS
+    export = subparsers.add_parser("export", help="Xuất dữ liệu ra CSV/NDJSON")
+    export.add_argument("dataset", choices=list(EXPORT_DATASETS))
+    export.add_argument("-f", "--format", choices=EXPORT_FORMATS, default="csv")
+    export.add_argument("-o", "--output", help="File đích (mặc định: stdout)")
+    export.set_defaults(func=cmd_export)
+
+    from app.services.analytics_snapshot import SNAPSHOT_TABLES
+    snapshot = subparsers.add_parser("snapshot", help="Ghi snapshot Parquet tăng dần (cần pyarrow)")
+    snapshot.add_argument("-t", "--table", dest="tables", action="append", choices=list(SNAPSHOT_TABLES),
+                          help="Chỉ xuất bảng này (lặp lại được; mặc định: tất cả)")
+    snapshot.add_argument("-d", "--directory", help="Thư mục đích (mặc định: ANALYTICS_SNAPSHOT_DIR)")
+    snapshot.add_argument("--reset", action="store_true", help="Xóa snapshot cũ và xuất lại toàn bộ")
+    snapshot.set_defaults(func=cmd_snapshot)
+
+    import_products = subparsers.add_parser("import-products", help="Nhập sản phẩm hàng loạt từ CSV/JSONL")
+    import_products.add_argument("file", help="File .csv hoặc .jsonl")
+    import_products.add_argument("--seller-id", type=int, required=True)
+    import_products.add_argument("--images", help="File .zip chứa ảnh (tên ảnh ghi ở cột Images)")
+    import_products.add_argument("-f", "--format", choices=("csv", "jsonl"))
+    import_products.set_defaults(func=cmd_import_products)
+
+    from app.synthetic_data import GeneratorConfig
+    defaults = GeneratorConfig()
+    generate = subparsers.add_parser("generate", help="Sinh dữ liệu giả lập khối lượng lớn để đo hiệu năng")
+    generate.add_argument("--users", type=int, default=defaults.users)
+    generate.add_argument("--products", type=int, default=defaults.products)
+    generate.add_argument("--orders", type=int, default=defaults.orders)
+    generate.add_argument("--seed", type=int, default=defaults.seed)
+    generate.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    generate.add_argument("--popularity-skew", type=float, default=defaults.popularity_skew, help="Hệ số Zipf độ phổ biến sản phẩm")
+    generate.add_argument("--seller-skew", type=float, default=defaults.seller_skew, help="Hệ số Zipf số sản phẩm mỗi người bán")
+    generate.add_argument("--days", type=int, default=defaults.days, help="Đơn hàng / sản phẩm rải trong N ngày gần nhất")
+    generate.set_defaults(func=cmd_generate)
+
+    image_variants = subparsers.add_parser("image-variants", help="Tạo ảnh thu nhỏ WebP/AVIF còn thiếu (cần Pillow)")
+    image_variants.add_argument("--batch-size", type=int, default=100)
+    image_variants.set_defaults(func=cmd_image_variants)
+
+    store_images = subparsers.add_parser("store-images", help="Chuyển ảnh cũ sang kho ảnh theo hash nội dung")
+    store_images.add_argument("--batch-size", type=int, default=100)
+    store_images.set_defaults(func=cmd_store_images)
+
+    gc_images = subparsers.add_parser("gc-images", help="Dọn ảnh trong kho theo hash không còn được tham chiếu")
+    gc_images.add_argument("--grace-hours", type=int, default=24, help="Bỏ qua file mới hơn N giờ (transaction có thể chưa commit)")
+    gc_images.add_argument("--dry-run", action="store_true", help="Chỉ liệt kê, không xóa")
+    gc_images.set_defaults(func=cmd_gc_images)
+
+    build_assets = subparsers.add_parser("build-assets", help="Build tài nguyên tĩnh: tên file có hash + nén sẵn gzip/brotli")
+    build_assets.set_defaults(func=cmd_build_assets)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
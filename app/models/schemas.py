@@ -1,9 +1,9 @@
 from pydantic import BaseModel, EmailStr, validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from pydantic import BaseModel, EmailStr
-from app.core.constants import ProductStatus
+from app.core.constants import ProductStatus, OrderStatus
 
 # --- SCHEMAS CHO ROLE ---
 class RoleBase(BaseModel):
@@ -72,6 +72,13 @@ class User(UserBase):
     class Config:
         from_attributes = True
 
+# --- SCHEMA DANH SÁCH NGƯỜI DÙNG THEO VAI TRÒ (KEYSET PAGINATION) ---
+class UserPage(BaseModel):
+    """Một trang người dùng. total là tổng số bản ghi khớp bộ lọc (không phụ thuộc trang)."""
+    items: List[User] = []
+    total: int = 0
+    next_cursor: Optional[str] = None
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -116,11 +123,20 @@ class Category(CategoryBase):
 class ProductImageCreate(BaseModel):
     ImageUrl: str
     IsDefault: Optional[bool] = False
+    ContentHash: Optional[str] = None # SHA-256 nội dung (ảnh lưu theo hash)
+
+class ImageVariant(BaseModel):
+    """Một bản thu nhỏ của ảnh gốc (tạo ở nền sau khi tải lên)."""
+    Width: int
+    Format: str # "webp" | "avif"
+    Url: str
+    Bytes: int
 
 class ProductImage(ProductImageCreate):
     ImageID: int
     ProductID: int
     IsDeleted: bool
+    Variants: Optional[List[ImageVariant]] = None # None = chưa tạo xong
 
     class Config:
         from_attributes = True
@@ -158,6 +174,7 @@ class Product(ProductBase):
     UpdatedAt: Optional[datetime] = None
     
     PrimaryImageUrl: Optional[str] = None
+    PrimaryImageSrcset: Optional[str] = None # Dùng cho <img srcset>: "url 320w, url 640w, ..."
     # Mối quan hệ: Thêm images
     images: List[ProductImage] = [] 
     
@@ -165,6 +182,22 @@ class Product(ProductBase):
         from_attributes = True
         json_encoders = {Decimal: float}
 
+# --- SCHEMA CHO BẢNG XẾP HẠNG SẢN PHẨM (bán chạy / thịnh hành) ---
+class RankedProduct(BaseModel):
+    """Thông tin rút gọn của sản phẩm trong bảng xếp hạng (được tính sẵn và giữ trong bộ nhớ)."""
+    ProductID: int
+    Title: str
+    Price: Decimal
+    CategoryID: int
+    PrimaryImageUrl: Optional[str] = None
+    PrimaryImageSrcset: Optional[str] = None
+    UnitsSold: int = 0
+    ViewCount: int = 0
+    Score: float = 0
+
+    class Config:
+        json_encoders = {Decimal: float}
+
 # --- BỔ SUNG: SCHEMA CẬP NHẬT TRẠNG THÁI SẢN PHẨM ---
 class ProductStatusUpdate(BaseModel):
     """Schema đơn giản dùng cho Moderator/Admin cập nhật trạng thái sản phẩm."""
@@ -185,6 +218,16 @@ class ProductStatusUpdate(BaseModel):
         
         return value
 
+# --- SCHEMA CHO NHẬP SẢN PHẨM HÀNG LOẠT (CSV/JSONL + file zip ảnh) ---
+class ProductImportError(BaseModel):
+    Row: int # Số thứ tự dòng dữ liệu (bắt đầu từ 1, không tính dòng tiêu đề CSV)
+    Error: str
+
+class ProductImportResult(BaseModel):
+    Created: int = 0
+    ProductIDs: List[int] = []
+    Errors: List[ProductImportError] = []
+
 # --- SCHEMAS CHO PAYMENT METHOD ---
 class PaymentMethodBase(BaseModel):
     MethodName: str
@@ -331,6 +374,74 @@ class Order(BaseModel):
         from_attributes = True
         json_encoders = {Decimal: float}
 
+# --- SCHEMAS CHO LỊCH SỬ ĐƠN HÀNG (KEYSET PAGINATION) ---
+class OrderHistoryPage(BaseModel):
+    """Một trang lịch sử mua hàng. Truyền next_cursor vào tham số cursor để lấy trang sau."""
+    items: List[Order] = []
+    next_cursor: Optional[str] = None
+
+class SellerSaleLine(OrderDetail):
+    """Một dòng bán hàng của Seller, kèm thông tin đơn hàng và tên sản phẩm."""
+    OrderDate: datetime
+    OrderStatus: int
+    ProductTitle: Optional[str] = None
+
+class SellerSalesPage(BaseModel):
+    items: List[SellerSaleLine] = []
+    next_cursor: Optional[str] = None
+
+class OrderStatusUpdate(BaseModel):
+    """Schema dùng cho Moderator/Admin cập nhật trạng thái đơn hàng."""
+    OrderStatus: int
+
+    @validator('OrderStatus')
+    def validate_order_status(cls, value):
+        if value not in [s.value for s in OrderStatus]:
+            raise ValueError('Trạng thái đơn hàng không hợp lệ. Phải từ 0 (PENDING) đến 4 (CANCELED).')
+        return value
+
+# --- SCHEMAS CHO THỐNG KÊ DOANH SỐ (đọc từ bảng tổng hợp theo ngày) ---
+class DailySales(BaseModel):
+    SalesDate: date
+    OrderCount: int
+    UnitsSold: int
+    Revenue: Decimal
+
+    class Config:
+        from_attributes = True
+        json_encoders = {Decimal: float}
+
+class CategoryDailySales(DailySales):
+    CategoryID: int
+
+class ProductSalesSummary(BaseModel):
+    ProductID: int
+    Title: Optional[str] = None
+    UnitsSold: int
+    Revenue: Decimal
+
+    class Config:
+        from_attributes = True
+        json_encoders = {Decimal: float}
+
+class SellerStats(BaseModel):
+    SellerID: int
+    FromDate: date
+    ToDate: date
+    OrderCount: int = 0
+    UnitsSold: int = 0
+    Revenue: Decimal = Decimal(0)
+    daily: List[DailySales] = []
+    top_products: List[ProductSalesSummary] = []
+
+    class Config:
+        json_encoders = {Decimal: float}
+
+class CategoryStats(BaseModel):
+    FromDate: date
+    ToDate: date
+    daily: List[CategoryDailySales] = []
+
 # --- SCHEMAS CHO TRANSACTION ---
 class TransactionBase(BaseModel):
     OrderID: int
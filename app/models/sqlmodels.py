@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, SmallInteger, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Numeric, Text, SmallInteger, UniqueConstraint, Index, JSON, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -6,6 +6,9 @@ from app.core.database import Base # Giả định Base được import
 
 # Base = declarative_base() # Giả sử bạn sử dụng Base từ app.core.database
 
+# Điều kiện của các index partial: chỉ index các dòng chưa bị xóa mềm (khớp với IsDeleted == False)
+NOT_DELETED = text("IsDeleted = 0")
+
 # --- Bảng User (CẬP NHẬT) ---
 class User(Base):
     __tablename__ = "User"
@@ -44,6 +47,11 @@ class UserRole(Base):
     # UserRoleID không có trong SQL, dùng Primary Key kép (UserID, RoleID)
     UserID = Column(Integer, ForeignKey("User.UserID"), primary_key=True, nullable=False) 
     RoleID = Column(Integer, ForeignKey("Role.RoleID"), primary_key=True, nullable=False)
+
+    __table_args__ = (
+        # Danh sách người dùng theo vai trò (lọc RoleID, phân trang keyset theo UserID)
+        Index('IX_UserRole_RoleID_UserID', 'RoleID', 'UserID'),
+    )
     
     user = relationship("User", back_populates="user_roles")
     role = relationship("Role", back_populates="user_roles")
@@ -75,6 +83,11 @@ class Product(Base):
     CreatedAt = Column(DateTime, default=datetime.utcnow, nullable=False)
     UpdatedAt = Column(DateTime, onupdate=datetime.utcnow) # Thêm UpdatedAt
 
+    __table_args__ = (
+        # Danh sách sản phẩm theo trạng thái và ứng viên thịnh hành (lọc theo CreatedAt)
+        Index('IX_Product_Status_CreatedAt', 'Status', 'CreatedAt', sqlite_where=NOT_DELETED, mssql_where=NOT_DELETED),
+    )
+
     category = relationship("Category")
     seller = relationship("User", foreign_keys=[SellerID])
     images = relationship("ProductImage", back_populates="product")
@@ -88,6 +101,15 @@ class ProductImage(Base):
     ImageUrl = Column(String(500), nullable=False)
     IsDefault = Column(Boolean, default=False, nullable=False)
     IsDeleted = Column(Boolean, default=False, nullable=False)
+    # Ảnh thu nhỏ WebP/AVIF tạo ở nền (xem services.image_variants). NULL = chưa tạo
+    Variants = Column(JSON(none_as_null=True), nullable=True)
+    # SHA-256 nội dung ảnh (xem services.image_store). NULL = ảnh cũ lưu theo tên product_{id}_{index}
+    ContentHash = Column(String(64), nullable=True)
+
+    __table_args__ = (
+        Index('IX_ProductImage_ProductID', 'ProductID'),
+        Index('IX_ProductImage_ContentHash', 'ContentHash'),
+    )
     
     product = relationship("Product", back_populates="images")
 
@@ -128,6 +150,11 @@ class Order(Base):
     OrderStatus = Column(SmallInteger, default=0, nullable=False) 
     IsDeleted = Column(Boolean, default=False, nullable=False)
 
+    __table_args__ = (
+        # Lịch sử mua hàng: lọc theo người mua, sắp xếp theo ngày đặt (keyset pagination)
+        Index('IX_Order_BuyerID_OrderDate', 'BuyerID', 'OrderDate'),
+    )
+
     buyer = relationship("User", foreign_keys=[BuyerID], back_populates="orders")
     contact = relationship("ContactInfo")
     payment_method = relationship("PaymentMethod")
@@ -143,6 +170,13 @@ class OrderDetail(Base):
     Price = Column(Numeric(18, 2), nullable=False) 
     Quantity = Column(Integer, nullable=False)
 
+    __table_args__ = (
+        # Lịch sử bán hàng: lọc theo người bán, sắp xếp theo đơn hàng (keyset pagination)
+        Index('IX_OrderDetail_SellerID_OrderID', 'SellerID', 'OrderID'),
+        # Tải chi tiết theo đơn hàng
+        Index('IX_OrderDetail_OrderID', 'OrderID'),
+    )
+
     order = relationship("Order", back_populates="details")
     product = relationship("Product")
     seller = relationship("User", foreign_keys=[SellerID])
@@ -231,4 +265,55 @@ class SystemLog(Base):
     Description = Column(Text)
     LogTime = Column(DateTime, default=datetime.utcnow, nullable=False)
     
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+# --- Bảng MỚI: BackgroundJob (Hàng đợi xử lý nền, lưu trong DB) ---
+class BackgroundJob(Base):
+    __tablename__ = "BackgroundJob"
+    JobID = Column(Integer, primary_key=True, index=True)
+    JobType = Column(String(100), nullable=False) # Tên handler, hoặc "event:<tên sự kiện>"
+    Payload = Column(Text, nullable=False) # JSON
+    Status = Column(SmallInteger, default=0, nullable=False) # 0: Pending, 1: Running, 2: Done, 3: Failed
+    Attempts = Column(Integer, default=0, nullable=False)
+    MaxAttempts = Column(Integer, default=5, nullable=False)
+    RunAfter = Column(DateTime, default=datetime.utcnow, nullable=False) # Thời điểm sớm nhất được chạy (retry backoff)
+    LockedAt = Column(DateTime)
+    LastError = Column(Text)
+    CreatedAt = Column(DateTime, default=datetime.utcnow, nullable=False)
+    UpdatedAt = Column(DateTime, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Worker lấy job theo (Status, RunAfter)
+        Index('IX_BackgroundJob_Status_RunAfter', 'Status', 'RunAfter'),
+    )
+
+# --- Bảng tổng hợp doanh số theo ngày (cập nhật tăng dần khi có đơn hàng / đổi trạng thái) ---
+# Chỉ tính các đơn chưa bị hủy. Có thể dựng lại toàn bộ bằng: python -m app.manage rebuild-rollups
+class SellerDailySales(Base):
+    __tablename__ = "SellerDailySales"
+    SellerID = Column(Integer, ForeignKey("User.UserID"), primary_key=True)
+    SalesDate = Column(Date, primary_key=True)
+    OrderCount = Column(Integer, default=0, nullable=False)
+    UnitsSold = Column(Integer, default=0, nullable=False)
+    Revenue = Column(Numeric(18, 2), default=0, nullable=False)
+
+class ProductDailySales(Base):
+    __tablename__ = "ProductDailySales"
+    ProductID = Column(Integer, ForeignKey("Product.ProductID"), primary_key=True)
+    SalesDate = Column(Date, primary_key=True)
+    SellerID = Column(Integer, ForeignKey("User.UserID"), nullable=False) # Lưu kèm để lấy top sản phẩm của Seller
+    OrderCount = Column(Integer, default=0, nullable=False)
+    UnitsSold = Column(Integer, default=0, nullable=False)
+    Revenue = Column(Numeric(18, 2), default=0, nullable=False)
+
+    __table_args__ = (
+        Index('IX_ProductDailySales_SellerID_SalesDate', 'SellerID', 'SalesDate'),
+    )
+
+class CategoryDailySales(Base):
+    __tablename__ = "CategoryDailySales"
+    CategoryID = Column(Integer, ForeignKey("Category.CategoryID"), primary_key=True)
+    SalesDate = Column(Date, primary_key=True)
+    OrderCount = Column(Integer, default=0, nullable=False)
+    UnitsSold = Column(Integer, default=0, nullable=False)
+    Revenue = Column(Numeric(18, 2), default=0, nullable=False)
@@ -0,0 +1,234 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import Boolean, DateTime, Integer, Numeric, SmallInteger, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+from app.core.config import settings
+from app.models.sqlmodels import Order, OrderDetail, Product
+
+logger = logging.getLogger(__name__)
+
+# Thư mục snapshot (kiểu Hive, DuckDB/Pandas đọc trực tiếp được):
+#   <ANALYTICS_SNAPSHOT_DIR>/orders/date=2026-10-19/part-20261018T235900.parquet
+#   <ANALYTICS_SNAPSHOT_DIR>/_state.json  (high-water mark của từng bảng)
+# Ví dụ DuckDB: SELECT * FROM read_parquet('analytics_snapshots/orders/*/*.parquet', hive_partitioning = true)
+STATE_FILE = "_state.json"
+PART_STAMP = "%Y%m%dT%H%M%S"
+
+@dataclass(frozen=True)
+class SnapshotTable:
+    name: str
+    build: Callable[[], Select]
+    watermark: Callable[[], ColumnElement] # Cột thời gian dùng làm high-water mark và chia partition theo ngày
+
+# Chỉ dòng MỚI (theo CreatedAt/OrderDate) được ghi thêm ở mỗi lần chạy; thay đổi sau đó của dòng đã xuất
+# (trạng thái đơn, giá sản phẩm...) không được ghi lại -> dùng `snapshot --reset` để xuất lại toàn bộ.
+SNAPSHOT_TABLES: Dict[str, SnapshotTable] = {
+    "orders": SnapshotTable("orders", lambda: select(
+        Order.OrderID, Order.BuyerID, Order.ContactID, Order.PaymentMethodID, Order.OrderDate,
+        Order.TotalAmount, Order.ShippingFee, Order.OrderStatus, Order.IsDeleted
+    ), lambda: Order.OrderDate),
+    # OrderDetail không có cột thời gian: lấy OrderDate của đơn để lọc và chia partition
+    "order_details": SnapshotTable("order_details", lambda: select(
+        OrderDetail.OrderDetailID, OrderDetail.OrderID, OrderDetail.ProductID, OrderDetail.SellerID,
+        OrderDetail.Price, OrderDetail.Quantity, Order.OrderDate
+    ).join(Order, Order.OrderID == OrderDetail.OrderID), lambda: Order.OrderDate),
+    "products": SnapshotTable("products", lambda: select(
+        Product.ProductID, Product.SellerID, Product.CategoryID, Product.Title, Product.Price,
+        Product.Quantity, Product.ViewCount, Product.Status, Product.IsDeleted, Product.CreatedAt
+    ), lambda: Product.CreatedAt),
+}
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Snapshot Parquet cần thư viện pyarrow (pip install pyarrow).")
+    return pyarrow
+
+def _arrow_schema(pa, query: Select):
+    """Kiểu Arrow cố định theo kiểu cột SQLAlchemy (không suy từ dữ liệu) để mọi file cùng schema."""
+    fields = []
+    for column in query.selected_columns:
+        column_type = column.type
+        if isinstance(column_type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column_type, SmallInteger):
+            arrow_type = pa.int16()
+        elif isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Numeric):
+            arrow_type = pa.decimal128(column_type.precision, column_type.scale)
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+# --- High-water mark ---
+
+def load_state(directory: str) -> Dict[str, str]:
+    path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_state(directory: str, state: Dict[str, str]) -> None:
+    path = os.path.join(directory, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+class _PartitionWriter:
+    """Ghi từng partition ngày ra file .tmp; chỉ đổi tên thành .parquet khi cả lần chạy thành công."""
+
+    def __init__(self, pq, schema, table_dir: str, part_name: str):
+        self.pq = pq
+        self.schema = schema
+        self.table_dir = table_dir
+        self.part_name = part_name
+        self.files: List[str] = []
+        self._day: Optional[str] = None
+        self._writer = None
+
+    def write(self, day: str, table) -> None:
+        if day != self._day:
+            self._close_current()
+            partition_dir = os.path.join(self.table_dir, f"date={day}")
+            os.makedirs(partition_dir, exist_ok=True)
+            path = os.path.join(partition_dir, self.part_name)
+            self._writer = self.pq.ParquetWriter(path + ".tmp", self.schema)
+            self.files.append(path)
+            self._day = day
+        self._writer.write_table(table)
+
+    def _close_current(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def commit(self) -> None:
+        self._close_current()
+        for path in self.files:
+            os.replace(path + ".tmp", path)
+
+    def abort(self) -> None:
+        self._close_current()
+        for path in self.files:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+def snapshot_table(db: Session, table: SnapshotTable, directory: str, since: Optional[datetime], until: datetime) -> int:
+    """Ghi các dòng có watermark trong (since, until] ra Parquet, chia partition theo ngày. Trả về số dòng.
+       Tên file lấy theo `since` nên chạy lại sau khi lỗi giữa chừng sẽ ghi đè chứ không tạo bản trùng."""
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    watermark = table.watermark()
+    query = table.build().where(watermark <= until)
+    if since is not None:
+        query = query.where(watermark > since)
+    # Sắp xếp theo watermark: các dòng cùng ngày liền nhau -> mỗi lúc chỉ mở 1 file
+    query = query.order_by(watermark)
+
+    schema = _arrow_schema(pa, query)
+    names = schema.names
+    watermark_index = names.index(watermark.key)
+    part_name = f"part-{since.strftime(PART_STAMP) if since else 'initial'}.parquet"
+    writer = _PartitionWriter(pq, schema, os.path.join(directory, table.name), part_name)
+
+    total = 0
+    try:
+        result = db.execute(query.execution_options(yield_per=settings.ANALYTICS_SNAPSHOT_BATCH_SIZE))
+        for rows in result.partitions():
+            start = 0
+            while start < len(rows):
+                day = rows[start][watermark_index].date()
+                end = start
+                while end < len(rows) and rows[end][watermark_index].date() == day:
+                    end += 1
+                chunk = rows[start:end]
+                columns = [pa.array([row[i] for row in chunk], type=schema.field(i).type) for i in range(len(names))]
+                writer.write(day.isoformat(), pa.Table.from_arrays(columns, schema=schema))
+                total += len(chunk)
+                start = end
+    except Exception:
+        writer.abort()
+        raise
+    writer.commit()
+    return total
+
+def run_snapshot(session_factory: sessionmaker, directory: Optional[str] = None, tables: Optional[List[str]] = None) -> Dict[str, int]:
+    """Xuất phần tăng thêm của các bảng kể từ high-water mark lần trước, rồi cập nhật high-water mark.
+       Bỏ qua dòng mới hơn ANALYTICS_SNAPSHOT_LAG_SECONDS giây (transaction có thể chưa commit xong)."""
+    _require_pyarrow()
+    directory = directory or settings.ANALYTICS_SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+    state = load_state(directory)
+    until = (datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_SNAPSHOT_LAG_SECONDS)).replace(microsecond=0)
+
+    counts = {}
+    db = session_factory()
+    try:
+        for name in tables or list(SNAPSHOT_TABLES):
+            since = datetime.fromisoformat(state[name]) if name in state else None
+            if since is not None and since >= until:
+                counts[name] = 0
+                continue
+            counts[name] = snapshot_table(db, SNAPSHOT_TABLES[name], directory, since, until)
+            # Lưu ngay sau mỗi bảng: bảng sau lỗi không làm mất tiến độ của bảng trước
+            state[name] = until.isoformat()
+            _save_state(directory, state)
+    finally:
+        db.close()
+    return counts
+
+def reset_snapshot(directory: Optional[str] = None, tables: Optional[List[str]] = None) -> None:
+    """Xóa file snapshot và high-water mark để lần chạy sau xuất lại toàn bộ."""
+    directory = directory or settings.ANALYTICS_SNAPSHOT_DIR
+    state = load_state(directory)
+    for name in tables or list(SNAPSHOT_TABLES):
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        state.pop(name, None)
+    if os.path.isdir(directory):
+        _save_state(directory, state)
+
+class AnalyticsSnapshotter:
+    """Thread nền chạy snapshot mỗi ANALYTICS_SNAPSHOT_INTERVAL_SECONDS giây.
+       Chỉ bật ở 1 process (hoặc dùng cron + `python -m app.manage snapshot`)."""
+
+    def __init__(self, session_factory: sessionmaker, interval: float):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="analytics-snapshotter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                counts = run_snapshot(self.session_factory)
+                logger.info("Snapshot Parquet: %s", counts)
+            except Exception:
+                logger.exception("Không ghi được snapshot Parquet")
+            self._stop.wait(self.interval)
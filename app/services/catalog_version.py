@@ -0,0 +1,59 @@
+import threading
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.models.sqlmodels import Category, Product, ProductImage
+
+# Phiên bản dữ liệu catalog (danh mục, sản phẩm, ảnh) trong process này: tăng mỗi khi 1 transaction
+# sửa các cột hiển thị trên trang cửa hàng commit thành công. Cache trang (services.storefront) so
+# phiên bản để bỏ trang cũ ngay lập tức; thay đổi từ process khác được nhận sau SSR_CACHE_TTL_SECONDS.
+#
+# Quantity, ViewCount không theo dõi: đổi liên tục (đặt hàng, xem chi tiết) và không có trong HTML.
+TRACKED_COLUMNS = {
+    Product: {"Title", "Description", "Price", "CategoryID", "Status", "IsDeleted"},
+    Category: {"CategoryName", "IsDeleted"},
+    ProductImage: {"ImageUrl", "IsDefault", "IsDeleted", "Variants"},
+}
+_CHANGED = "catalog_changed" # Khóa trong Session.info: transaction hiện tại đã sửa catalog
+
+class CatalogVersion:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def bump(self) -> int:
+        with self._lock:
+            self.value += 1
+            return self.value
+
+catalog_version = CatalogVersion()
+
+def _changes_catalog(obj) -> bool:
+    columns = TRACKED_COLUMNS.get(type(obj))
+    if not columns:
+        return False
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in columns)
+
+# --- Theo dõi thay đổi qua ORM (đối tượng) và câu lệnh insert/update/delete hàng loạt ---
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    if any(type(obj) in TRACKED_COLUMNS for obj in session.new | session.deleted) \
+            or any(_changes_catalog(obj) for obj in session.dirty):
+        session.info[_CHANGED] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statement(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in TRACKED_COLUMNS:
+        orm_execute_state.session.info[_CHANGED] = True
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop(_CHANGED, False):
+        catalog_version.bump()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_CHANGED, None)
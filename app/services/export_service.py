@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Select
+from app.core.config import settings
+from app.models.sqlmodels import Order, Product, User
+
+EXPORT_FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+@dataclass(frozen=True)
+class ExportDataset:
+    name: str
+    build: Callable[[], Select]
+
+    @property
+    def columns(self) -> List[str]:
+        return [column.name for column in self.build().selected_columns]
+
+# Chỉ chọn cột cần xuất (không load object ORM), sắp xếp theo khóa chính để kết quả ổn định.
+# User: KHÔNG xuất PasswordHash/RandomKey.
+EXPORT_DATASETS: Dict[str, ExportDataset] = {
+    "users": ExportDataset("users", lambda: select(
+        User.UserID, User.Username, User.Email, User.FullName, User.PhoneNumber, User.Address,
+        User.IsActive, User.CreatedAt, User.UpdatedAt
+    ).where(User.IsDeleted == False).order_by(User.UserID)),
+    "products": ExportDataset("products", lambda: select(
+        Product.ProductID, Product.SellerID, Product.CategoryID, Product.Title, Product.Price,
+        Product.Quantity, Product.ViewCount, Product.Status, Product.CreatedAt, Product.UpdatedAt
+    ).where(Product.IsDeleted == False).order_by(Product.ProductID)),
+    "orders": ExportDataset("orders", lambda: select(
+        Order.OrderID, Order.BuyerID, Order.ContactID, Order.PaymentMethodID, Order.OrderDate,
+        Order.TotalAmount, Order.ShippingFee, Order.OrderStatus
+    ).where(Order.IsDeleted == False).order_by(Order.OrderID)),
+}
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _encode_csv(columns: List[str], batches: Iterator[list]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _encode_ndjson(columns: List[str], batches: Iterator[list]) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(
+            json.dumps({c: _plain(v) for c, v in zip(columns, row)}, ensure_ascii=False) + "\n" for row in rows
+        )
+
+ENCODERS = {"csv": _encode_csv, "ndjson": _encode_ndjson}
+
+def _iter_batches(db: Session, dataset: ExportDataset) -> Iterator[list]:
+    # yield_per: đọc bằng server-side cursor theo từng lô, không giữ toàn bộ kết quả trong bộ nhớ
+    result = db.execute(dataset.build().execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    for rows in result.partitions():
+        yield rows
+
+def stream_export(session_factory: sessionmaker, name: str, fmt: str) -> Iterator[str]:
+    """Generator trả về từng đoạn CSV/NDJSON (mỗi lô EXPORT_BATCH_SIZE dòng 1 đoạn), bộ nhớ không
+       phụ thuộc số dòng. Session được mở/đóng bên trong generator vì StreamingResponse đọc dữ liệu
+       sau khi endpoint đã trả về."""
+    dataset = EXPORT_DATASETS[name]
+    encode = ENCODERS[fmt]
+    db = session_factory()
+    try:
+        yield from encode(dataset.columns, _iter_batches(db, dataset))
+    finally:
+        db.close()
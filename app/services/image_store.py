@@ -0,0 +1,63 @@
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.sqlmodels import ProductImage
+from app.services.upload_storage import StagedUpload, move_into_place
+
+# Ảnh sản phẩm lưu theo nội dung: static/images/products/sha256/ab/cd/<sha256><đuôi>
+# - Cùng 1 ảnh tải lên nhiều lần (nhiều sản phẩm) chỉ lưu 1 file
+# - Nội dung đổi thì URL đổi -> URL bất biến, trình duyệt/CDN cache mãi mãi
+# - Số tham chiếu = số ProductImage chưa xóa có cùng ContentHash; file không còn ai dùng được dọn bởi collect_garbage
+IMAGE_STORE_DIR = Path("static/images/products/sha256")
+IMAGE_STORE_URL = "/static/images/products/sha256" # Thư mục được tạo khi app khởi động (lifespan) hoặc khi lưu ảnh đầu tiên
+
+def content_key(sha256: str, extension: str) -> str:
+    """Chia thư mục theo 2 cấp tiền tố hash (ab/cd/...) để mỗi thư mục không quá nhiều file."""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+def store_image(upload: StagedUpload) -> str:
+    """Đưa file đã ghi tạm vào kho theo hash và trả về URL. Nội dung đã có -> dùng lại file cũ, bỏ file tạm."""
+    key = content_key(upload.sha256, upload.extension)
+    path = IMAGE_STORE_DIR / key
+    if path.exists():
+        upload.path.unlink(missing_ok=True)
+        # Cập nhật mtime: collect_garbage không xóa file vừa được tham chiếu lại (transaction có thể chưa commit)
+        os.utime(path)
+    else:
+        move_into_place(upload, path)
+    return f"{IMAGE_STORE_URL}/{key}"
+
+def reference_counts(db: Session, hashes: Iterable[str]) -> Dict[str, int]:
+    """Số ProductImage chưa xóa tham chiếu tới từng hash (hash không có trong kết quả = 0)."""
+    hashes = list(hashes)
+    counts: Dict[str, int] = {}
+    for start in range(0, len(hashes), 500):
+        rows = db.execute(
+            select(ProductImage.ContentHash, func.count())
+            .where(ProductImage.ContentHash.in_(hashes[start:start + 500]), ProductImage.IsDeleted == False)
+            .group_by(ProductImage.ContentHash)
+        ).all()
+        counts.update({content_hash: count for content_hash, count in rows})
+    return counts
+
+def collect_garbage(db: Session, grace_seconds: int, dry_run: bool = False) -> List[Path]:
+    """Xóa ảnh gốc (và các bản thu nhỏ <hash>_<width>.<fmt>) không còn ProductImage nào tham chiếu.
+       Chỉ xóa file cũ hơn grace_seconds: ảnh vừa lưu có thể thuộc transaction chưa commit."""
+    files_by_hash: Dict[str, List[Path]] = {}
+    for path in IMAGE_STORE_DIR.glob("*/*/*"):
+        if path.is_file():
+            files_by_hash.setdefault(path.name[:64], []).append(path)
+    counts = reference_counts(db, files_by_hash)
+    cutoff = time.time() - grace_seconds
+    removed: List[Path] = []
+    for content_hash, paths in files_by_hash.items():
+        if counts.get(content_hash, 0) > 0 or any(path.stat().st_mtime > cutoff for path in paths):
+            continue
+        for path in paths:
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            removed.append(path)
+    return removed
@@ -0,0 +1,169 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.crud_job import job_crud
+from app.models.sqlmodels import ProductImage
+from app.services.job_queue import job_handler
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANTS_JOB = "images.generate_variants"
+VARIANT_DIR = Path("static/images/products/variants")
+VARIANT_URL = "/static/images/products/variants"
+
+# --- Chạy trong process con (chỉ dùng Pillow, không đụng tới DB) ---
+
+def render_variants(source: str, out_dir: str, stem: str, widths: List[int], formats: List[str], quality: int) -> List[Dict[str, Any]]:
+    """Tạo các bản thu nhỏ của 1 ảnh. Không phóng to: bỏ các độ rộng lớn hơn ảnh gốc
+       (ảnh nhỏ hơn mọi độ rộng vẫn có 1 bản đúng kích thước gốc để đổi sang định dạng nhẹ hơn)."""
+    from PIL import Image, ImageOps, features
+
+    formats = [fmt for fmt in formats if features.check(fmt)]
+    variants = []
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+        targets = sorted({w for w in widths if w < image.width} or {image.width})
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                name = f"{stem}_{width}.{fmt}"
+                path = os.path.join(out_dir, name)
+                resized.save(path + ".tmp", format=fmt.upper(), quality=quality)
+                os.replace(path + ".tmp", path)
+                variants.append({"Width": width, "Format": fmt, "File": name, "Bytes": os.path.getsize(path)})
+    return variants
+
+# --- Process pool (tạo khi dùng lần đầu) ---
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: không fork process đang có nhiều thread (uvicorn, job worker, pool kết nối DB)
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+def pillow_available() -> bool:
+    try:
+        import PIL
+    except ImportError:
+        return False
+    return True
+
+def local_path(image_url: str) -> Optional[Path]:
+    """/static/... -> đường dẫn file trên đĩa; ảnh ở nơi khác (URL ngoài) thì trả về None."""
+    if not image_url or not image_url.startswith("/static/"):
+        return None
+    return Path(image_url.lstrip("/"))
+
+def _variant_target(image: ProductImage, source: Path) -> Tuple[Path, str]:
+    """Ảnh lưu theo hash: bản thu nhỏ nằm cạnh ảnh gốc (<hash>_<width>.<fmt>, URL bất biến như ảnh gốc).
+       Ảnh cũ (product_{id}_{index}): thư mục variants/."""
+    if image.ContentHash:
+        return source.parent, image.ImageUrl.rsplit("/", 1)[0]
+    VARIANT_DIR.mkdir(parents=True, exist_ok=True)
+    return VARIANT_DIR, VARIANT_URL
+
+def reuse_existing_variants(db: Session, images: List[ProductImage]) -> List[ProductImage]:
+    """Ảnh trùng nội dung với ảnh đã có bản thu nhỏ: chép Variants thay vì tạo lại. Trả về các ảnh còn phải tạo."""
+    hashes = {image.ContentHash for image in images if image.ContentHash}
+    existing: Dict[str, list] = {}
+    if hashes:
+        rows = db.query(ProductImage.ContentHash, ProductImage.Variants).filter(
+            ProductImage.ContentHash.in_(hashes), ProductImage.Variants.is_not(None)
+        )
+        for content_hash, variants in rows:
+            if variants:
+                existing.setdefault(content_hash, variants)
+    remaining = []
+    for image in images:
+        if image.ContentHash in existing:
+            image.Variants = existing[image.ContentHash]
+        else:
+            remaining.append(image)
+    return remaining
+
+def generate_for_images(images: List[ProductImage]) -> int:
+    """Tạo ảnh thu nhỏ song song trong process pool và ghi kết quả vào ProductImage.Variants. Không commit."""
+    pool = get_pool()
+    futures = []
+    submitted: Dict[Path, Any] = {} # Nhiều ảnh cùng 1 file (trùng hash) chỉ tạo 1 lần
+    for image in images:
+        source = local_path(image.ImageUrl)
+        if source is None or not source.exists():
+            image.Variants = []
+            continue
+        out_dir, url_prefix = _variant_target(image, source)
+        if source not in submitted:
+            submitted[source] = pool.submit(
+                render_variants, str(source), str(out_dir), source.stem,
+                settings.IMAGE_VARIANT_WIDTHS, settings.IMAGE_VARIANT_FORMATS, settings.IMAGE_VARIANT_QUALITY
+            )
+        futures.append((image, url_prefix, submitted[source]))
+    for image, url_prefix, future in futures:
+        try:
+            variants = future.result()
+        except BrokenProcessPool:
+            # Process con bị kill (vd. hết RAM): bỏ pool hỏng, job sẽ được thử lại với pool mới
+            shutdown_pool()
+            raise
+        except (OSError, ValueError) as e:
+            # File hỏng / không đọc được: đánh dấu [] để không thử lại mãi
+            logger.warning("Không tạo được ảnh thu nhỏ cho ImageID=%s: %s", image.ImageID, e)
+            variants = []
+        image.Variants = [
+            {"Width": v["Width"], "Format": v["Format"], "Url": f"{url_prefix}/{v['File']}", "Bytes": v["Bytes"]}
+            for v in variants
+        ]
+    return len(futures)
+
+def enqueue_image_variants(db: Session, image_ids: List[int]) -> None:
+    """Xếp job tạo ảnh thu nhỏ trong cùng transaction với việc lưu ảnh gốc. Không commit."""
+    if image_ids:
+        job_crud.enqueue(db, IMAGE_VARIANTS_JOB, {"image_ids": list(image_ids)})
+
+@job_handler(IMAGE_VARIANTS_JOB)
+def on_images_uploaded(db: Session, payload: Dict[str, Any]) -> None:
+    if not pillow_available():
+        logger.warning("Chưa cài Pillow, bỏ qua tạo ảnh thu nhỏ cho %s", payload["image_ids"])
+        return
+    images = db.query(ProductImage).filter(ProductImage.ImageID.in_(payload["image_ids"])).all()
+    generate_for_images(reuse_existing_variants(db, images))
+
+# --- Chọn kích thước phù hợp khi trả về API ---
+
+def pick_variant(image: ProductImage, width: int, fmt: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Bản nhỏ nhất có độ rộng >= width (không có thì lấy bản lớn nhất) theo định dạng fmt."""
+    fmt = fmt or settings.LISTING_IMAGE_FORMAT
+    candidates = [v for v in image.Variants or [] if v["Format"] == fmt]
+    if not candidates:
+        return None
+    larger = [v for v in candidates if v["Width"] >= width]
+    return min(larger, key=lambda v: v["Width"]) if larger else max(candidates, key=lambda v: v["Width"])
+
+def build_srcset(image: ProductImage, fmt: Optional[str] = None) -> Optional[str]:
+    fmt = fmt or settings.LISTING_IMAGE_FORMAT
+    variants = sorted((v for v in image.Variants or [] if v["Format"] == fmt), key=lambda v: v["Width"])
+    return ", ".join(f"{v['Url']} {v['Width']}w" for v in variants) or None
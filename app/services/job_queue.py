@@ -0,0 +1,104 @@
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.crud.crud_job import job_crud, job_available, EVENT_JOB_PREFIX
+from app.models.sqlmodels import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# Handler nhận (db, payload). Handler KHÔNG commit: worker commit thay đổi của handler
+# cùng lúc với việc đánh dấu job DONE, nên mỗi job chỉ có hiệu lực đúng 1 lần.
+JobHandler = Callable[[Session, Dict[str, Any]], None]
+
+_handlers: Dict[str, JobHandler] = {}
+_subscribers: Dict[str, List[str]] = {}
+
+def job_handler(job_type: str, events: Optional[List[str]] = None):
+    """Decorator đăng ký handler cho một loại job, và (tùy chọn) cho các sự kiện cần lắng nghe."""
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[job_type] = func
+        for event_name in events or []:
+            _subscribers.setdefault(event_name, []).append(job_type)
+        return func
+    return decorator
+
+def get_subscribers(event_name: str) -> List[str]:
+    return list(_subscribers.get(event_name, []))
+
+def process_job(db: Session, job: BackgroundJob) -> None:
+    """Chạy 1 job đã được nhận (claim). Job sự kiện được fan-out thành job cho từng handler,
+       mỗi job con được retry độc lập."""
+    payload = json.loads(job.Payload)
+    try:
+        if job.JobType.startswith(EVENT_JOB_PREFIX):
+            event_name = job.JobType[len(EVENT_JOB_PREFIX):]
+            for job_type in get_subscribers(event_name):
+                job_crud.enqueue(db, job_type, payload)
+        else:
+            handler = _handlers.get(job.JobType)
+            if handler is None:
+                raise LookupError(f"Không có handler cho job '{job.JobType}'.")
+            handler(db, payload)
+        job_crud.mark_done(db, job)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("Job %s (%s) thất bại ở lần thử %s", job.JobID, job.JobType, job.Attempts)
+        job_crud.mark_failed(db, job.JobID, f"{type(e).__name__}: {e}")
+
+class JobWorkerPool:
+    """Nhóm thread worker lấy job từ bảng BackgroundJob và xử lý ở nền."""
+
+    def __init__(self, session_factory: sessionmaker, num_workers: int, poll_interval: float):
+        self.session_factory = session_factory
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        job_available.set() # Đánh thức các worker đang chờ
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads.clear()
+
+    def run_once(self) -> bool:
+        """Xử lý tối đa 1 job. Trả về False nếu hàng đợi đang trống."""
+        db = self.session_factory()
+        try:
+            job = job_crud.claim_next(db)
+            if job is None:
+                return False
+            process_job(db, job)
+            return True
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                has_job = self.run_once()
+            except Exception:
+                logger.exception("Lỗi khi lấy job từ hàng đợi")
+                has_job = False
+            if not has_job:
+                job_available.wait(self.poll_interval)
+                job_available.clear()
+
+def create_worker_pool(session_factory: sessionmaker) -> JobWorkerPool:
+    return JobWorkerPool(
+        session_factory,
+        num_workers=settings.JOB_WORKERS,
+        poll_interval=settings.JOB_POLL_INTERVAL_SECONDS
+    )
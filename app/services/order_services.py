@@ -0,0 +1,56 @@
+from typing import Any, Dict
+from sqlalchemy.orm import Session
+from app.models.sqlmodels import ShoppingCart, ShoppingCartItem, Transaction, SystemLog
+from app.core.constants import ORDER_PLACED_EVENT
+from app.services.job_queue import job_handler
+
+# --- Các handler xử lý sau khi đặt hàng (chạy nền, ngoài request của người mua) ---
+# Payload của sự kiện ORDER_PLACED_EVENT (tạo trong crud_order.create_simple_order):
+#   order_id, buyer_id, payment_method_id, amount, product_ids, seller_ids, transaction_code
+
+@job_handler("order.clear_cart", events=[ORDER_PLACED_EVENT])
+def clear_ordered_cart_items(db: Session, payload: Dict[str, Any]) -> None:
+    """Xóa khỏi giỏ hàng các sản phẩm vừa được đặt (giữ lại món người dùng thêm sau đó)."""
+    cart = db.query(ShoppingCart).filter(ShoppingCart.UserID == payload["buyer_id"]).first()
+    if not cart:
+        return
+    db.query(ShoppingCartItem).filter(
+        ShoppingCartItem.CartID == cart.CartID,
+        ShoppingCartItem.ProductID.in_(payload["product_ids"])
+    ).delete(synchronize_session=False)
+
+@job_handler("order.record_transaction", events=[ORDER_PLACED_EVENT])
+def record_transaction(db: Session, payload: Dict[str, Any]) -> None:
+    """Tạo bản ghi Transaction cho đơn hàng (1:1). Đã thanh toán online thì trạng thái là Success."""
+    exists = db.query(Transaction.TransactionID).filter(Transaction.OrderID == payload["order_id"]).first()
+    if exists:
+        return
+    db.add(Transaction(
+        OrderID=payload["order_id"],
+        PaymentMethodID=payload["payment_method_id"],
+        TransactionCode=payload.get("transaction_code"),
+        Amount=payload["amount"],
+        TransactionStatus=1 if payload.get("transaction_code") else 0 # 0: Pending, 1: Success
+    ))
+
+@job_handler("order.write_system_log", events=[ORDER_PLACED_EVENT])
+def write_order_system_log(db: Session, payload: Dict[str, Any]) -> None:
+    db.add(SystemLog(
+        UserID=payload["buyer_id"],
+        ActionType="CREATE_ORDER",
+        TableName="Order",
+        RecordID=payload["order_id"],
+        Description=f"Đặt đơn hàng #{payload['order_id']}, tổng tiền {payload['amount']}."
+    ))
+
+@job_handler("order.notify_sellers", events=[ORDER_PLACED_EVENT])
+def notify_sellers(db: Session, payload: Dict[str, Any]) -> None:
+    """Thông báo cho từng người bán có sản phẩm trong đơn (ghi vào SystemLog của người bán)."""
+    for seller_id in payload["seller_ids"]:
+        db.add(SystemLog(
+            UserID=seller_id,
+            ActionType="NOTIFY_SELLER",
+            TableName="Order",
+            RecordID=payload["order_id"],
+            Description=f"Bạn có đơn hàng mới #{payload['order_id']}."
+        ))
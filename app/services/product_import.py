@@ -0,0 +1,242 @@
+import csv
+import io
+import json
+import os
+import zipfile
+from itertools import islice
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.constants import ProductStatus
+from app.core.database import insert_returning_ids
+from app.models import schemas
+from app.models.sqlmodels import Category, Product, ProductImage
+from app.services.image_store import store_image
+from app.services.upload_storage import StagedUpload, UploadRejected, discard_staged, stage_stream
+from app.services.image_variants import enqueue_image_variants
+
+IMPORT_FORMATS = ("csv", "jsonl")
+MAX_IMAGES_PER_PRODUCT = 3
+
+# Mỗi dòng: Title, Description, Price, Quantity, CategoryID (hoặc CategoryName), VideoUrl,
+# Images = tên file trong zip, cách nhau bởi ";" (CSV) hoặc mảng (JSONL), tối đa 3 ảnh, ảnh đầu là ảnh mặc định.
+
+def guess_format(filename: Optional[str]) -> Optional[str]:
+    ext = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if ext == "ndjson":
+        return "jsonl"
+    return ext if ext in IMPORT_FORMATS else None
+
+def _read_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Đọc lần lượt từng dòng (không nạp cả file vào bộ nhớ). Trả về (số dòng, dữ liệu, lỗi đọc)."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="" if fmt == "csv" else None)
+    if fmt == "csv":
+        for index, record in enumerate(csv.DictReader(text), start=1):
+            yield index, record, None
+        return
+    index = 0
+    for line in text:
+        if not line.strip():
+            continue
+        index += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield index, None, f"JSON không hợp lệ: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield index, None, "Mỗi dòng JSONL phải là 1 object."
+            continue
+        yield index, record, None
+
+def _image_names(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(";")
+    return [str(name).strip() for name in value if str(name).strip()]
+
+class CategoryCache:
+    """Nạp danh mục 1 lần cho cả lần nhập thay vì truy vấn Category cho từng dòng."""
+
+    def __init__(self, db: Session):
+        rows = db.execute(select(Category.CategoryID, Category.CategoryName).where(Category.IsDeleted == False)).all()
+        self.ids = {category_id for category_id, _ in rows}
+        self.by_name = {name.strip().lower(): category_id for category_id, name in rows}
+
+    def resolve(self, record: dict) -> int:
+        raw_id = record.get("CategoryID")
+        if raw_id not in (None, ""):
+            try:
+                category_id = int(raw_id)
+            except (TypeError, ValueError):
+                raise ValueError("CategoryID phải là số nguyên.")
+            if category_id not in self.ids:
+                raise ValueError("CategoryID không hợp lệ hoặc không tồn tại.")
+            return category_id
+        name = str(record.get("CategoryName") or "").strip().lower()
+        if name and name in self.by_name:
+            return self.by_name[name]
+        raise ValueError("Thiếu CategoryID hoặc CategoryName không tồn tại.")
+
+def _validate(record: dict, categories: CategoryCache, archive_names: Optional[Set[str]]) -> Tuple[dict, List[str]]:
+    """Kiểm tra 1 dòng, trả về (dữ liệu Product, danh sách ảnh). Lỗi -> ValueError với thông báo cho người bán."""
+    data = {key: (value.strip() if isinstance(value, str) else value) for key, value in record.items() if key}
+    data["CategoryID"] = categories.resolve(data)
+    try:
+        product_in = schemas.ProductCreate(
+            Title=data.get("Title"),
+            Description=data.get("Description") or None,
+            Price=data.get("Price"),
+            Quantity=data.get("Quantity"),
+            CategoryID=data["CategoryID"],
+            VideoUrl=data.get("VideoUrl") or None
+        )
+    except ValidationError as e:
+        raise ValueError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+    if not product_in.Title:
+        raise ValueError("Title không được để trống.")
+    if product_in.Price <= 0:
+        raise ValueError("Price phải lớn hơn 0.")
+    if product_in.Quantity < 0:
+        raise ValueError("Quantity không được âm.")
+
+    images = _image_names(data.get("Images"))
+    if not 1 <= len(images) <= MAX_IMAGES_PER_PRODUCT:
+        raise ValueError(f"Cần từ 1 đến {MAX_IMAGES_PER_PRODUCT} ảnh (cột Images).")
+    if archive_names is None:
+        raise ValueError("Thiếu file zip ảnh.")
+    missing = [name for name in images if name not in archive_names]
+    if missing:
+        raise ValueError(f"Không tìm thấy ảnh (hoặc ảnh quá lớn) trong file zip: {', '.join(missing)}")
+
+    values = product_in.model_dump()
+    values.pop("Status", None)
+    values["VideoUrl"] = values["VideoUrl"] or "" # Cột VideoUrl NOT NULL
+    return values, images
+
+class ProductImporter:
+    """Nhập sản phẩm hàng loạt cho 1 người bán: kiểm tra theo lô, INSERT nhiều dòng 1 lần (executemany),
+       commit theo lô. Dòng lỗi được ghi vào kết quả, không làm dừng cả lần nhập."""
+
+    def __init__(self, db: Session, seller_id: int, archive: Optional[zipfile.ZipFile] = None):
+        self.db = db
+        self.seller_id = seller_id
+        self.archive = archive
+        # Chỉ nhận ảnh không vượt UPLOAD_MAX_IMAGE_BYTES (giống API tải ảnh từng sản phẩm)
+        self.archive_names = {
+            info.filename for info in archive.infolist() if info.file_size <= settings.UPLOAD_MAX_IMAGE_BYTES
+        } if archive is not None else None
+        self.categories = CategoryCache(db)
+        self.result = schemas.ProductImportResult()
+
+    def run(self, stream: IO[bytes], fmt: str) -> schemas.ProductImportResult:
+        rows = _read_rows(stream, fmt)
+        max_rows = settings.PRODUCT_IMPORT_MAX_ROWS
+        total = 0
+        while True:
+            chunk = list(islice(rows, min(settings.PRODUCT_IMPORT_BATCH_SIZE, max_rows - total)))
+            if not chunk:
+                break
+            total += len(chunk)
+            self._import_chunk(chunk)
+        extra = next(rows, None)
+        if extra is not None:
+            self._error(extra[0], f"Vượt quá {max_rows} dòng mỗi lần nhập, phần còn lại bị bỏ qua.")
+        return self.result
+
+    def _error(self, row: int, message: str) -> None:
+        self.result.Errors.append(schemas.ProductImportError(Row=row, Error=message))
+
+    def _stage_images(self, valid: List[Tuple[int, dict, List[str]]]) -> Tuple[List[Tuple[int, dict, List[StagedUpload]]], Dict[str, StagedUpload]]:
+        """Giải nén + kiểm tra + hash + fsync ảnh của cả lô ra thư mục tạm TRƯỚC khi mở transaction ghi:
+           transaction chỉ còn rename file vào kho. Ảnh lỗi -> lỗi của dòng đó. Ảnh dùng ở nhiều dòng chỉ ghi 1 lần."""
+        staged: Dict[str, StagedUpload] = {}
+        ready: List[Tuple[int, dict, List[StagedUpload]]] = []
+        for index, values, images in valid:
+            try:
+                for name in images:
+                    if name not in staged:
+                        with self.archive.open(name) as source:
+                            staged[name] = stage_stream(source, name)
+            except (UploadRejected, OSError, zipfile.BadZipFile) as e:
+                self._error(index, f"Ảnh '{name}' không hợp lệ: {e}")
+                continue
+            ready.append((index, values, [staged[name] for name in images]))
+        return ready, staged
+
+    def _import_chunk(self, chunk: List[Tuple[int, Optional[dict], Optional[str]]]) -> None:
+        valid: List[Tuple[int, dict, List[str]]] = []
+        for index, record, read_error in chunk:
+            if read_error:
+                self._error(index, read_error)
+                continue
+            try:
+                values, images = _validate(record, self.categories, self.archive_names)
+            except ValueError as e:
+                self._error(index, str(e))
+                continue
+            valid.append((index, values, images))
+        if not valid:
+            return
+        ready, staged = self._stage_images(valid)
+        try:
+            if not ready:
+                return
+            try:
+                self._insert(ready)
+            except Exception:
+                # Lỗi ở mức cả lô (vd. ràng buộc DB): thử lại từng dòng để chỉ ra đúng dòng lỗi
+                self.db.rollback()
+                for item in ready:
+                    try:
+                        self._insert([item])
+                    except Exception as e:
+                        self.db.rollback()
+                        self._error(item[0], f"Lỗi khi lưu: {e}")
+        finally:
+            # File tạm của dòng lỗi (file đã vào kho thì bỏ qua)
+            discard_staged(list(staged.values()))
+
+    def _insert(self, items: List[Tuple[int, dict, List[StagedUpload]]]) -> None:
+        """INSERT sản phẩm + ảnh của 1 lô rồi commit 1 lần. Ảnh đã ghi tạm sẵn (_stage_images), ở đây chỉ
+           rename vào kho theo hash nội dung: ảnh trùng (giữa các dòng hoặc với ảnh đã có) chỉ lưu 1 file;
+           file thừa khi lỗi để gc-images dọn."""
+        product_ids = insert_returning_ids(self.db, Product.ProductID, [
+            dict(values, SellerID=self.seller_id, Status=ProductStatus.PENDING, IsDeleted=False, ViewCount=0)
+            for _, values, _ in items
+        ])
+
+        image_rows = []
+        for product_id, (_, _, images) in zip(product_ids, items):
+            for position, staged in enumerate(images):
+                image_rows.append({
+                    "ProductID": product_id,
+                    "ImageUrl": store_image(staged),
+                    "ContentHash": staged.sha256,
+                    "IsDefault": position == 0,
+                    "IsDeleted": False
+                })
+        image_ids = insert_returning_ids(self.db, ProductImage.ImageID, image_rows)
+        enqueue_image_variants(self.db, image_ids)
+        self.db.commit()
+        self.result.Created += len(product_ids)
+        self.result.ProductIDs.extend(product_ids)
+
+def import_products(
+    db: Session, seller_id: int, stream: IO[bytes], fmt: str, archive_file: Optional[IO[bytes]] = None
+) -> schemas.ProductImportResult:
+    """Nhập sản phẩm từ CSV/JSONL (stream) và file zip ảnh (cần seek được, vd. UploadFile.file)."""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Định dạng không hỗ trợ: {fmt}. Chỉ nhận {', '.join(IMPORT_FORMATS)}.")
+    try:
+        archive = zipfile.ZipFile(archive_file) if archive_file is not None else None
+    except zipfile.BadZipFile:
+        raise ValueError("File ảnh phải là file .zip hợp lệ.")
+    try:
+        return ProductImporter(db, seller_id, archive).run(stream, fmt)
+    finally:
+        if archive is not None:
+            archive.close()
@@ -1,35 +1,61 @@
+import logging
 from sqlalchemy.orm import Session
-import os 
-import shutil 
-from pathlib import Path 
 from typing import List, Optional, Union 
 from fastapi import UploadFile, HTTPException, status 
+from fastapi.concurrency import run_in_threadpool
 from app.models import schemas 
-from app.models.sqlmodels import Product 
+from app.models.sqlmodels import Product, ProductImage 
 from app.crud.crud_product import product_crud, product_image_crud 
+from app.services.upload_storage import StagedUpload, stage_uploads, discard_staged
+from app.services.image_store import store_image
+from app.services.image_variants import build_srcset, enqueue_image_variants, pick_variant
 
-STATIC_DIR = Path("static/images/products") 
-STATIC_DIR.mkdir(parents=True, exist_ok=True) 
+logger = logging.getLogger(__name__)
 
-def attach_product_response_fields(product: Product) -> schemas.Product: 
-    # 1. Tìm ảnh mặc định (IsDefault=True) hoặc ảnh đầu tiên chưa bị xóa 
-    primary_image = next( 
+def get_primary_image(product: Product) -> Optional[ProductImage]: 
+    # Tìm ảnh mặc định (IsDefault=True) hoặc ảnh đầu tiên chưa bị xóa 
+    return next( 
         (img for img in product.images if img.IsDefault and not img.IsDeleted), 
         next((img for img in product.images if not img.IsDeleted), None) 
     ) 
-    # 2. Tạo đối tượng Pydantic Product từ SQLAlchemy object 
+
+def get_primary_image_url(product: Product, width: Optional[int] = None) -> Optional[str]: 
+    # width: trả về ảnh thu nhỏ phù hợp (nếu đã tạo), bỏ trống/0 = ảnh gốc
+    primary_image = get_primary_image(product) 
+    if primary_image is None: 
+        return None 
+    variant = pick_variant(primary_image, width) if width else None 
+    return variant["Url"] if variant else primary_image.ImageUrl 
+
+def attach_product_response_fields(product: Product, image_width: Optional[int] = None) -> schemas.Product: 
+    # 1. Tạo đối tượng Pydantic Product từ SQLAlchemy object 
     # Pydantic sẽ xác thực tất cả các trường dữ liệu ở đây
     product_schema = schemas.Product.model_validate(product) 
-    # 3. Gán các trường bổ sung 
-    product_schema.PrimaryImageUrl = primary_image.ImageUrl if primary_image else None 
+    # 2. Gán các trường bổ sung 
+    product_schema.PrimaryImageUrl = get_primary_image_url(product, image_width) 
+    primary_image = get_primary_image(product) 
+    product_schema.PrimaryImageSrcset = build_srcset(primary_image) if primary_image else None 
     return product_schema 
 
 class ProductService: 
-    def create_product_and_save_images( 
+    async def create_product_and_save_images( 
         self, db: Session, product_in: schemas.ProductCreate, seller_id: int, image_files: List[UploadFile] 
-    ) -> Product: 
-        # Biến để lưu trữ đường dẫn file đã lưu (để dọn dẹp nếu rollback) 
-        saved_file_paths: List[Path] = [] 
+    ) -> schemas.Product: 
+        # 1. Ghi toàn bộ ảnh ra thư mục tạm TRƯỚC khi mở transaction (theo chunk, có giới hạn dung lượng)
+        # -> upload chậm/lớn không giữ kết nối DB. Dependency xác thực đã truy vấn bằng session này:
+        # kết thúc transaction đó để trả kết nối về pool trong lúc ghi ảnh (seller_id đã lấy ra trước)
+        db.rollback()
+        staged = await stage_uploads(image_files)
+        try:
+            # 2. Phần DB (đồng bộ) chạy trong threadpool, chỉ còn thao tác rename file
+            return await run_in_threadpool(self._save_product_with_images, db, product_in, seller_id, staged)
+        finally:
+            discard_staged(staged) # Dọn file tạm còn sót nếu bị lỗi
+
+    def _save_product_with_images( 
+        self, db: Session, product_in: schemas.ProductCreate, seller_id: int, staged: List[StagedUpload] 
+    ) -> schemas.Product: 
+        image_ids: List[int] = [] 
         new_product: Optional[Product] = None 
         try: 
             # 1. Tạo sản phẩm trong DB (Chỉ FLUSH, không COMMIT) 
@@ -37,25 +63,20 @@ class ProductService:
                 db=db, obj_in=product_in, seller_id=seller_id 
             ) 
             product_id = new_product.ProductID 
-            # 2. Xử lý và lưu từng file ảnh 
-            for index, file in enumerate(image_files): 
-                file_ext = os.path.splitext(file.filename)[1] 
-                file_name_safe = f"product_{product_id}_{index}{file_ext}" 
-                file_path = STATIC_DIR / file_name_safe 
-                # 2a. Lưu file vào đĩa 
-                with file_path.open("wb") as buffer: 
-                    # file.file.seek(0) 
-                    shutil.copyfileobj(file.file, buffer) 
-                # Lưu đường dẫn vật lý để dọn dẹp 
-                saved_file_paths.append(file_path) 
+            # 2. Xử lý từng file ảnh đã ghi tạm 
+            for index, upload in enumerate(staged): 
+                # 2a. Rename nguyên tử vào kho ảnh theo hash (ảnh trùng nội dung dùng lại file đã có) 
+                image_url = store_image(upload) 
                 # 2b. Tạo record ProductImage trong DB (Chỉ FLUSH, không COMMIT) 
-                image_url = f"/static/images/products/{file_name_safe}" 
                 image_record = schemas.ProductImageCreate( 
-                    ImageUrl=image_url, IsDefault=(index == 0) 
+                    ImageUrl=image_url, IsDefault=(index == 0), ContentHash=upload.sha256 
                 ) 
-                product_image_crud.create_with_product_id( 
+                db_image = product_image_crud.create_with_product_id( 
                     db=db, obj_in=image_record, product_id=product_id 
                 ) 
+                image_ids.append(db_image.ImageID) 
+            # 2c. Xếp job tạo ảnh thu nhỏ (chạy ở nền, cùng transaction với ảnh gốc) 
+            enqueue_image_variants(db, image_ids) 
             # 3. COMMIT TẤT CẢ: Nếu mọi thứ thành công, COMMIT duy nhất 1 lần 
             db.commit() 
             # 4. Refresh và trả về 
@@ -66,13 +87,11 @@ class ProductService:
             db.rollback() 
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) 
         except Exception as e: 
-            print(f"Lỗi xảy ra trong quá trình tạo sản phẩm: {e}") 
-            # ROLLBACK DB trước 
+            logger.exception("Lỗi xảy ra trong quá trình tạo sản phẩm")
+            # ROLLBACK DB 
+            # File đã vào kho ảnh KHÔNG xóa ở đây: có thể đang được request khác (cùng nội dung) tham chiếu. 
+            # File không còn ai dùng sẽ được dọn bởi: python -m app.manage gc-images 
             db.rollback() 
-            # Dọn dẹp File I/O (Chỉ xóa file đã lưu vật lý) 
-            for path in saved_file_paths: 
-                if path.exists(): 
-                    os.remove(path) 
             # Nâng ngoại lệ HTTPException cho tầng API xử lý 
             raise HTTPException( 
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
@@ -80,7 +99,7 @@ class ProductService:
             ) 
 
     def get_products_with_primary_image( 
-        self, db: Session, skip: int, limit: int, status: Optional[Union[int, List[int]]] 
+        self, db: Session, skip: int, limit: int, status: Optional[Union[int, List[int]]], image_width: Optional[int] = None 
     ) -> List[schemas.Product]: 
         """Lấy danh sách sản phẩm và đính kèm PrimaryImageUrl."""
         products_db = product_crud.get_multiple(db, skip=skip, limit=limit, status=status) 
@@ -89,15 +108,10 @@ class ProductService:
         for p in products_db:
             try:
                 # CHỈ THỰC HIỆN XỬ LÝ 1 LẦN:
-                products_out.append(attach_product_response_fields(p))
+                products_out.append(attach_product_response_fields(p, image_width))
             except Exception as e:
-                # IN LOG CHI TIẾT SẢN PHẨM GÂY LỖI RA CONSOLE
-                # Điều này giúp bạn xác định chính xác ID sản phẩm và nguyên nhân lỗi (ví dụ: Price is NULL)
-                print(f"===========================================================")
-                print(f"LỖI CẤU TRÚC DỮ LIỆU SẢN PHẨM: ID={getattr(p, 'ProductID', 'N/A')}")
-                print(f"Chi tiết lỗi: {e}")
-                print(f"SQLAlchemy Object State: {p.__dict__}")
-                print(f"===========================================================")
+                # GHI LOG SẢN PHẨM GÂY LỖI (kèm traceback): xác định chính xác ID sản phẩm và nguyên nhân lỗi (ví dụ: Price is NULL)
+                logger.exception("Lỗi cấu trúc dữ liệu sản phẩm", extra={"product_id": getattr(p, 'ProductID', None)})
                 
                 # Nâng lỗi trở lại (raise) để FastAPI bắt và trả về 500, đồng thời hiển thị traceback đầy đủ
                 raise HTTPException(
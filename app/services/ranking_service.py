@@ -0,0 +1,198 @@
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker, selectinload
+from app.core.config import settings
+from app.core.constants import ProductStatus
+from app.models import schemas
+from app.models.sqlmodels import Product, ProductDailySales
+from app.services.product_service import get_primary_image, get_primary_image_url
+from app.services.image_variants import build_srcset
+
+logger = logging.getLogger(__name__)
+
+BESTSELLER = "bestseller"
+TRENDING = "trending"
+RANKING_KINDS = (BESTSELLER, TRENDING)
+
+# Khóa của 1 danh sách: (loại, CategoryID). CategoryID = None là bảng xếp hạng toàn shop.
+RankingKey = Tuple[str, Optional[int]]
+
+def _top(scores: Dict[int, float], product_ids: Iterable[int], size: int) -> List[int]:
+    return sorted(product_ids, key=lambda pid: (-scores[pid], pid))[:size]
+
+class ProductRanking:
+    """Bảng xếp hạng sản phẩm bán chạy (theo số lượng bán trong BESTSELLER_WINDOW_DAYS ngày, đọc
+       từ bảng tổng hợp ProductDailySales) và thịnh hành (ViewCount giảm dần theo tuổi sản phẩm).
+
+       Danh sách được tính sẵn cho toàn shop và từng danh mục, làm mới định kỳ ở nền và cập nhật
+       tăng dần khi có đơn hàng trong process này. API chỉ đọc từ bộ nhớ, không chạy truy vấn tổng hợp."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._lists: Dict[RankingKey, List[schemas.RankedProduct]] = {}
+        self._units: Dict[int, int] = {} # ProductID -> số lượng bán trong cửa sổ thời gian
+        self._categories: Dict[int, int] = {} # ProductID -> CategoryID (các sản phẩm đã bán)
+        self.refreshed_at: Optional[datetime] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.refreshed_at is not None
+
+    def get(self, kind: str, category_id: Optional[int] = None, limit: Optional[int] = None) -> List[schemas.RankedProduct]:
+        items = self._lists.get((kind, category_id), [])
+        return items[:limit] if limit else items
+
+    # --- Làm mới toàn bộ ---
+    def refresh(self, db: Session) -> None:
+        units, categories = self._load_units(db)
+        trending_scores, trending_categories = self._load_trending_scores(db)
+
+        bestseller_ids = self._rank_by_category(units, categories)
+        trending_ids = self._rank_by_category(trending_scores, trending_categories)
+
+        needed = {pid for ids in bestseller_ids.values() for pid in ids}
+        needed |= {pid for ids in trending_ids.values() for pid in ids}
+        products = self._load_products(db, needed)
+
+        lists: Dict[RankingKey, List[schemas.RankedProduct]] = {}
+        for category_id, ids in bestseller_ids.items():
+            lists[(BESTSELLER, category_id)] = self._build_items(ids, products, units, units)
+        for category_id, ids in trending_ids.items():
+            lists[(TRENDING, category_id)] = self._build_items(ids, products, units, trending_scores)
+
+        with self._lock:
+            self._lists = lists
+            self._units = units
+            self._categories = categories
+            self.refreshed_at = datetime.utcnow()
+
+    def _load_units(self, db: Session) -> Tuple[Dict[int, int], Dict[int, int]]:
+        since = datetime.utcnow().date() - timedelta(days=settings.BESTSELLER_WINDOW_DAYS - 1)
+        rows = db.query(
+            ProductDailySales.ProductID, Product.CategoryID, func.sum(ProductDailySales.UnitsSold)
+        ).join(Product, Product.ProductID == ProductDailySales.ProductID).filter(
+            ProductDailySales.SalesDate >= since,
+            Product.Status == ProductStatus.APPROVED,
+            Product.IsDeleted == False
+        ).group_by(ProductDailySales.ProductID, Product.CategoryID).all()
+        units = {pid: int(total or 0) for pid, _, total in rows if total and total > 0}
+        categories = {pid: category_id for pid, category_id, _ in rows if pid in units}
+        return units, categories
+
+    def _load_trending_scores(self, db: Session) -> Tuple[Dict[int, float], Dict[int, int]]:
+        now = datetime.utcnow()
+        rows = db.query(Product.ProductID, Product.CategoryID, Product.ViewCount, Product.CreatedAt).filter(
+            Product.Status == ProductStatus.APPROVED,
+            Product.IsDeleted == False,
+            Product.CreatedAt >= now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+        ).order_by(Product.ViewCount.desc()).limit(settings.TRENDING_CANDIDATES).all()
+        scores, categories = {}, {}
+        for pid, category_id, view_count, created_at in rows:
+            age_hours = max((now - created_at).total_seconds() / 3600, 0)
+            scores[pid] = (view_count or 0) / ((age_hours + 2) ** settings.TRENDING_GRAVITY)
+            categories[pid] = category_id
+        return scores, categories
+
+    def _rank_by_category(self, scores: Dict[int, float], categories: Dict[int, int]) -> Dict[Optional[int], List[int]]:
+        by_category: Dict[Optional[int], List[int]] = defaultdict(list)
+        for pid in scores:
+            by_category[categories[pid]].append(pid)
+        ranked = {category_id: _top(scores, ids, self.size) for category_id, ids in by_category.items()}
+        ranked[None] = _top(scores, scores.keys(), self.size)
+        return ranked
+
+    def _load_products(self, db: Session, product_ids: Iterable[int]) -> Dict[int, Product]:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+        products = db.query(Product).filter(Product.ProductID.in_(product_ids)).options(
+            selectinload(Product.images)
+        ).all()
+        return {p.ProductID: p for p in products}
+
+    def _build_items(
+        self, ids: List[int], products: Dict[int, Product], units: Dict[int, int], scores: Dict[int, float]
+    ) -> List[schemas.RankedProduct]:
+        items = []
+        for pid in ids:
+            product = products.get(pid)
+            if product is None:
+                continue
+            image = get_primary_image(product)
+            items.append(schemas.RankedProduct(
+                ProductID=pid,
+                Title=product.Title,
+                Price=product.Price,
+                CategoryID=product.CategoryID,
+                PrimaryImageUrl=get_primary_image_url(product, settings.LISTING_IMAGE_WIDTH),
+                PrimaryImageSrcset=build_srcset(image) if image else None,
+                UnitsSold=units.get(pid, 0),
+                ViewCount=product.ViewCount or 0,
+                Score=float(scores.get(pid, 0))
+            ))
+        return items
+
+    # --- Cập nhật tăng dần khi có đơn hàng (chỉ trong process hiện tại) ---
+    def note_sale(self, product_id: int, quantity: int) -> None:
+        """Cộng số lượng bán và sắp xếp lại các danh sách bán chạy đang chứa sản phẩm.
+           Sản phẩm chưa có trong danh sách sẽ được xét lại ở lần làm mới định kỳ tiếp theo."""
+        with self._lock:
+            category_id = self._categories.get(product_id)
+            if category_id is None:
+                return
+            self._units[product_id] = self._units.get(product_id, 0) + quantity
+            for key in ((BESTSELLER, None), (BESTSELLER, category_id)):
+                items = self._lists.get(key)
+                if not items:
+                    continue
+                updated = [
+                    item.model_copy(update={"UnitsSold": self._units[item.ProductID], "Score": float(self._units[item.ProductID])})
+                    if item.ProductID == product_id else item
+                    for item in items
+                ]
+                self._lists[key] = sorted(updated, key=lambda item: (-item.UnitsSold, item.ProductID))
+
+class RankingRefresher:
+    """Thread nền làm mới bảng xếp hạng mỗi RANKING_REFRESH_SECONDS giây."""
+
+    def __init__(self, ranking: ProductRanking, session_factory: sessionmaker, interval: float):
+        self.ranking = ranking
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.first_run_done = threading.Event() # Lần làm mới đầu tiên đã chạy xong (thành công hay lỗi)
+
+    def refresh_now(self) -> None:
+        db = self.session_factory()
+        try:
+            self.ranking.refresh(db)
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ranking-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_now()
+            except Exception:
+                logger.exception("Không làm mới được bảng xếp hạng sản phẩm")
+            self.first_run_done.set()
+            self._stop.wait(self.interval)
+
+product_ranking = ProductRanking(size=settings.RANKING_SIZE)
@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Tuple
+from sqlalchemy import func, cast, Date, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.sqlmodels import (
+    Order, OrderDetail, Product, SellerDailySales, ProductDailySales, CategoryDailySales
+)
+from app.core.constants import OrderStatus, ORDER_PLACED_EVENT, ORDER_STATUS_CHANGED_EVENT
+from app.services.job_queue import job_handler
+
+# Số dòng mỗi lần INSERT khi dựng lại bảng tổng hợp
+REBUILD_BATCH_SIZE = 1000
+
+def _is_counted(order_status: int) -> bool:
+    """Đơn bị hủy không được tính vào doanh số."""
+    return order_status != OrderStatus.CANCELED
+
+def _bump(db: Session, model, keys: Dict[str, Any], orders: int, units: int, revenue: Decimal, **extra) -> None:
+    """Cộng dồn (hoặc trừ đi nếu giá trị âm) vào 1 dòng tổng hợp, tạo mới nếu chưa có.
+       Cộng ngay trong câu UPDATE (không đọc rồi ghi lại): nhiều worker/process cùng cộng vào 1 dòng
+       không làm mất lượt nào. Dòng chưa có thì INSERT; worker khác vừa INSERT trước (trùng khóa) thì UPDATE lại."""
+    where = [getattr(model, column) == value for column, value in keys.items()]
+    increment = update(model).where(*where).values(
+        OrderCount=model.OrderCount + orders,
+        UnitsSold=model.UnitsSold + units,
+        Revenue=model.Revenue + revenue,
+    )
+    if db.execute(increment).rowcount:
+        return
+    try:
+        # Savepoint: lỗi trùng khóa chỉ hủy câu INSERT này, không hủy cả transaction của job
+        with db.begin_nested():
+            db.execute(insert(model).values(**keys, **extra, OrderCount=orders, UnitsSold=units, Revenue=revenue))
+    except IntegrityError:
+        db.execute(increment)
+
+def apply_order(db: Session, order_id: int, sign: int) -> None:
+    """Cộng (sign=1) hoặc trừ (sign=-1) một đơn hàng vào các bảng tổng hợp theo ngày. Không commit."""
+    order_date = db.query(Order.OrderDate).filter(Order.OrderID == order_id).scalar()
+    if order_date is None:
+        return
+    day = order_date.date()
+
+    lines = db.query(
+        OrderDetail.ProductID, OrderDetail.SellerID, OrderDetail.Quantity, OrderDetail.Price, Product.CategoryID
+    ).join(Product, Product.ProductID == OrderDetail.ProductID).filter(OrderDetail.OrderID == order_id).all()
+
+    # Gom theo từng khóa trước: một đơn chỉ được tính 1 lần cho mỗi Seller/Product/Category
+    sellers: Dict[int, list] = defaultdict(lambda: [0, Decimal(0)])
+    products: Dict[Tuple[int, int], list] = defaultdict(lambda: [0, Decimal(0)])
+    categories: Dict[int, list] = defaultdict(lambda: [0, Decimal(0)])
+    for line in lines:
+        revenue = Decimal(line.Price) * line.Quantity
+        for totals in (sellers[line.SellerID], products[(line.ProductID, line.SellerID)], categories[line.CategoryID]):
+            totals[0] += line.Quantity
+            totals[1] += revenue
+
+    for seller_id, (units, revenue) in sellers.items():
+        _bump(db, SellerDailySales, {"SellerID": seller_id, "SalesDate": day}, sign, sign * units, sign * revenue)
+    for (product_id, seller_id), (units, revenue) in products.items():
+        _bump(
+            db, ProductDailySales, {"ProductID": product_id, "SalesDate": day}, sign, sign * units, sign * revenue,
+            SellerID=seller_id
+        )
+    for category_id, (units, revenue) in categories.items():
+        _bump(db, CategoryDailySales, {"CategoryID": category_id, "SalesDate": day}, sign, sign * units, sign * revenue)
+
+# --- Handler chạy nền (đăng ký vào hàng đợi BackgroundJob) ---
+
+@job_handler("rollup.order_placed", events=[ORDER_PLACED_EVENT])
+def on_order_placed(db: Session, payload: Dict[str, Any]) -> None:
+    # Luôn cộng vào: nếu đơn đã bị hủy trước khi job này chạy, job đổi trạng thái sẽ trừ đi tương ứng
+    apply_order(db, payload["order_id"], 1)
+
+@job_handler("rollup.order_status_changed", events=[ORDER_STATUS_CHANGED_EVENT])
+def on_order_status_changed(db: Session, payload: Dict[str, Any]) -> None:
+    was_counted = _is_counted(payload["old_status"])
+    now_counted = _is_counted(payload["new_status"])
+    if was_counted != now_counted:
+        apply_order(db, payload["order_id"], 1 if now_counted else -1)
+
+# --- Dựng lại toàn bộ bảng tổng hợp từ OrderDetail ---
+
+def _day_expr(db: Session, column):
+    # SQLite không có kiểu DATE thật: CAST(... AS DATE) trả về số, phải dùng hàm date()
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+def _insert_batches(db: Session, model, rows) -> int:
+    batch, total = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            db.execute(insert(model), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(model), batch)
+        total += len(batch)
+    return total
+
+def rebuild_rollups(db: Session) -> Dict[str, int]:
+    """Xóa và tính lại toàn bộ bảng tổng hợp (quét toàn bộ OrderDetail). Commit 1 lần ở cuối.
+       Kết quả GROUP BY được đọc hết trước khi INSERT (không giữ 2 result set mở trên 1 kết nối)."""
+    day = _day_expr(db, Order.OrderDate)
+    units = func.sum(OrderDetail.Quantity)
+    revenue = func.sum(OrderDetail.Price * OrderDetail.Quantity)
+    orders = func.count(func.distinct(OrderDetail.OrderID))
+    counted = Order.OrderStatus != OrderStatus.CANCELED
+
+    seller_query = select(OrderDetail.SellerID, day, orders, units, revenue).join(
+        Order, Order.OrderID == OrderDetail.OrderID
+    ).where(counted).group_by(OrderDetail.SellerID, day)
+
+    product_query = select(OrderDetail.ProductID, OrderDetail.SellerID, day, orders, units, revenue).join(
+        Order, Order.OrderID == OrderDetail.OrderID
+    ).where(counted).group_by(OrderDetail.ProductID, OrderDetail.SellerID, day)
+
+    category_query = select(Product.CategoryID, day, orders, units, revenue).join(
+        Order, Order.OrderID == OrderDetail.OrderID
+    ).join(Product, Product.ProductID == OrderDetail.ProductID).where(counted).group_by(Product.CategoryID, day)
+
+    for model in (SellerDailySales, ProductDailySales, CategoryDailySales):
+        db.execute(delete(model))
+
+    result = {
+        "SellerDailySales": _insert_batches(db, SellerDailySales, (
+            {"SellerID": r[0], "SalesDate": _as_date(r[1]), "OrderCount": r[2], "UnitsSold": r[3], "Revenue": r[4]}
+            for r in db.execute(seller_query).all()
+        )),
+        "ProductDailySales": _insert_batches(db, ProductDailySales, (
+            {"ProductID": r[0], "SellerID": r[1], "SalesDate": _as_date(r[2]), "OrderCount": r[3], "UnitsSold": r[4], "Revenue": r[5]}
+            for r in db.execute(product_query).all()
+        )),
+        "CategoryDailySales": _insert_batches(db, CategoryDailySales, (
+            {"CategoryID": r[0], "SalesDate": _as_date(r[1]), "OrderCount": r[2], "UnitsSold": r[3], "Revenue": r[4]}
+            for r in db.execute(category_query).all()
+        )),
+    }
+    db.commit()
+    return result
@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Build tài nguyên tĩnh (python -m app.manage build-assets), đầu ra ở ASSETS_BUILD_DIR:
+#   assets/<đường dẫn>/<tên>.<hash>.<đuôi>  (+ .br/.gz)  -> phục vụ ở ASSETS_URL, cache 1 năm (immutable)
+#   templates/<trang>.html (+ .br/.gz)                    -> HTML đã đổi src/href sang URL có hash
+#   manifest.json                                         -> {"css/style.css": "css/style.1a2b3c4d5e.css", ...}
+MANIFEST_FILE = "manifest.json"
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".html", ".svg", ".json", ".txt", ".map", ".xml", ".ttf", ".otf", ".eot"}
+SKIPPED_DIRS = {"scss", "__pycache__"} # Mã nguồn, không phục vụ trực tiếp
+SKIPPED_EXTENSIONS = {".php", ".md"}
+HASH_LENGTH = 10
+
+_ATTRIBUTE_RE = re.compile(r"""\b(src|href)=(["'])([^"']+)\2""")
+_CSS_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+_SOURCE_PREFIXES = ("../templates/", "/templates/", "/app/templates/")
+
+def _source_files(source: Path) -> List[str]:
+    return sorted(
+        path.relative_to(source).as_posix() for path in source.rglob("*")
+        if path.is_file() and not SKIPPED_DIRS.intersection(path.relative_to(source).parts[:-1])
+        and path.suffix not in SKIPPED_EXTENSIONS
+    )
+
+def _fingerprinted(relative: str, data: bytes) -> str:
+    root, ext = posixpath.splitext(relative)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+def _is_external(value: str) -> bool:
+    return value.startswith(("http:", "https:", "//", "data:", "#", "mailto:", "javascript:")) or "${" in value
+
+def _resolve(base_dir: str, value: str) -> Optional[str]:
+    """src/href/url() -> khóa trong manifest (đường dẫn tương đối so với thư mục nguồn)."""
+    if _is_external(value):
+        return None
+    value = value.split("#")[0].split("?")[0]
+    for prefix in _SOURCE_PREFIXES:
+        if value.startswith(prefix):
+            return value[len(prefix):]
+    if value.startswith("/"):
+        return None
+    return posixpath.normpath(posixpath.join(base_dir, value))
+
+def _write(path: Path, data: bytes) -> None:
+    """Ghi file kèm bản nén .gz/.br (chỉ khi loại file nén được và bản nén nhỏ hơn hẳn)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    if path.suffix not in COMPRESSIBLE_EXTENSIONS or len(data) < settings.ASSETS_COMPRESS_MIN_BYTES:
+        return
+    compressed = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+        compressed[".br"] = brotli.compress(data, quality=11)
+    except ImportError:
+        pass
+    for suffix, payload in compressed.items():
+        if len(payload) < len(data) * 0.9:
+            path.with_name(path.name + suffix).write_bytes(payload)
+
+def build_assets(source_dir: Optional[str] = None, build_dir: Optional[str] = None) -> Dict[str, str]:
+    """Đặt hash nội dung vào tên file, nén sẵn gzip/brotli và đổi tham chiếu trong CSS/HTML.
+       Ghi ra thư mục tạm rồi đổi tên, app đang chạy không thấy build dở dang."""
+    source = Path(source_dir or settings.ASSETS_SOURCE_DIR)
+    target = Path(build_dir or settings.ASSETS_BUILD_DIR)
+    staging = target.with_name(target.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    files = _source_files(source)
+    pages = [name for name in files if name.endswith(".html")]
+    # CSS sau cùng: nội dung (và hash) phụ thuộc tên mới của ảnh/font mà nó tham chiếu
+    assets = sorted((name for name in files if not name.endswith(".html")), key=lambda name: name.endswith(".css"))
+    manifest: Dict[str, str] = {}
+    for name in assets:
+        data = (source / name).read_bytes()
+        if name.endswith(".css"):
+            base_dir = posixpath.dirname(name)
+
+            def rewrite_url(match: re.Match) -> str:
+                key = _resolve(base_dir, match.group(2).strip())
+                if key not in manifest:
+                    return match.group(0)
+                return f"url({settings.ASSETS_URL}/{manifest[key]})"
+
+            data = _CSS_URL_RE.sub(rewrite_url, data.decode("utf-8")).encode("utf-8")
+        manifest[name] = _fingerprinted(name, data)
+        _write(staging / "assets" / manifest[name], data)
+
+    for name in pages:
+        base_dir = posixpath.dirname(name)
+
+        def rewrite_attribute(match: re.Match) -> str:
+            key = _resolve(base_dir, match.group(3))
+            if key not in manifest:
+                return match.group(0)
+            return f"{match.group(1)}={match.group(2)}{settings.ASSETS_URL}/{manifest[key]}{match.group(2)}"
+
+        html = _ATTRIBUTE_RE.sub(rewrite_attribute, (source / name).read_text(encoding="utf-8"))
+        _write(staging / "templates" / name, html.encode("utf-8"))
+
+    (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    if target.exists():
+        old = target.with_name(target.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(target, old)
+        os.replace(staging, target)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staging, target)
+    return manifest
+
+def load_asset_build() -> Optional[Path]:
+    """Thư mục build dùng được, hoặc None: chưa build, đã tắt, hoặc mã nguồn sửa sau lần build cuối
+       (tránh phục vụ HTML/CSS cũ khi đang phát triển, chạy lại manage build-assets để dùng build)."""
+    if not settings.ASSETS_BUILD_ENABLED:
+        return None
+    build = Path(settings.ASSETS_BUILD_DIR)
+    manifest = build / MANIFEST_FILE
+    if not manifest.exists():
+        return None
+    built_at = manifest.stat().st_mtime
+    source = Path(settings.ASSETS_SOURCE_DIR)
+    for name in _source_files(source):
+        if (source / name).stat().st_mtime > built_at:
+            logger.warning("Tài nguyên tĩnh đã sửa sau lần build cuối (%s), bỏ qua %s", name, build)
+            return None
+    return build
@@ -0,0 +1,184 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.templating import Jinja2Templates
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.compression import compress_bytes, negotiate_encoding
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.core.constants import ProductStatus
+from app.models.sqlmodels import Category, Product
+from app.services.catalog_version import catalog_version
+from app.services.product_service import product_service
+
+# Trang cửa hàng render ở server (SSR) và cache sẵn HTML (kèm bản nén) trong bộ nhớ.
+# Trang HTML gốc vẫn là file tĩnh phục vụ được ở /templates, nên chỗ cần dữ liệu được đánh dấu bằng
+# comment HTML thay vì thẻ Jinja:  <!--ssr:category-menu--> ... nội dung mẫu ... <!--/ssr:category-menu-->
+# Khi render, đoạn giữa 2 comment được thay bằng partials/category_menu.html.
+PAGE_FRAGMENTS: Dict[str, List[str]] = {
+    "index.html": ["category-menu"],
+    "shop.html": ["category-menu", "category-list", "product-grid", "initial-data"],
+    # Trang chi tiết không nhúng sản phẩm: lượt xem (ViewCount, điểm thịnh hành) được đếm khi trang gọi
+    # API chi tiết (services.view_counter), nhúng sẵn vào HTML cache thì sẽ không đếm được
+    "details.html": ["category-menu"],
+    "cart.html": ["category-menu"],
+    "user/seller_dashboard.html": [],
+    "moderator/moderator_dashboard.html": [],
+    "moderator/moderator_products.html": [],
+    "moderator/moderator_users.html": [],
+    "moderator/moderator_profile.html": [],
+    "admin/dashboard_admin.html": [],
+    "admin/admin_moderators.html": [],
+    "admin/admin_users.html": [],
+    "admin/admin_categories.html": [],
+    "admin/admin_products.html": [],
+    "admin/admin_profile.html": [],
+}
+GRID_SIZE = 9 # Số sản phẩm trang đầu, khớp window.itemsPerPage trong shop.html
+IMAGE_FALLBACK = "https://placehold.co/300x200/f5f5f5/555555?text=No+Image"
+
+_FRAGMENT_RE = re.compile(r"<!--ssr:([a-z-]+)-->.*?<!--/ssr:\1-->", re.DOTALL)
+
+def format_vnd(amount) -> str:
+    """Giống Intl.NumberFormat('vi-VN', {style: 'currency', currency: 'VND'}) ở client: 1.250.000 ₫"""
+    return f"{int(round(float(amount or 0))):,}".replace(",", ".") + " ₫"
+
+# --- CACHE TRANG ĐÃ RENDER ---
+@dataclass
+class CachedPage:
+    version: int # catalog_version lúc bắt đầu render
+    expires_at: float
+    body: bytes
+    etag: str
+    encoded: Dict[str, bytes] = field(default_factory=dict) # Content-Encoding -> body đã nén (tạo khi cần)
+
+class PageCache:
+    """LRU theo tên trang. Bản cache hết hiệu lực khi hết TTL hoặc catalog đổi phiên bản."""
+
+    def __init__(self, max_pages: int, ttl_seconds: float):
+        self.max_pages = max_pages
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._pages: "OrderedDict[str, CachedPage]" = OrderedDict()
+
+    def get(self, name: str) -> Optional[CachedPage]:
+        with self._lock:
+            page = self._pages.get(name)
+            if page is None:
+                return None
+            if page.version != catalog_version.value or page.expires_at <= time.monotonic():
+                del self._pages[name]
+                return None
+            self._pages.move_to_end(name)
+            return page
+
+    def put(self, name: str, version: int, body: bytes) -> CachedPage:
+        """version phải lấy TRƯỚC khi đọc dữ liệu: catalog đổi trong lúc render thì bản này bị bỏ ở lần get sau."""
+        page = CachedPage(version, time.monotonic() + self.ttl_seconds, body, hashlib.sha1(body).hexdigest()[:16])
+        with self._lock:
+            self._pages[name] = page
+            self._pages.move_to_end(name)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return page
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+# --- RENDER ---
+class StorefrontRenderer:
+    """Render trang HTML: template đã biên dịch sẵn (precompile lúc khởi động) + partial dữ liệu catalog.
+       Mọi khách đều nhận cùng 1 bản HTML (đăng nhập nằm ở localStorage phía client) nên cache chung được."""
+
+    def __init__(self, templates: Jinja2Templates, session_factory: Callable[[], Session]):
+        self.templates = templates
+        self.session_factory = session_factory
+        self.cache = PageCache(settings.SSR_CACHE_MAX_PAGES, settings.SSR_CACHE_TTL_SECONDS)
+        templates.env.filters["vnd"] = format_vnd
+
+    def precompile(self) -> int:
+        """Biên dịch trước các trang và partial (Jinja giữ bản đã biên dịch), request đầu không phải chờ."""
+        names = list(PAGE_FRAGMENTS)
+        names += {f"partials/{fragment.replace('-', '_')}.html" for fragments in PAGE_FRAGMENTS.values() for fragment in fragments}
+        for name in names:
+            self.templates.get_template(name)
+        return len(names)
+
+    def _load_context(self, db: Session, fragments: List[str]) -> dict:
+        context = {"image_fallback": IMAGE_FALLBACK, "grid_size": GRID_SIZE}
+        if {"category-menu", "category-list"} & set(fragments):
+            rows = db.query(Category.CategoryID, Category.CategoryName, func.count(Product.ProductID).label("ProductCount")).outerjoin(
+                Product, (Product.CategoryID == Category.CategoryID)
+                & (Product.Status == ProductStatus.APPROVED) & (Product.IsDeleted == False)
+            ).filter(Category.IsDeleted == False).group_by(Category.CategoryID, Category.CategoryName).order_by(Category.CategoryName).all()
+            context["categories"] = rows
+        if {"product-grid", "initial-data"} & set(fragments):
+            products = product_service.get_products_with_primary_image(
+                db, skip=0, limit=settings.SSR_PRODUCTS_LIMIT, status=ProductStatus.APPROVED, image_width=settings.LISTING_IMAGE_WIDTH
+            )
+            context["products"] = [product.model_dump(mode="json") for product in products]
+        return context
+
+    def render(self, name: str) -> bytes:
+        fragments = PAGE_FRAGMENTS[name]
+        html = self.templates.get_template(name).render()
+        if not fragments:
+            return html.encode("utf-8")
+        db = self.session_factory()
+        try:
+            context = self._load_context(db, fragments)
+        finally:
+            db.close()
+        rendered = {
+            fragment: self.templates.get_template(f"partials/{fragment.replace('-', '_')}.html").render(context)
+            for fragment in fragments
+        }
+        # Giữ lại 2 comment đánh dấu; fragment trang không dùng thì để nguyên nội dung mẫu
+        html = _FRAGMENT_RE.sub(
+            lambda match: f"<!--ssr:{match.group(1)}-->{rendered[match.group(1)]}<!--/ssr:{match.group(1)}-->"
+            if match.group(1) in rendered else match.group(0),
+            html,
+        )
+        return html.encode("utf-8")
+
+    def get_page(self, name: str) -> Tuple[CachedPage, bool]:
+        """(trang, có lấy từ cache không)."""
+        if not settings.SSR_CACHE_ENABLED:
+            body = self.render(name)
+            return CachedPage(catalog_version.value, 0.0, body, hashlib.sha1(body).hexdigest()[:16]), False
+        page = self.cache.get(name)
+        CACHE_REQUESTS.labels("ssr_page", "miss" if page is None else "hit").inc()
+        if page is not None:
+            return page, True
+        version = catalog_version.value
+        return self.cache.put(name, version, self.render(name)), False
+
+    def serve(self, request: Request, name: str) -> Response:
+        """Trả trang (nén theo Accept-Encoding, ETag riêng cho từng bản nén, If-None-Match -> 304)."""
+        page, hit = self.get_page(name)
+        headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding", "X-Page-Cache": "hit" if hit else "miss"}
+        levels = settings.COMPRESSION_LEVELS.get("text/html", {})
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), levels) \
+            if len(page.body) >= settings.COMPRESSION_MIN_BYTES else None
+        etag = f'"{page.etag}-{encoding}"' if encoding else f'"{page.etag}"'
+        headers["ETag"] = etag
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # Bản trình duyệt đã cache còn dùng được không (304)
+            CACHE_REQUESTS.labels("browser_page", "hit" if etag in if_none_match else "miss").inc()
+            if etag in if_none_match:
+                return Response(status_code=304, headers=headers)
+        body = page.body
+        if encoding:
+            body = page.encoded.get(encoding)
+            if body is None:
+                body = page.encoded[encoding] = compress_bytes(encoding, levels[encoding], page.body)
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type="text/html", headers=headers)
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+
+# Nhận diện ảnh theo magic bytes (không tin Content-Type / đuôi file do client gửi)
+IMAGE_SIGNATURES: List[Tuple[bytes, str, str]] = [
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+]
+
+@dataclass
+class StagedUpload:
+    """File đã ghi xong ra thư mục tạm, chờ được rename vào chỗ."""
+    path: Path
+    size: int
+    sha256: str
+    content_type: str
+    extension: str
+
+def sniff_image_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """Trả về (content_type, đuôi file) theo vài byte đầu, None nếu không phải ảnh hỗ trợ."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    for signature, content_type, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    return None
+
+class UploadRejected(ValueError):
+    """File tải lên không hợp lệ; status_code là mã HTTP tương ứng (415/413/400)."""
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+class _StagingWriter:
+    """Ghi 1 file ra thư mục tạm theo từng chunk: vừa ghi vừa hash SHA-256,
+       nhận diện định dạng ở chunk đầu và kiểm tra dung lượng."""
+
+    def __init__(self, filename: Optional[str]):
+        self.filename = filename
+        tmp_dir = Path(settings.UPLOAD_TMP_DIR)
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.path = tmp_dir / f"{uuid.uuid4().hex}.part"
+        self.handle = self.path.open("wb")
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.detected: Optional[Tuple[str, str]] = None
+
+    def check(self, chunk: bytes) -> None:
+        if self.detected is None:
+            self.detected = sniff_image_type(chunk)
+            if self.detected is None or self.detected[0] not in settings.UPLOAD_ALLOWED_IMAGE_TYPES:
+                raise UploadRejected(
+                    status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    f"File '{self.filename}' không đúng định dạng ảnh cho phép ({', '.join(settings.UPLOAD_ALLOWED_IMAGE_TYPES)})."
+                )
+        self.size += len(chunk)
+        if self.size > settings.UPLOAD_MAX_IMAGE_BYTES:
+            raise UploadRejected(
+                413, f"File '{self.filename}' vượt quá {settings.UPLOAD_MAX_IMAGE_BYTES // (1024 * 1024)} MB."
+            )
+        self.digest.update(chunk)
+
+    def write(self, chunk: bytes) -> None:
+        self.handle.write(chunk)
+
+    def finish(self) -> StagedUpload:
+        if self.size == 0:
+            raise UploadRejected(status.HTTP_400_BAD_REQUEST, f"File '{self.filename}' rỗng.")
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+        self.handle.close()
+        return StagedUpload(
+            path=self.path, size=self.size, sha256=self.digest.hexdigest(),
+            content_type=self.detected[0], extension=self.detected[1]
+        )
+
+    def abort(self) -> None:
+        self.handle.close()
+        self.path.unlink(missing_ok=True)
+
+async def stage_upload(file: UploadFile) -> StagedUpload:
+    """Đọc UploadFile theo từng chunk, vừa đọc vừa hash SHA-256 và kiểm tra dung lượng/định dạng,
+       ghi ra thư mục tạm (ghi đĩa chạy trong threadpool, không chặn event loop)."""
+    declared = (file.content_type or "").split(";")[0].strip().lower()
+    if declared and not declared.startswith("image/") and declared != "application/octet-stream":
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"File '{file.filename}' không phải ảnh."
+        )
+
+    writer = await run_in_threadpool(_StagingWriter, file.filename)
+    try:
+        while True:
+            chunk = await file.read(settings.UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            writer.check(chunk)
+            await run_in_threadpool(writer.write, chunk)
+        return await run_in_threadpool(writer.finish)
+    except UploadRejected as e:
+        writer.abort()
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except BaseException:
+        writer.abort()
+        raise
+
+def stage_stream(source: IO[bytes], filename: Optional[str]) -> StagedUpload:
+    """Bản đồng bộ của stage_upload cho file đọc từ nơi khác (vd. ảnh trong file zip khi nhập hàng loạt).
+       File không hợp lệ -> UploadRejected."""
+    writer = _StagingWriter(filename)
+    try:
+        while True:
+            chunk = source.read(settings.UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            writer.check(chunk)
+            writer.write(chunk)
+        return writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
+
+async def stage_uploads(files: List[UploadFile]) -> List[StagedUpload]:
+    """Ghi tạm tất cả file; 1 file lỗi thì xóa các file đã ghi và ném lỗi."""
+    staged: List[StagedUpload] = []
+    try:
+        for file in files:
+            staged.append(await stage_upload(file))
+    except BaseException:
+        discard_staged(staged)
+        raise
+    return staged
+
+def move_into_place(upload: StagedUpload, destination: Path) -> None:
+    """Rename nguyên tử (thư mục tạm và thư mục đích phải cùng ổ đĩa)."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(upload.path, destination)
+
+def discard_staged(staged: List[StagedUpload]) -> None:
+    """Xóa file tạm còn sót (file đã được rename vào chỗ thì bỏ qua)."""
+    for upload in staged:
+        upload.path.unlink(missing_ok=True)
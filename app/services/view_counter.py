@@ -0,0 +1,79 @@
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Optional
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.sqlmodels import Product
+
+logger = logging.getLogger(__name__)
+
+# Lượt xem sản phẩm (ViewCount, dùng cho bảng xếp hạng thịnh hành): API chi tiết chỉ cộng vào bộ đếm
+# trong bộ nhớ (không ghi DB trong request, đọc chi tiết vẫn từ replica); thread nền cộng dồn vào
+# primary mỗi VIEW_COUNT_FLUSH_SECONDS giây bằng 1 câu UPDATE ViewCount = ViewCount + n cho cả lô
+# (cộng ngay trong SQL nên nhiều process cùng ghi không mất lượt nào).
+
+class ViewCounter:
+    def __init__(self, session_factory: sessionmaker, interval: float):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, product_id: int) -> None:
+        with self._lock:
+            self._pending[product_id] += 1
+
+    def flush(self) -> int:
+        """Ghi các lượt xem đang chờ vào DB, trả về số sản phẩm được cập nhật. Lỗi -> trả lại bộ đếm."""
+        with self._lock:
+            pending: Dict[int, int] = dict(self._pending)
+            self._pending.clear()
+        if not pending:
+            return 0
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(Product.__table__)
+                .where(Product.__table__.c.ProductID == bindparam("product_id"))
+                .values(ViewCount=Product.__table__.c.ViewCount + bindparam("views")),
+                [{"product_id": pid, "views": views} for pid, views in pending.items()]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._pending.update(pending)
+            raise
+        finally:
+            db.close()
+        return len(pending)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="view-counter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Dừng thread và ghi nốt lượt xem còn trong bộ nhớ."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Không ghi được lượt xem sản phẩm khi tắt")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Không ghi được lượt xem sản phẩm")
+
+view_counter = ViewCounter(SessionLocal, settings.VIEW_COUNT_FLUSH_SECONDS) # Ghi vào primary
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.constants import ProductStatus
+from app.core.database import ReplicaSessionLocal, engine, replica_engine
+from app.crud.crud_category import category_crud
+from app.models.sqlmodels import PaymentMethod, Role
+from app.services.product_service import product_service
+
+logger = logging.getLogger(__name__)
+
+# Warm-up sau khi worker khởi động: mở sẵn pool kết nối, đọc trước dữ liệu hay dùng (cache trang
+# của SQLite/DB + cache câu SQL đã biên dịch của SQLAlchemy), render sẵn trang cửa hàng và import
+# các module nạp lười. Chạy ở thread nền; /health/ready trả 503 tới khi xong để load balancer
+# chỉ chuyển request tới worker đã "nóng".
+WarmupTask = Tuple[str, Callable[[], None]]
+
+@dataclass
+class WarmupStep:
+    name: str
+    ok: bool
+    elapsed_ms: float
+    error: Optional[str] = None
+
+class Readiness:
+    """Trạng thái sẵn sàng nhận request của worker này."""
+
+    def __init__(self):
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.steps: List[WarmupStep] = []
+        self.elapsed_ms: Optional[float] = None
+        self._shutting_down = False
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self) -> None:
+        if not self._shutting_down: # Warm-up xong sau khi đã nhận tín hiệu tắt: vẫn not-ready
+            self._ready.set()
+
+    def mark_not_ready(self) -> None:
+        self._ready.clear()
+
+    def drain_on_signal(self, delay: float, signum: int = signal.SIGTERM) -> Optional[Callable[[], None]]:
+        """Nhận tín hiệu tắt: báo not-ready ngay, `delay` giây sau mới chuyển tín hiệu cho handler cũ (uvicorn
+           ngừng nhận kết nối rồi xử lý nốt request) -> load balancer kịp thấy /health/ready = 503 và ngừng
+           gửi request mới trong lúc worker vẫn phục vụ. Gọi trong lifespan (uvicorn đã cài handler của nó);
+           tín hiệu thứ 2 chuyển đi ngay. Trả về hàm gỡ handler, None nếu không cài được (không phải main thread)."""
+        previous = signal.getsignal(signum)
+        if delay <= 0 or not callable(previous) or threading.current_thread() is not threading.main_thread():
+            return None
+        loop = asyncio.get_running_loop()
+
+        def handle(sig, frame) -> None:
+            if self._shutting_down:
+                previous(sig, frame)
+                return
+            self._shutting_down = True
+            self.mark_not_ready()
+            logger.info("Nhận tín hiệu %s: /health/ready trả 503, ngừng nhận request sau %.1f giây", sig, delay)
+            loop.call_soon_threadsafe(loop.call_later, delay, previous, sig, frame)
+
+        signal.signal(signum, handle)
+
+        def restore() -> None:
+            if signal.getsignal(signum) is handle:
+                signal.signal(signum, previous)
+        return restore
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def run(self, tasks: List[WarmupTask]) -> None:
+        """Chạy lần lượt các bước; bước lỗi chỉ ghi log (warm-up là tối ưu, không phải điều kiện chạy)."""
+        started = time.perf_counter()
+        self.steps = []
+        for name, task in tasks:
+            step_started = time.perf_counter()
+            try:
+                task()
+                self.steps.append(WarmupStep(name, True, (time.perf_counter() - step_started) * 1000))
+            except Exception as e:
+                logger.warning("Warm-up: bước %s lỗi", name, exc_info=True)
+                self.steps.append(WarmupStep(name, False, (time.perf_counter() - step_started) * 1000, str(e)))
+        self.elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info("Warm-up xong sau %.0f ms", self.elapsed_ms)
+        self.mark_ready()
+
+    def start(self, tasks: List[WarmupTask]) -> None:
+        self.mark_not_ready()
+        self._thread = threading.Thread(target=self.run, args=(tasks,), name="warmup", daemon=True)
+        self._thread.start()
+
+readiness = Readiness()
+
+# --- CÁC BƯỚC WARM-UP ---
+def open_pool(db_engine: Engine, size: int) -> None:
+    """Mở cùng lúc `size` kết nối rồi trả về pool (pool giữ lại, request đầu không phải chờ kết nối/PRAGMA)."""
+    connections = []
+    try:
+        for _ in range(max(1, size)):
+            connection = db_engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+def load_reference_data() -> None:
+    """Danh mục, phương thức thanh toán, vai trò: bảng nhỏ, đọc ở gần như mọi trang/đơn hàng/xác thực."""
+    db = ReplicaSessionLocal()
+    try:
+        category_crud.get_all(db)
+        db.query(PaymentMethod).all()
+        db.query(Role).all()
+    finally:
+        db.close()
+
+def load_catalog_pages(pages: int, page_size: int) -> None:
+    """Các trang đầu của /products/ (cùng truy vấn với API, đọc từ replica như API)."""
+    db = ReplicaSessionLocal()
+    try:
+        for page in range(pages):
+            product_service.get_products_with_primary_image(
+                db, skip=page * page_size, limit=page_size, status=ProductStatus.APPROVED,
+                image_width=settings.LISTING_IMAGE_WIDTH
+            )
+    finally:
+        db.close()
+
+def load_lazy_modules() -> None:
+    """Module nạp lười lúc khởi động (xem benchmarks/check_import_time.py) nhưng request nào cũng cần."""
+    from jose import jwt # noqa: F401 (xác thực JWT)
+    from app.core.security import get_pwd_context
+    get_pwd_context() # passlib/bcrypt (đăng nhập, đăng ký)
+
+def build_warmup_tasks(storefront, ranking_refresher) -> List[WarmupTask]:
+    tasks: List[WarmupTask] = [("db_pool", lambda: open_pool(engine, settings.DB_POOL_SIZE))]
+    if replica_engine is not engine:
+        tasks.append(("replica_pool", lambda: open_pool(replica_engine, settings.DB_POOL_SIZE)))
+    tasks += [
+        ("reference_data", load_reference_data),
+        ("catalog_pages", lambda: load_catalog_pages(settings.WARMUP_CATALOG_PAGES, settings.WARMUP_PAGE_SIZE)),
+        ("storefront_pages", lambda: [storefront.get_page(name) for name in ("index.html", "shop.html")]),
+        ("lazy_modules", load_lazy_modules),
+    ]
+
+    def wait_for_ranking() -> None:
+        # RankingRefresher tự làm mới lần đầu khi start(), ở đây chỉ chờ (không tính 2 lần)
+        if not ranking_refresher.first_run_done.wait(settings.WARMUP_TIMEOUT_SECONDS):
+            raise TimeoutError(f"Bảng xếp hạng chưa làm mới xong sau {settings.WARMUP_TIMEOUT_SECONDS} giây")
+
+    tasks.append(("ranking", wait_for_ranking))
+    return tasks
+
+def check_database() -> None:
+    """Kiểm tra nhanh kết nối DB chính (dùng cho /health/ready)."""
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
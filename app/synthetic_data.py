@@ -0,0 +1,268 @@
+# synthetic_data.py - Sinh dữ liệu giả lập khối lượng lớn (users, sản phẩm + ảnh, giỏ hàng, đơn hàng) để đo hiệu năng
+# Ví dụ: python -m app.manage generate --users 100000 --products 1000000 --orders 500000 --seed 42
+import bisect
+import math
+import random
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Callable, Dict, Iterator, List, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from app.core.constants import OrderStatus, ProductStatus, RoleID
+from app.core.database import insert_returning_ids
+from app.core.security import get_password_hash
+from app.initial_data import CATEGORIES_DATA, PAYMENT_METHODS_DATA
+from app.models.sqlmodels import (
+    ContactInfo, Order, OrderDetail, Product, ProductImage, ShoppingCart, ShoppingCartItem, User, UserRole
+)
+
+SYNTHETIC_PASSWORD = "synthetic-pass"
+# Ảnh mẫu có sẵn trong static/images/products (dùng lại để trang sản phẩm hiển thị được)
+SAMPLE_IMAGES = [f"/static/images/products/product-{i}.jpg" for i in range(1, 6)]
+TITLE_WORDS = ["Áo", "Quần", "Giày", "Điện thoại", "Laptop", "Tai nghe", "Bàn", "Ghế", "Nồi cơm", "Đèn", "Chậu cây", "Đồng hồ"]
+TITLE_ADJECTIVES = ["cũ", "còn mới", "like new", "đã qua sử dụng", "hàng tuyển", "thanh lý"]
+
+@dataclass
+class GeneratorConfig:
+    users: int = 10000
+    products: int = 100000
+    orders: int = 50000
+    seed: int = 42
+    batch_size: int = 5000
+    moderators: int = 10
+    login_users: int = 10 # Moderator + N khách hàng đầu có mật khẩu thật (bcrypt chậm), còn lại không đăng nhập được
+    seller_ratio: float = 0.2 # Tỉ lệ user có đăng bán
+    seller_skew: float = 1.2 # Zipf: số sản phẩm của mỗi người bán (ít người bán nhiều sản phẩm)
+    popularity_skew: float = 1.1 # Zipf: tần suất sản phẩm xuất hiện trong đơn/giỏ hàng
+    images_per_product: int = 3 # Tối đa, mỗi sản phẩm có 1..N ảnh
+    approved_ratio: float = 0.8 # Còn lại chia đều PENDING / REJECTED
+    price_median: float = 300000 # Giá (VND) phân phối log-normal quanh trung vị này
+    price_sigma: float = 1.0
+    cart_ratio: float = 0.3 # Tỉ lệ user có sản phẩm trong giỏ
+    cart_items_mean: float = 3.0
+    items_per_order_mean: float = 2.0
+    days: int = 365 # Ngày đặt hàng / đăng sản phẩm rải đều trong N ngày gần nhất
+    order_status_weights: Dict[int, float] = field(default_factory=lambda: {
+        OrderStatus.PENDING: 0.1, OrderStatus.PROCESSING: 0.1, OrderStatus.SHIPPED: 0.1,
+        OrderStatus.DELIVERED: 0.6, OrderStatus.CANCELED: 0.1
+    })
+
+def _zipf_cum_weights(n: int, skew: float, rng: random.Random) -> List[float]:
+    """Trọng số Zipf (1/rank^skew) cộng dồn, thứ hạng được xáo trộn để phần tử phổ biến không dồn về ID nhỏ."""
+    ranks = list(range(1, n + 1))
+    rng.shuffle(ranks)
+    return list(accumulate(1.0 / (rank ** skew) for rank in ranks))
+
+def _geometric(rng: random.Random, mean: float) -> int:
+    """Số nguyên >= 1 có trung bình xấp xỉ mean (phân phối hình học)."""
+    if mean <= 1:
+        return 1
+    p = 1.0 / mean
+    return 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - p))
+
+class SyntheticDataGenerator:
+    """Sinh dữ liệu bằng INSERT theo lô (executemany), commit sau mỗi lô. Cùng seed -> cùng dữ liệu."""
+
+    def __init__(self, db: Session, config: GeneratorConfig, log: Callable[[str], None] = print):
+        self.db = db
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.log = log
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.category_ids = [row["CategoryID"] for row in CATEGORIES_DATA]
+        self.payment_method_ids = [row["PaymentMethodID"] for row in PAYMENT_METHODS_DATA]
+
+    # --- Tiện ích ---
+    def _batches(self, rows: Iterator[dict]) -> Iterator[List[dict]]:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.config.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _insert(self, model, rows: Iterator[dict]) -> int:
+        """INSERT theo lô (executemany), commit sau mỗi lô. Trả về số dòng."""
+        count = 0
+        for batch in self._batches(rows):
+            self.db.execute(insert(model), batch)
+            self.db.commit()
+            count += len(batch)
+        return count
+
+    def _insert_returning(self, model, rows: Iterator[dict], key) -> array:
+        """Như _insert nhưng trả về khóa chính mới theo đúng thứ tự các dòng (RETURNING)."""
+        ids = array("q")
+        for batch in self._batches(rows):
+            ids.extend(insert_returning_ids(self.db, key, batch))
+            self.db.commit()
+        return ids
+
+    def _past(self, max_days: Optional[int] = None) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange((max_days or self.config.days) * 86400))
+
+    def _step(self, name: str, fn: Callable[[], int]) -> None:
+        started = time.perf_counter()
+        count = fn()
+        self.log(f"✅ {name}: {count} dòng ({time.perf_counter() - started:.1f}s)")
+
+    # --- Các bước sinh dữ liệu ---
+    def run(self) -> None:
+        if self.db.scalar(select(func.count()).select_from(User).where(User.Username.like("synthetic%"))):
+            raise ValueError("Database đã có dữ liệu giả lập, hãy dùng database mới.")
+        if self.config.users <= self.config.moderators:
+            raise ValueError("Số user phải lớn hơn số moderator.")
+        self._step("User + UserRole + ShoppingCart", self._generate_users)
+        self._step("Product", self._generate_products)
+        self._step("ProductImage", self._generate_images)
+        self._step("ShoppingCartItem", self._generate_cart_items)
+        self._step("ContactInfo", self._generate_contacts)
+        self._step("Order + OrderDetail", self._generate_orders)
+
+    def _generate_users(self) -> int:
+        config = self.config
+
+        def users():
+            for i in range(config.users):
+                key = f"{self.rng.getrandbits(128):032x}"
+                can_login = i < config.moderators + config.login_users
+                yield {
+                    "Username": f"synthetic{i}", "Email": f"synthetic{i}@example.com", "FullName": f"Synthetic User {i}",
+                    "PasswordHash": get_password_hash(SYNTHETIC_PASSWORD, key) if can_login else "x", "RandomKey": key, "PhoneNumber": f"09{i:08d}"[-10:],
+                    "IsActive": True, "IsDeleted": False, "CreatedAt": self._past()
+                }
+
+        self.user_ids = self._insert_returning(User, users(), User.UserID)
+        self._insert(UserRole, (
+            {"UserID": user_id, "RoleID": RoleID.MODERATOR if i < config.moderators else RoleID.CUSTOMER}
+            for i, user_id in enumerate(self.user_ids)
+        ))
+        self.cart_ids = self._insert_returning(ShoppingCart, (
+            {"UserID": user_id, "LastUpdated": self.now} for user_id in self.user_ids
+        ), ShoppingCart.CartID)
+        self.customer_ids = self.user_ids[config.moderators:]
+        return len(self.user_ids)
+
+    def _generate_products(self) -> int:
+        config = self.config
+        n_sellers = max(1, int(len(self.customer_ids) * config.seller_ratio))
+        sellers = self.customer_ids[:n_sellers]
+        seller_weights = _zipf_cum_weights(n_sellers, config.seller_skew, self.rng)
+        status_weights = [config.approved_ratio, (1 - config.approved_ratio) / 2, (1 - config.approved_ratio) / 2]
+        statuses = [ProductStatus.APPROVED, ProductStatus.PENDING, ProductStatus.REJECTED]
+        self.product_sellers = array("q")
+        self.product_prices = array("q")
+        self.approved = array("q") # Vị trí (index) các sản phẩm đã duyệt, dùng cho giỏ hàng / đơn hàng
+
+        def products():
+            mu = math.log(config.price_median)
+            for i in range(config.products):
+                seller_id = sellers[bisect.bisect_left(seller_weights, self.rng.random() * seller_weights[-1])]
+                price = max(1000, round(self.rng.lognormvariate(mu, config.price_sigma), -3))
+                status = self.rng.choices(statuses, status_weights)[0]
+                self.product_sellers.append(seller_id)
+                self.product_prices.append(int(price))
+                if status == ProductStatus.APPROVED:
+                    self.approved.append(i)
+                yield {
+                    "SellerID": seller_id, "CategoryID": self.rng.choice(self.category_ids),
+                    "Title": f"{self.rng.choice(TITLE_WORDS)} {self.rng.choice(TITLE_ADJECTIVES)} #{i}",
+                    "Description": None, "Price": price, "Quantity": self.rng.randint(1, 20),
+                    "ViewCount": int(self.rng.paretovariate(1.5)) - 1, "VideoUrl": "", "Status": status,
+                    "IsDeleted": False, "CreatedAt": self._past()
+                }
+
+        self.product_ids = self._insert_returning(Product, products(), Product.ProductID)
+        # Độ phổ biến chỉ tính trên sản phẩm đã duyệt (chỉ chúng được mua / thêm vào giỏ)
+        self.popularity = _zipf_cum_weights(len(self.approved), config.popularity_skew, self.rng) if self.approved else []
+        return len(self.product_ids)
+
+    def _popular_product(self) -> int:
+        """Vị trí (index) của 1 sản phẩm đã duyệt, chọn theo phân phối Zipf."""
+        return self.approved[bisect.bisect_left(self.popularity, self.rng.random() * self.popularity[-1])]
+
+    def _generate_images(self) -> int:
+        return self._insert(ProductImage, (
+            {"ProductID": product_id, "ImageUrl": self.rng.choice(SAMPLE_IMAGES), "IsDefault": position == 0, "IsDeleted": False}
+            for product_id in self.product_ids
+            for position in range(self.rng.randint(1, self.config.images_per_product))
+        ))
+
+    def _generate_cart_items(self) -> int:
+        if not self.approved:
+            return 0
+
+        def items():
+            for cart_id in self.cart_ids:
+                if self.rng.random() >= self.config.cart_ratio:
+                    continue
+                chosen = {self._popular_product() for _ in range(_geometric(self.rng, self.config.cart_items_mean))}
+                for index in chosen:
+                    yield {
+                        "CartID": cart_id, "ProductID": self.product_ids[index],
+                        "Quantity": self.rng.randint(1, 3), "AddedDate": self._past(30)
+                    }
+
+        return self._insert(ShoppingCartItem, items())
+
+    def _generate_contacts(self) -> int:
+        self.contact_ids = self._insert_returning(ContactInfo, (
+            {
+                "UserID": user_id, "RecipientName": f"Synthetic User {i}", "PhoneNumber": f"09{i:08d}"[-10:],
+                "StreetAddress": f"{self.rng.randint(1, 999)} Đường Số {self.rng.randint(1, 50)}",
+                "City": self.rng.choice(["Hà Nội", "TP. Hồ Chí Minh", "Đà Nẵng", "Cần Thơ", "Hải Phòng"]),
+                "IsDeleted": False
+            }
+            for i, user_id in enumerate(self.user_ids)
+        ), ContactInfo.ContactID)
+        return len(self.contact_ids)
+
+    def _generate_orders(self) -> int:
+        if not self.approved or not self.customer_ids:
+            return 0
+        config = self.config
+        statuses = list(config.order_status_weights)
+        status_weights = list(config.order_status_weights.values())
+        offset = config.moderators # contact_ids/user_ids cùng thứ tự: khách hàng thứ k có contact ở vị trí offset + k
+        pending_lines: List[List[dict]] = [] # Dòng OrderDetail của các đơn trong lô hiện tại (chờ OrderID)
+
+        def orders():
+            for _ in range(config.orders):
+                k = self.rng.randrange(len(self.customer_ids))
+                chosen = {self._popular_product() for _ in range(_geometric(self.rng, config.items_per_order_mean))}
+                lines = [
+                    {"ProductID": self.product_ids[i], "SellerID": self.product_sellers[i],
+                     "Price": self.product_prices[i], "Quantity": self.rng.randint(1, 2)}
+                    for i in chosen
+                ]
+                pending_lines.append(lines)
+                yield {
+                    "BuyerID": self.customer_ids[k], "ContactID": self.contact_ids[offset + k],
+                    "PaymentMethodID": self.rng.choice(self.payment_method_ids), "OrderDate": self._past(),
+                    "TotalAmount": sum(line["Price"] * line["Quantity"] for line in lines),
+                    "ShippingFee": 0, "OrderStatus": self.rng.choices(statuses, status_weights)[0], "IsDeleted": False
+                }
+
+        count = 0
+        for batch in self._batches(orders()):
+            order_ids = insert_returning_ids(self.db, Order.OrderID, batch)
+            details = [dict(line, OrderID=order_id) for order_id, lines in zip(order_ids, pending_lines) for line in lines]
+            pending_lines.clear()
+            for start in range(0, len(details), config.batch_size):
+                self.db.execute(insert(OrderDetail), details[start:start + config.batch_size])
+            self.db.commit()
+            count += len(order_ids)
+        return count
+
+def generate(db: Session, config: GeneratorConfig, log: Callable[[str], None] = print) -> None:
+    """Sinh dữ liệu giả lập rồi dựng lại bảng tổng hợp doanh số (đơn hàng được chèn thẳng, không qua hàng đợi)."""
+    from app.services.sales_rollup import rebuild_rollups
+    SyntheticDataGenerator(db, config, log).run()
+    started = time.perf_counter()
+    result = rebuild_rollups(db)
+    log(f"✅ Dựng lại bảng tổng hợp doanh số: {result} ({time.perf_counter() - started:.1f}s)")
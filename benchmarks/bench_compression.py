@@ -0,0 +1,112 @@
+# bench_compression.py - Đo đánh đổi CPU / số byte khi nén JSON danh sách sản phẩm (chọn COMPRESSION_LEVELS)
+# Tự tạo database SQLite tạm bằng bộ sinh dữ liệu giả lập, lấy các trang /api/v1/products/ thật (không nén)
+# rồi nén lại bằng từng encoding/level:
+#   python benchmarks/bench_compression.py --page-size 100 --bandwidth-mbps 20
+# Cột "tổng @N Mbps" = thời gian nén + thời gian truyền ở băng thông N Mbps: chọn level có tổng nhỏ nhất
+# cho băng thông thực tế của edge (băng thông càng thấp thì level cao càng đáng).
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+LEVEL_GRID = {
+    "gzip": [1, 4, 5, 6, 9],
+    "br": [1, 3, 4, 5, 6, 8, 11],
+    "zstd": [1, 3, 6, 9, 12, 19],
+}
+
+def _add_variants(db) -> None:
+    """Giả lập ảnh đã có bản thu nhỏ (như sau user-042): payload giống production hơn."""
+    from sqlalchemy import update
+    from app.core.config import settings
+    from app.models.sqlmodels import ProductImage
+    variants = [
+        {"Width": width, "Format": fmt, "Url": f"/static/images/products/sha256/ab/cd/{'0' * 64}_{width}.{fmt}", "Bytes": width * 40}
+        for width in settings.IMAGE_VARIANT_WIDTHS for fmt in settings.IMAGE_VARIANT_FORMATS
+    ]
+    db.execute(update(ProductImage).values(Variants=variants))
+    db.commit()
+
+def load_pages(products: int, page_size: int, pages: int, with_variants: bool):
+    from fastapi.testclient import TestClient
+    from app.core.migrations import upgrade_database
+    from app.core.database import SessionLocal
+    from app.initial_data import init_db
+    from app.main import app
+    from app.synthetic_data import GeneratorConfig, generate
+
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        init_db(db)
+        generate(db, GeneratorConfig(users=max(100, products // 10), products=products, orders=products // 10), log=lambda _: None)
+        if with_variants:
+            _add_variants(db)
+    finally:
+        db.close()
+    client = TestClient(app)
+    payloads = []
+    for page in range(pages):
+        response = client.get(
+            "/api/v1/products/", params={"skip": page * page_size, "limit": page_size},
+            headers={"Accept-Encoding": "identity"}
+        )
+        response.raise_for_status()
+        payloads.append(response.content)
+    # Kiểm tra middleware thật: client gửi Accept-Encoding thông thường của trình duyệt
+    response = client.get("/api/v1/products/", params={"limit": page_size}, headers={"Accept-Encoding": "gzip, deflate, br, zstd"})
+    print(f"Middleware: Content-Encoding={response.headers.get('content-encoding')}, Vary={response.headers.get('vary')}")
+    return payloads
+
+def run(payloads, repeat: int, bandwidth_mbps: float) -> None:
+    from app.core.compression import codec_available, compress_bytes
+    raw = sum(len(p) for p in payloads) / len(payloads)
+    bytes_per_ms = bandwidth_mbps * 1000 / 8
+    print(f"{len(payloads)} trang, trung bình {raw / 1024:.1f} KB JSON mỗi trang, băng thông {bandwidth_mbps:g} Mbps\n")
+    print(f"{'encoding':<9}{'level':>6}{'KB':>9}{'tỉ lệ':>8}{'nén ms':>9}{'MB/s':>8}{'tổng @' + format(bandwidth_mbps, 'g') + ' Mbps':>18}")
+    print(f"{'identity':<9}{'-':>6}{raw / 1024:>9.1f}{1:>8.2f}{0:>9.2f}{'-':>8}{raw / bytes_per_ms:>15.1f} ms")
+    for encoding, levels in LEVEL_GRID.items():
+        if not codec_available(encoding):
+            print(f"{encoding:<9}  (chưa cài thư viện, bỏ qua)")
+            continue
+        for level in levels:
+            sizes, elapsed = 0, 0.0
+            for payload in payloads:
+                best = float("inf")
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    compressed = compress_bytes(encoding, level, payload)
+                    best = min(best, time.perf_counter() - started)
+                elapsed += best
+                sizes += len(compressed)
+            size = sizes / len(payloads)
+            ms = elapsed * 1000 / len(payloads)
+            print(
+                f"{encoding:<9}{level:>6}{size / 1024:>9.1f}{raw / size:>8.2f}{ms:>9.2f}"
+                f"{raw / 1e6 / (ms / 1000):>8.0f}{ms + size / bytes_per_ms:>15.1f} ms"
+            )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark nén JSON danh sách sản phẩm: CPU so với số byte")
+    parser.add_argument("--products", type=int, default=5000, help="Số sản phẩm giả lập")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10, help="Lấy thời gian nhỏ nhất trong N lần nén")
+    parser.add_argument("--bandwidth-mbps", type=float, default=20.0)
+    parser.add_argument("--no-variants", action="store_true", help="Không giả lập ProductImage.Variants")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_compression_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["JOB_WORKER_ENABLED"] = "false"
+    os.environ["QUERY_STATS_ENABLED"] = "false"
+    os.chdir(Path(__file__).resolve().parents[1]) # Đường dẫn static/templates của app là tương đối
+    payloads = load_pages(args.products, args.page_size, args.pages, not args.no_variants)
+    run(payloads, args.repeat, args.bandwidth_mbps)
+
+if __name__ == "__main__":
+    main()
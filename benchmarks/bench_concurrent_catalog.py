@@ -0,0 +1,53 @@
+# bench_concurrent_catalog.py - Bắn nhiều request đồng thời vào API danh mục/sản phẩm của server đang chạy
+# So sánh chế độ sync (mặc định) và ASYNC_DB_ENABLED=true:
+#   ASYNC_DB_ENABLED=true uvicorn app.main:app --port 8000
+#   python benchmarks/bench_concurrent_catalog.py --url http://127.0.0.1:8000 --concurrency 1000
+import argparse
+import asyncio
+import time
+import httpx
+
+PATHS = ["/api/v1/products/", "/api/v1/categories/", "/api/v1/products/1"]
+
+async def _worker(client: httpx.AsyncClient, queue: asyncio.Queue, latencies: list, errors: list) -> None:
+    while True:
+        try:
+            path = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - started)
+
+async def run(url: str, concurrency: int, total: int) -> None:
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(PATHS[i % len(PATHS)])
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_worker(client, queue, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(
+        f"{total} request, {concurrency} kết nối đồng thời: {total / elapsed:.0f} req/s, "
+        f"p50 {p(0.5):.0f} ms, p99 {p(0.99):.0f} ms, lỗi {len(errors)}"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark API danh mục/sản phẩm với nhiều kết nối đồng thời")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench_sqlite_concurrency.py - Đo thông lượng đọc/ghi đồng thời trên SQLite
+# So sánh engine mặc định (rollback journal) với engine của app (WAL + PRAGMA trong core.database)
+# Chạy: python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 2 --seconds 5
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.core.database import create_db_engine
+
+SEED_ROWS = 10000
+
+def _seed(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE Item (ItemID INTEGER PRIMARY KEY, CategoryID INTEGER, Price NUMERIC, ViewCount INTEGER)"
+        ))
+        conn.execute(text("CREATE INDEX IX_Item_CategoryID ON Item (CategoryID)"))
+        conn.execute(
+            text("INSERT INTO Item (CategoryID, Price, ViewCount) VALUES (:c, :p, 0)"),
+            [{"c": i % 20, "p": i % 500} for i in range(SEED_ROWS)]
+        )
+
+def _reader(engine, stop: threading.Event, counters: dict, index: int) -> None:
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(
+                    text("SELECT ItemID, Price FROM Item WHERE CategoryID = :c ORDER BY ItemID DESC LIMIT 20"),
+                    {"c": index % 20}
+                ).all()
+            counters["reads"] += 1
+        except OperationalError:
+            counters["errors"] += 1
+
+def _writer(engine, stop: threading.Event, counters: dict, index: int) -> None:
+    i = index
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE Item SET ViewCount = ViewCount + 1 WHERE ItemID = :id"), {"id": i % SEED_ROWS + 1})
+                conn.execute(text("INSERT INTO Item (CategoryID, Price, ViewCount) VALUES (:c, 1, 0)"), {"c": i % 20})
+            counters["writes"] += 1
+        except OperationalError:
+            counters["errors"] += 1
+        i += 7
+
+def run(name: str, engine, readers: int, writers: int, seconds: float) -> None:
+    _seed(engine)
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    stop = threading.Event()
+    threads = [threading.Thread(target=_reader, args=(engine, stop, counters, i)) for i in range(readers)]
+    threads += [threading.Thread(target=_writer, args=(engine, stop, counters, i)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    print(
+        f"{name:<10} đọc/s: {counters['reads'] / seconds:>9.0f}   ghi/s: {counters['writes'] / seconds:>7.0f}"
+        f"   lỗi 'database is locked': {counters['errors']}"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark đọc/ghi đồng thời SQLite (trước/sau khi bật WAL)")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = create_engine(f"sqlite:///{tmp}/before.db", connect_args={"check_same_thread": False})
+        run("Trước", before, args.readers, args.writers, args.seconds)
+        after = create_db_engine(f"sqlite:///{tmp}/after.db")
+        run("Sau", after, args.readers, args.writers, args.seconds)
+
+if __name__ == "__main__":
+    main()
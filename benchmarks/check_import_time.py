@@ -0,0 +1,104 @@
+# check_import_time.py - Kiểm tra thời gian import app.main (khởi động worker uvicorn / restart nhanh)
+# Thời gian tuyệt đối dao động theo tải của máy (CI) nên KHÔNG so với số ms cố định: mỗi lần đo chạy
+# liền nhau 2 process mới `python -X importtime`, một import các framework app dùng (BASELINE_MODULES:
+# FastAPI, SQLAlchemy, Jinja2, pydantic) và một import app.main; ngân sách là tỉ lệ app.main / baseline
+# (lấy tỉ lệ nhỏ nhất trong N lần: lần bị máy làm chậm đột ngột không tính). Phần vượt baseline là code
+# của app và thư viện app tự import thêm.
+# Đồng thời kiểm tra các module nặng chỉ dùng cho vài tính năng (PayPal, bcrypt, JWT, Alembic, xử lý
+# ảnh...) KHÔNG bị import lúc khởi động (không phụ thuộc thời gian, luôn ổn định).
+# Vượt ngân sách -> in các module tốn thời gian nhất và thoát với mã 1.
+# Chạy: python benchmarks/check_import_time.py [--max-ratio 1.8] [--runs 5] [--top 15]
+# Cùng phép đo chạy trong pytest: tests/test_import_time.py
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module chỉ được import khi dùng lần đầu (xem import trong hàm ở các module tương ứng)
+LAZY_MODULES = {
+    "alembic": "app.core.migrations (chỉ khi chạy migration)",
+    "requests": "api.endpoints.orders (thanh toán PayPal)",
+    "passlib": "core.security.get_pwd_context (hash mật khẩu)",
+    "bcrypt": "core.security.get_pwd_context (hash mật khẩu)",
+    "jose": "core.security / api.deps (JWT)",
+    "PIL": "services.image_variants (tạo ảnh thu nhỏ)",
+    "pyarrow": "services.analytics_snapshot (snapshot Parquet)",
+    "brotli": "core.compression (nén response)",
+    "zstandard": "core.compression (nén response)",
+    "uvicorn": "app.main (chỉ khi chạy trực tiếp)",
+}
+
+# Framework mà app.main nào cũng phải import: thời gian của chúng là mốc so sánh
+BASELINE_MODULES = ("fastapi", "fastapi.templating", "starlette.staticfiles", "sqlalchemy", "sqlalchemy.orm", "jinja2", "pydantic", "pydantic_settings")
+_BASELINE_NAME = "_import_time_baseline"
+MAX_RATIO = 1.8
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def measure(module: str, extra_path: str = "") -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """(tổng µs của `module`, {module: (µs riêng, µs gộp)}) của 1 lần import trong process mới."""
+    env = dict(os.environ, JOB_WORKER_ENABLED="0")
+    if extra_path:
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [extra_path, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"❌ import {module} lỗi:\n{result.stderr[-2000:]}")
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules[module][1], modules
+
+def measure_ratio(runs: int) -> Tuple[float, int, int, Dict[str, Tuple[int, int]]]:
+    """(tỉ lệ app.main / baseline, µs app.main, µs baseline, module của app.main) của lần có tỉ lệ nhỏ nhất."""
+    with tempfile.TemporaryDirectory() as baseline_dir:
+        with open(os.path.join(baseline_dir, f"{_BASELINE_NAME}.py"), "w") as handle:
+            handle.write("".join(f"import {name}\n" for name in BASELINE_MODULES))
+        results = []
+        for _ in range(runs):
+            # Đo liền nhau: 2 lần đo chịu cùng mức tải của máy
+            baseline_us, _ = measure(_BASELINE_NAME, baseline_dir)
+            total_us, modules = measure("app.main")
+            results.append((total_us / baseline_us, total_us, baseline_us, modules))
+    return min(results, key=lambda run: run[0])
+
+def eager_lazy_modules(modules: Dict[str, Tuple[int, int]]) -> List[str]:
+    """Các module trong LAZY_MODULES đã bị import lúc khởi động."""
+    return sorted(name for name in LAZY_MODULES if name in modules)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ngân sách thời gian import app.main (so với framework)")
+    parser.add_argument("--max-ratio", type=float, default=MAX_RATIO, help="Tối đa thời gian import app.main / baseline")
+    parser.add_argument("--runs", type=int, default=5, help="Lấy tỉ lệ nhỏ nhất trong N lần")
+    parser.add_argument("--top", type=int, default=15, help="Số module tốn thời gian nhất in ra khi vượt ngân sách")
+    args = parser.parse_args()
+
+    ratio, total_us, baseline_us, modules = measure_ratio(args.runs)
+    failed = False
+
+    eager = eager_lazy_modules(modules)
+    for name in eager:
+        print(f"❌ {name} bị import lúc khởi động ({modules[name][1] / 1000:.1f} ms), chỉ nên import trong {LAZY_MODULES[name]}")
+        failed = True
+
+    summary = f"import app.main mất {total_us / 1000:.0f} ms = {ratio:.2f}x framework ({baseline_us / 1000:.0f} ms)"
+    if ratio > args.max_ratio:
+        print(f"❌ {summary}, ngân sách {args.max_ratio:.2f}x. Module tốn thời gian nhất (riêng):")
+        for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+            print(f"   {self_us / 1000:>8.1f} ms  (gộp {cumulative_us / 1000:>7.1f} ms)  {name}")
+        failed = True
+    else:
+        print(f"✅ {summary}, ngân sách {args.max_ratio:.2f}x (tỉ lệ nhỏ nhất trong {args.runs} lần)")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
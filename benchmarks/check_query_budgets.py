@@ -0,0 +1,334 @@
+# check_query_budgets.py - Kiểm tra ngân sách số câu SQL cho từng API (chống N+1 query)
+# Tạo database SQLite tạm với dữ liệu cỡ thực tế, gọi lần lượt các route và so số câu SQL
+# với ngân sách trong BUDGETS. Vượt ngân sách -> in các câu SQL của route đó và thoát với mã 1.
+# Chạy: python benchmarks/check_query_budgets.py [--async] [--products 2000] [-v]
+#   hoặc: python -m pytest tests/test_query_budgets.py (mỗi route 1 test)
+# (Dùng được trong CI; số câu SQL của 1 route không được tăng theo số dòng dữ liệu.)
+# Ảnh tải lên ghi vào thư mục tạm, PayPal được thay bằng kết quả giả: không ghi vào static/, không gọi mạng.
+import argparse
+import io
+import os
+import sys
+import tempfile
+import uuid
+import zipfile
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+_TMP_DIR = tempfile.mkdtemp(prefix="oldshop-budget-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'budget.db')}"
+os.environ.pop("DATABASE_REPLICA_URL", None) # Đo trên 1 database duy nhất
+os.environ["JOB_WORKER_ENABLED"] = "0"
+# Script tự đo qua _CaptureStatements, không dùng QueryStatsMiddleware của app
+os.environ["QUERY_STATS_ENABLED"] = "0"
+os.environ["SLOW_QUERY_MS"] = "1e9"
+os.environ["UPLOAD_TMP_DIR"] = os.path.join(_TMP_DIR, "uploads")
+os.environ["MIGRATE_ON_STARTUP"] = "0" # initialize_database() đã migrate
+if "--async" in sys.argv:
+    os.environ["ASYNC_DB_ENABLED"] = "1"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+os.chdir(ROOT) # StaticFiles/Jinja2Templates dùng đường dẫn tương đối
+
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.constants import ProductStatus, RoleID
+from app.core.database import SessionLocal, engine
+from app.core.query_stats import RequestQueryStats, end_request_stats, install_query_instrumentation, start_request_stats
+from app.core.security import create_random_key, get_password_hash
+from app.models.sqlmodels import (
+    ContactInfo, Order, OrderDetail, Product, ProductImage, ShoppingCart, ShoppingCartItem, User, UserRole
+)
+from app.main import app, initialize_database
+from app.services import image_store
+from app.services.ranking_service import product_ranking
+
+PASSWORD = "budget-pass"
+ADMIN_LOGIN = ("admin@oldshop.com", "adminpass") # Tạo bởi initial_data
+API = settings.API_V1_STR
+
+class _CaptureStatements:
+    """ASGI wrapper: ghi lại toàn bộ câu SQL của request vừa xử lý."""
+
+    def __init__(self, app):
+        self.app = app
+        self.last: Optional[RequestQueryStats] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats, token = start_request_stats(capture_statements=True)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request_stats(token)
+            self.last = stats
+
+# --- Dữ liệu mẫu ---
+def _user(db, username: str, role_id: int, password: Optional[str] = None) -> User:
+    # Chỉ tài khoản dùng để đăng nhập mới cần hash bcrypt (chậm), còn lại dùng hash giả
+    key = create_random_key()
+    user = User(
+        Username=username, Email=f"{username}@example.com", FullName=username.title(),
+        PasswordHash=get_password_hash(password, key) if password else "x", RandomKey=key
+    )
+    db.add(user)
+    db.flush()
+    db.add(UserRole(UserID=user.UserID, RoleID=role_id))
+    db.add(ShoppingCart(UserID=user.UserID))
+    return user
+
+def seed(db, n_products: int, n_customers: int, n_orders: int, cart_items: int) -> Dict[str, int]:
+    buyer = _user(db, "budget_buyer", RoleID.CUSTOMER, PASSWORD)
+    seller = _user(db, "budget_seller", RoleID.CUSTOMER, PASSWORD)
+    moderator = _user(db, "budget_mod", RoleID.MODERATOR, PASSWORD)
+    customers = [_user(db, f"customer{i}", RoleID.CUSTOMER) for i in range(n_customers)]
+    for i in range(20):
+        _user(db, f"moderator{i}", RoleID.MODERATOR)
+    sellers = [seller.UserID] + [c.UserID for c in customers[:50]]
+
+    now = datetime.utcnow()
+    products = []
+    for i in range(n_products):
+        products.append(Product(
+            SellerID=sellers[i % len(sellers)], CategoryID=1 + i % 5, Title=f"Sản phẩm {i}",
+            Price=10000 + i, Quantity=1000, VideoUrl="",
+            Status=ProductStatus.APPROVED if i % 4 else ProductStatus.PENDING,
+            ViewCount=i % 97, CreatedAt=now - timedelta(hours=i)
+        ))
+    db.add_all(products)
+    db.flush()
+    db.add_all(
+        ProductImage(ProductID=p.ProductID, ImageUrl=f"/static/img/{p.ProductID}_{k}.jpg", IsDefault=(k == 0))
+        for p in products for k in range(3)
+    )
+    approved = [p for p in products if p.Status == ProductStatus.APPROVED]
+
+    cart = db.query(ShoppingCart).filter(ShoppingCart.UserID == buyer.UserID).one()
+    db.add_all(ShoppingCartItem(CartID=cart.CartID, ProductID=p.ProductID, Quantity=1) for p in approved[:cart_items])
+
+    contact = ContactInfo(UserID=buyer.UserID, RecipientName="Budget", PhoneNumber="0900000000", StreetAddress="1 Đường A")
+    db.add(contact)
+    db.flush()
+    for i in range(n_orders):
+        order = Order(
+            BuyerID=buyer.UserID, ContactID=contact.ContactID, PaymentMethodID=1,
+            OrderDate=now - timedelta(hours=i), TotalAmount=0, OrderStatus=i % 4
+        )
+        db.add(order)
+        db.flush()
+        lines = [approved[(i * 3 + k) % len(approved)] for k in range(3)]
+        db.add_all(
+            OrderDetail(OrderID=order.OrderID, ProductID=p.ProductID, SellerID=seller.UserID if k == 0 else p.SellerID, Price=p.Price, Quantity=1)
+            for k, p in enumerate(lines)
+        )
+        order.TotalAmount = sum(p.Price for p in lines)
+    db.commit()
+    return {
+        "buyer_id": buyer.UserID, "seller_id": seller.UserID, "moderator_id": moderator.UserID,
+        "customer_id": customers[0].UserID, "product_id": approved[0].ProductID,
+        "cart_product_id": approved[0].ProductID, "new_cart_product_id": approved[cart_items].ProductID,
+        "order_id": 1,
+    }
+
+# --- Ngân sách từng route ---
+@dataclass
+class RouteCheck:
+    name: str
+    method: str
+    path: str
+    budget: int
+    auth: Optional[str] = None # "buyer" | "seller" | "moderator" | "admin"
+    kwargs: Optional[Callable[[Dict[str, int]], dict]] = None
+    expect: int = 200
+    # Route async (--async) dùng selectinload: mỗi quan hệ 1 câu SQL riêng nên ngân sách khác bản sync
+    async_budget: Optional[int] = None
+
+_CONTACT = {"RecipientName": "Budget", "PhoneNumber": "0900000000", "StreetAddress": "1 Đường A"}
+
+BUDGETS: List[RouteCheck] = [
+    # Auth
+    RouteCheck("register", "POST", "/auth/register", 5, async_budget=7, expect=201,
+               kwargs=lambda ids: {"json": {"Email": f"{uuid.uuid4().hex[:8]}@example.com", "FullName": "New", "Username": uuid.uuid4().hex[:10], "Password": PASSWORD}}),
+    RouteCheck("login", "POST", "/auth/token", 1, async_budget=3,
+               kwargs=lambda ids: {"data": {"username": "budget_buyer@example.com", "password": PASSWORD}}),
+    # Sản phẩm
+    RouteCheck("products.list", "GET", "/products/?limit=100", 1, async_budget=2),
+    RouteCheck("products.bestsellers", "GET", "/products/bestsellers?limit=10", 0),
+    RouteCheck("products.detail", "GET", "/products/{product_id}", 1, async_budget=2),
+    RouteCheck("products.moderator_all", "GET", "/products/moderator/all?limit=100", 1),
+    RouteCheck("products.create", "POST", "/products/", 5, auth="seller", expect=201,
+               kwargs=lambda ids: {"json": {"Title": "Mới", "Price": 1000, "Quantity": 5, "CategoryID": 1, "VideoUrl": ""}}),
+    RouteCheck("products.update", "PUT", "/products/{product_id}", 5, auth="moderator",
+               kwargs=lambda ids: {"json": {"Quantity": 999}}),
+    RouteCheck("products.status", "PUT", "/products/status/{product_id}", 4,
+               kwargs=lambda ids: {"json": {"Status": 1}}),
+    # Tối đa 3 ảnh/sản phẩm: mỗi ảnh 1 INSERT + 1 refresh (product_image_crud.create_with_product_id)
+    RouteCheck("products.upload", "POST", "/products/upload", 13, auth="seller", expect=201,
+               kwargs=lambda ids: {
+                   "data": {"title": "Có ảnh", "price": "1000", "quantity": "5", "category_id": "1", "video_url": "https://example.com/v"},
+                   "files": [("files", (f"{k}.png", _png(k), "image/png")) for k in range(3)],
+               }),
+    # 20 dòng: INSERT nhiều dòng 1 lần, không tăng theo số dòng
+    RouteCheck("products.import", "POST", "/products/import", 5, auth="seller",
+               kwargs=lambda ids: {"files": {"file": ("import.csv", _IMPORT_CSV, "text/csv"), "images": ("images.zip", _import_zip(), "application/zip")}}),
+    # Danh mục
+    RouteCheck("categories.list", "GET", "/categories/", 1),
+    RouteCheck("categories.detail", "GET", "/categories/1", 1),
+    # Người dùng (Admin/Moderator dashboard)
+    RouteCheck("users.moderators", "GET", "/users/moderator?limit=100", 2),
+    RouteCheck("users.moderator_detail", "GET", "/users/moderator/{moderator_id}", 1),
+    RouteCheck("users.customers", "GET", "/users/customer?limit=100", 2),
+    RouteCheck("users.customers_search", "GET", "/users/customer?limit=20&q=customer1", 2),
+    RouteCheck("users.customer_detail", "GET", "/users/customer/{customer_id}", 1),
+    RouteCheck("users.customer_update", "PUT", "/users/customer/{customer_id}", 3,
+               kwargs=lambda ids: {"json": {"FullName": "Đã sửa"}}),
+    # Giỏ hàng
+    RouteCheck("carts.get", "GET", "/carts/", 3, async_budget=7, auth="buyer"),
+    RouteCheck("carts.add", "POST", "/carts/add", 9, async_budget=15, auth="buyer",
+               kwargs=lambda ids: {"json": {"ProductID": ids["new_cart_product_id"], "Quantity": 1}}),
+    RouteCheck("carts.update", "PUT", "/carts/update", 8, async_budget=13, auth="buyer",
+               kwargs=lambda ids: {"json": {"ProductID": ids["cart_product_id"], "new_quantity": 2, "LastUpdated": datetime.utcnow().isoformat()}}),
+    RouteCheck("carts.remove", "DELETE", "/carts/remove/{new_cart_product_id}", 7, async_budget=13, auth="buyer"),
+    # Đơn hàng
+    RouteCheck("orders.me", "GET", "/orders/me?limit=20", 3, auth="buyer"),
+    RouteCheck("orders.sales", "GET", "/orders/sales?limit=20", 2, auth="seller"),
+    RouteCheck("orders.create", "POST", "/orders/", 10, auth="buyer",
+               kwargs=lambda ids: {"json": {"ContactInfo": _CONTACT, "PaymentMethodID": 1, "items": [{"ProductID": ids["product_id"], "Quantity": 1}]}}),
+    RouteCheck("orders.status", "PUT", "/orders/{order_id}/status", 5, auth="moderator",
+               kwargs=lambda ids: {"json": {"OrderStatus": 1}}),
+    RouteCheck("orders.paypal_create", "POST", "/orders/create-paypal-order", 3, auth="buyer"),
+    RouteCheck("orders.paypal_capture", "POST", "/orders/capture-paypal-order/BUDGET", 10, auth="buyer",
+               kwargs=lambda ids: {"json": {"ContactInfo": _CONTACT, "PaymentMethodID": 2, "items": [{"ProductID": ids["product_id"], "Quantity": 1}]}}),
+    # Thống kê Seller
+    RouteCheck("sellers.me_stats", "GET", "/sellers/me/stats", 3, auth="seller"),
+    RouteCheck("sellers.category_stats", "GET", "/sellers/stats/categories", 2, auth="moderator"),
+    RouteCheck("sellers.seller_stats", "GET", "/sellers/{seller_id}/stats", 3, auth="moderator"),
+    # Admin export: đọc theo lô EXPORT_BATCH_SIZE dòng (keyset), dữ liệu mẫu vừa 1 lô
+    RouteCheck("exports.users", "GET", "/admin/export/users.csv", 2, auth="admin"),
+    RouteCheck("exports.products", "GET", "/admin/export/products.ndjson", 4, auth="admin"),
+    RouteCheck("exports.orders", "GET", "/admin/export/orders.csv", 2, auth="admin"),
+    # Xóa đặt cuối để không ảnh hưởng các route khác
+    RouteCheck("carts.clear", "DELETE", "/carts/clear", 5, async_budget=10, auth="buyer"),
+    RouteCheck("products.delete", "DELETE", "/products/{product_id}", 4, auth="moderator", expect=204),
+]
+
+def _png(seed: int) -> bytes:
+    # Chỉ cần đúng chữ ký PNG (upload_storage.sniff_image_type); nội dung khác nhau -> hash khác nhau
+    return b"\x89PNG\r\n\x1a\n" + uuid.uuid4().bytes + bytes([seed]) * 64
+
+_IMPORT_CSV = "\n".join(
+    ["Title,Price,Quantity,CategoryID,Images"] + [f"Nhập {i},1000,5,1,{i}.png" for i in range(20)]
+).encode()
+
+def _import_zip() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(20):
+            archive.writestr(f"{i}.png", _png(i))
+    return buffer.getvalue()
+
+class _FakePayPalResponse:
+    status_code = 201
+    text = ""
+    def json(self):
+        return {"id": "BUDGET"}
+
+def _patch_image_store() -> None:
+    """Kho ảnh theo hash nằm trong thư mục tạm (IMAGE_STORE_DIR là hằng số của module, không phải setting)."""
+    image_store.IMAGE_STORE_DIR = Path(_TMP_DIR) / "images"
+
+def _patch_paypal() -> None:
+    """create-paypal-order gọi PayPal qua requests: trả về kết quả giả để chỉ đo phần truy vấn DB."""
+    from app.api.endpoints import orders
+    orders.get_paypal_access_token = lambda: "budget-token"
+    orders._http = lambda: SimpleNamespace(post=lambda *args, **kwargs: _FakePayPalResponse())
+
+class BudgetRun:
+    """Database mẫu + client đã đăng nhập; đo số câu SQL của từng RouteCheck theo thứ tự trong BUDGETS
+       (dùng chung cho main() và tests/test_query_budgets.py)."""
+
+    def __init__(self, use_async: bool = False, products: int = 2000, customers: int = 500, orders: int = 200, cart_items: int = 30):
+        self.use_async = use_async
+        initialize_database()
+        db = SessionLocal()
+        try:
+            self.ids = seed(db, products, customers, orders, cart_items)
+        finally:
+            db.close()
+
+        install_query_instrumentation(engine)
+        if use_async:
+            from app.core.database_async import get_async_engine
+            install_query_instrumentation(get_async_engine().sync_engine)
+        _patch_paypal()
+        _patch_image_store()
+        # Production: RankingRefresher nạp bảng xếp hạng ở nền, API chỉ đọc bộ nhớ
+        refresh_db = SessionLocal()
+        try:
+            product_ranking.refresh(refresh_db)
+        finally:
+            refresh_db.close()
+
+        self.capture = _CaptureStatements(app)
+        self.client = TestClient(self.capture, raise_server_exceptions=False)
+        self.headers: Dict[str, dict] = {}
+        logins = {who: (f"budget_{who}@example.com", PASSWORD) for who in ("buyer", "seller")}
+        logins.update(moderator=("budget_mod@example.com", PASSWORD), admin=ADMIN_LOGIN)
+        for who, (username, password) in logins.items():
+            res = self.client.post(f"{API}/auth/token", data={"username": username, "password": password})
+            self.headers[who] = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+    def measure(self, check: RouteCheck) -> Tuple[object, RequestQueryStats, int]:
+        """(response, câu SQL của request, ngân sách áp dụng)."""
+        kwargs = check.kwargs(self.ids) if check.kwargs else {}
+        if check.auth:
+            kwargs["headers"] = self.headers[check.auth]
+        res = self.client.request(check.method, API + check.path.format(**self.ids), **kwargs)
+        budget = check.async_budget if self.use_async and check.async_budget is not None else check.budget
+        return res, self.capture.last, budget
+
+def format_statements(statements: List[str]) -> str:
+    # Gộp các câu giống nhau: câu lặp lại nhiều lần chính là dấu hiệu của N+1
+    return "\n".join(
+        f"     {count:>4}x {statement[:300]}"
+        for statement, count in Counter(" ".join(s.split()) for s in statements).items()
+    )
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Kiểm tra ngân sách số câu SQL cho từng API")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Chạy với ASYNC_DB_ENABLED (route async)")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--cart-items", type=int, default=30)
+    parser.add_argument("-v", "--verbose", action="store_true", help="In câu SQL của mọi route")
+    args = parser.parse_args(argv)
+
+    run = BudgetRun(args.use_async, args.products, args.customers, args.orders, args.cart_items)
+    failures = []
+    for check in BUDGETS:
+        res, stats, budget = run.measure(check)
+        over = stats.count > budget
+        bad_status = res.status_code != check.expect
+        print(f"{'❌' if over or bad_status else '✅'} {check.name:<26} {stats.count:>3}/{budget:<3} queries  HTTP {res.status_code}")
+        if bad_status:
+            print(f"     Mong đợi HTTP {check.expect}: {res.text[:200]}")
+        if over or args.verbose:
+            print(format_statements(stats.statements))
+        if over or bad_status:
+            failures.append(check.name)
+
+    if failures:
+        print(f"❌ {len(failures)} route không đạt: {', '.join(failures)}")
+        return 1
+    print(f"✅ {len(BUDGETS)} route nằm trong ngân sách truy vấn")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -223,4 +223,96 @@ CREATE TABLE SystemLog (
     LogTime DATETIME NOT NULL DEFAULT GETDATE(),
     FOREIGN KEY (UserID) REFERENCES [User](UserID)
 );
-GO
\ No newline at end of file
+GO
+
+-- Index cho lịch sử mua hàng (Buyer) và lịch sử bán hàng (Seller)
+CREATE INDEX IX_Order_BuyerID_OrderDate ON [Order] (BuyerID, OrderDate);
+GO
+
+CREATE INDEX IX_OrderDetail_SellerID_OrderID ON OrderDetail (SellerID, OrderID);
+GO
+
+-- 17. BackgroundJob (Hàng đợi xử lý nền)
+CREATE TABLE BackgroundJob (
+    JobID INT PRIMARY KEY IDENTITY(1,1),
+    JobType VARCHAR(100) NOT NULL,      -- Handler name or 'event:<event name>'
+    Payload NVARCHAR(MAX) NOT NULL,     -- JSON
+    Status TINYINT NOT NULL DEFAULT 0,  -- 0: Pending, 1: Running, 2: Done, 3: Failed
+    Attempts INT NOT NULL DEFAULT 0,
+    MaxAttempts INT NOT NULL DEFAULT 5,
+    RunAfter DATETIME NOT NULL DEFAULT GETDATE(),
+    LockedAt DATETIME,
+    LastError NVARCHAR(MAX),
+    CreatedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    UpdatedAt DATETIME
+);
+GO
+
+CREATE INDEX IX_BackgroundJob_Status_RunAfter ON BackgroundJob (Status, RunAfter);
+GO
+
+-- 18. Bảng tổng hợp doanh số theo ngày (Seller / Product / Category)
+CREATE TABLE SellerDailySales (
+    SellerID INT NOT NULL,
+    SalesDate DATE NOT NULL,
+    OrderCount INT NOT NULL DEFAULT 0,
+    UnitsSold INT NOT NULL DEFAULT 0,
+    Revenue DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (SellerID, SalesDate),
+    FOREIGN KEY (SellerID) REFERENCES [User](UserID)
+);
+GO
+
+CREATE TABLE ProductDailySales (
+    ProductID INT NOT NULL,
+    SalesDate DATE NOT NULL,
+    SellerID INT NOT NULL,
+    OrderCount INT NOT NULL DEFAULT 0,
+    UnitsSold INT NOT NULL DEFAULT 0,
+    Revenue DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (ProductID, SalesDate),
+    FOREIGN KEY (ProductID) REFERENCES Product(ProductID),
+    FOREIGN KEY (SellerID) REFERENCES [User](UserID)
+);
+GO
+
+CREATE INDEX IX_ProductDailySales_SellerID_SalesDate ON ProductDailySales (SellerID, SalesDate);
+GO
+
+CREATE TABLE CategoryDailySales (
+    CategoryID INT NOT NULL,
+    SalesDate DATE NOT NULL,
+    OrderCount INT NOT NULL DEFAULT 0,
+    UnitsSold INT NOT NULL DEFAULT 0,
+    Revenue DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (CategoryID, SalesDate),
+    FOREIGN KEY (CategoryID) REFERENCES Category(CategoryID)
+);
+GO
+
+-- 19. Index cho các truy vấn nóng (migration 0003_hot_path_indexes)
+-- Filtered index: chỉ chứa các dòng chưa xóa mềm
+CREATE INDEX IX_Product_Status_CreatedAt ON Product (Status, CreatedAt) WHERE IsDeleted = 0;
+GO
+
+CREATE INDEX IX_ProductImage_ProductID ON ProductImage (ProductID);
+GO
+
+CREATE INDEX IX_OrderDetail_OrderID ON OrderDetail (OrderID);
+GO
+
+-- 20. Index danh sách người dùng theo vai trò (migration 0004_userrole_role_index)
+CREATE INDEX IX_UserRole_RoleID_UserID ON UserRole (RoleID, UserID);
+GO
+
+-- 21. Ảnh thu nhỏ / nhiều kích thước của ProductImage (migration 0005_product_image_variants)
+-- Danh sách JSON các bản WebP/AVIF đã tạo ở nền, NULL = chưa tạo
+ALTER TABLE ProductImage ADD Variants NVARCHAR(MAX) NULL;
+GO
+
+-- 22. Lưu ảnh theo hash nội dung, đếm tham chiếu theo ContentHash (migration 0006_product_image_content_hash)
+ALTER TABLE ProductImage ADD ContentHash VARCHAR(64) NULL;
+GO
+
+CREATE INDEX IX_ProductImage_ContentHash ON ProductImage (ContentHash);
+GO
@@ -0,0 +1,242 @@
+"""baseline: schema gốc của OldShop (tương ứng các bảng 1-16 trong init.sql)
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 16:12:43
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('Category',
+    sa.Column('CategoryID', sa.Integer(), nullable=False),
+    sa.Column('CategoryName', sa.String(length=100), nullable=False),
+    sa.Column('Description', sa.Text(), nullable=True),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.Column('CreatedAt', sa.DateTime(), nullable=False),
+    sa.Column('UpdatedAt', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('CategoryID'),
+    sa.UniqueConstraint('CategoryName')
+    )
+    op.create_index('ix_Category_CategoryID', 'Category', ['CategoryID'], unique=False)
+
+    op.create_table('PaymentMethod',
+    sa.Column('PaymentMethodID', sa.Integer(), nullable=False),
+    sa.Column('MethodName', sa.String(length=50), nullable=False),
+    sa.Column('IsOnline', sa.Boolean(), nullable=False),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('PaymentMethodID'),
+    sa.UniqueConstraint('MethodName')
+    )
+    op.create_index('ix_PaymentMethod_PaymentMethodID', 'PaymentMethod', ['PaymentMethodID'], unique=False)
+
+    op.create_table('Role',
+    sa.Column('RoleID', sa.Integer(), nullable=False),
+    sa.Column('RoleName', sa.String(length=50), nullable=False),
+    sa.Column('Description', sa.Text(), nullable=True),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.Column('CreatedAt', sa.DateTime(), nullable=False),
+    sa.Column('UpdatedAt', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('RoleID'),
+    sa.UniqueConstraint('RoleName')
+    )
+    op.create_index('ix_Role_RoleID', 'Role', ['RoleID'], unique=False)
+
+    op.create_table('User',
+    sa.Column('UserID', sa.Integer(), nullable=False),
+    sa.Column('Username', sa.String(length=50), nullable=False),
+    sa.Column('Email', sa.String(length=100), nullable=False),
+    sa.Column('PasswordHash', sa.String(length=64), nullable=False),
+    sa.Column('RandomKey', sa.String(length=32), nullable=False),
+    sa.Column('FullName', sa.String(length=100), nullable=False),
+    sa.Column('PhoneNumber', sa.String(length=15), nullable=True),
+    sa.Column('Address', sa.String(length=255), nullable=True),
+    sa.Column('IsActive', sa.Boolean(), nullable=False),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.Column('CreatedAt', sa.DateTime(), nullable=False),
+    sa.Column('UpdatedAt', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('UserID'),
+    sa.UniqueConstraint('Email'),
+    sa.UniqueConstraint('RandomKey'),
+    sa.UniqueConstraint('Username')
+    )
+    op.create_index('ix_User_UserID', 'User', ['UserID'], unique=False)
+
+    op.create_table('UserRole',
+    sa.Column('UserID', sa.Integer(), nullable=False),
+    sa.Column('RoleID', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['RoleID'], ['Role.RoleID'], ),
+    sa.ForeignKeyConstraint(['UserID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('UserID', 'RoleID')
+    )
+
+    op.create_table('ContactInfo',
+    sa.Column('ContactID', sa.Integer(), nullable=False),
+    sa.Column('UserID', sa.Integer(), nullable=True),
+    sa.Column('RecipientName', sa.String(length=100), nullable=False),
+    sa.Column('PhoneNumber', sa.String(length=15), nullable=False),
+    sa.Column('StreetAddress', sa.String(length=255), nullable=False),
+    sa.Column('City', sa.String(length=100), nullable=True),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['UserID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('ContactID')
+    )
+    op.create_index('ix_ContactInfo_ContactID', 'ContactInfo', ['ContactID'], unique=False)
+
+    op.create_table('Product',
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('SellerID', sa.Integer(), nullable=False),
+    sa.Column('CategoryID', sa.Integer(), nullable=False),
+    sa.Column('Title', sa.String(length=255), nullable=False),
+    sa.Column('Description', sa.Text(), nullable=True),
+    sa.Column('Price', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('Quantity', sa.Integer(), nullable=False),
+    sa.Column('ViewCount', sa.Integer(), nullable=False),
+    sa.Column('VideoUrl', sa.String(length=500), nullable=False),
+    sa.Column('Status', sa.SmallInteger(), nullable=False),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.Column('CreatedAt', sa.DateTime(), nullable=False),
+    sa.Column('UpdatedAt', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['CategoryID'], ['Category.CategoryID'], ),
+    sa.ForeignKeyConstraint(['SellerID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('ProductID')
+    )
+    op.create_index('ix_Product_ProductID', 'Product', ['ProductID'], unique=False)
+
+    op.create_table('ProductImage',
+    sa.Column('ImageID', sa.Integer(), nullable=False),
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('ImageUrl', sa.String(length=500), nullable=False),
+    sa.Column('IsDefault', sa.Boolean(), nullable=False),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['ProductID'], ['Product.ProductID'], ),
+    sa.PrimaryKeyConstraint('ImageID')
+    )
+    op.create_index('ix_ProductImage_ImageID', 'ProductImage', ['ImageID'], unique=False)
+
+    op.create_table('ShoppingCart',
+    sa.Column('CartID', sa.Integer(), nullable=False),
+    sa.Column('UserID', sa.Integer(), nullable=False),
+    sa.Column('LastUpdated', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['UserID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('CartID'),
+    sa.UniqueConstraint('UserID')
+    )
+    op.create_index('ix_ShoppingCart_CartID', 'ShoppingCart', ['CartID'], unique=False)
+
+    op.create_table('ShoppingCartItem',
+    sa.Column('ItemID', sa.Integer(), nullable=False),
+    sa.Column('CartID', sa.Integer(), nullable=False),
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('Quantity', sa.Integer(), nullable=False),
+    sa.Column('AddedDate', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['CartID'], ['ShoppingCart.CartID'], ),
+    sa.ForeignKeyConstraint(['ProductID'], ['Product.ProductID'], ),
+    sa.PrimaryKeyConstraint('ItemID'),
+    sa.UniqueConstraint('CartID', 'ProductID', name='uq_cart_product')
+    )
+    op.create_index('ix_ShoppingCartItem_ItemID', 'ShoppingCartItem', ['ItemID'], unique=False)
+
+    op.create_table('SystemLog',
+    sa.Column('LogID', sa.Integer(), nullable=False),
+    sa.Column('UserID', sa.Integer(), nullable=True),
+    sa.Column('ActionType', sa.String(length=50), nullable=False),
+    sa.Column('TableName', sa.String(length=50), nullable=True),
+    sa.Column('RecordID', sa.Integer(), nullable=True),
+    sa.Column('Description', sa.Text(), nullable=True),
+    sa.Column('LogTime', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['UserID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('LogID')
+    )
+    op.create_index('ix_SystemLog_LogID', 'SystemLog', ['LogID'], unique=False)
+
+    op.create_table('Order',
+    sa.Column('OrderID', sa.Integer(), nullable=False),
+    sa.Column('BuyerID', sa.Integer(), nullable=False),
+    sa.Column('ContactID', sa.Integer(), nullable=False),
+    sa.Column('PaymentMethodID', sa.Integer(), nullable=False),
+    sa.Column('OrderDate', sa.DateTime(), nullable=False),
+    sa.Column('TotalAmount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('ShippingFee', sa.Numeric(precision=18, scale=2), nullable=True),
+    sa.Column('OrderStatus', sa.SmallInteger(), nullable=False),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['BuyerID'], ['User.UserID'], ),
+    sa.ForeignKeyConstraint(['ContactID'], ['ContactInfo.ContactID'], ),
+    sa.ForeignKeyConstraint(['PaymentMethodID'], ['PaymentMethod.PaymentMethodID'], ),
+    sa.PrimaryKeyConstraint('OrderID')
+    )
+    op.create_index('ix_Order_OrderID', 'Order', ['OrderID'], unique=False)
+
+    op.create_table('OrderDetail',
+    sa.Column('OrderDetailID', sa.Integer(), nullable=False),
+    sa.Column('OrderID', sa.Integer(), nullable=False),
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('SellerID', sa.Integer(), nullable=False),
+    sa.Column('Price', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('Quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['OrderID'], ['Order.OrderID'], ),
+    sa.ForeignKeyConstraint(['ProductID'], ['Product.ProductID'], ),
+    sa.ForeignKeyConstraint(['SellerID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('OrderDetailID')
+    )
+    op.create_index('ix_OrderDetail_OrderDetailID', 'OrderDetail', ['OrderDetailID'], unique=False)
+
+    op.create_table('Transaction',
+    sa.Column('TransactionID', sa.Integer(), nullable=False),
+    sa.Column('OrderID', sa.Integer(), nullable=False),
+    sa.Column('PaymentMethodID', sa.Integer(), nullable=False),
+    sa.Column('TransactionCode', sa.String(length=100), nullable=True),
+    sa.Column('Amount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('TransactionStatus', sa.SmallInteger(), nullable=False),
+    sa.Column('TransactionDate', sa.DateTime(), nullable=False),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['OrderID'], ['Order.OrderID'], ),
+    sa.ForeignKeyConstraint(['PaymentMethodID'], ['PaymentMethod.PaymentMethodID'], ),
+    sa.PrimaryKeyConstraint('TransactionID'),
+    sa.UniqueConstraint('OrderID')
+    )
+    op.create_index('ix_Transaction_TransactionID', 'Transaction', ['TransactionID'], unique=False)
+
+    op.create_table('Review',
+    sa.Column('ReviewID', sa.Integer(), nullable=False),
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('BuyerID', sa.Integer(), nullable=False),
+    sa.Column('Rating', sa.SmallInteger(), nullable=False),
+    sa.Column('Comment', sa.String(length=500), nullable=True),
+    sa.Column('IsDeleted', sa.Boolean(), nullable=False),
+    sa.Column('CreatedAt', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['BuyerID'], ['User.UserID'], ),
+    sa.ForeignKeyConstraint(['ProductID'], ['Product.ProductID'], ),
+    sa.PrimaryKeyConstraint('ReviewID'),
+    sa.UniqueConstraint('ProductID', 'BuyerID', name='UQ_Review_BuyerProduct')
+    )
+    op.create_index('ix_Review_ReviewID', 'Review', ['ReviewID'], unique=False)
+
+    op.create_table('ProductReviewLog',
+    sa.Column('LogID', sa.Integer(), nullable=False),
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('ReviewerID', sa.Integer(), nullable=False),
+    sa.Column('ActionType', sa.SmallInteger(), nullable=False),
+    sa.Column('Notes', sa.String(length=500), nullable=True),
+    sa.Column('ActionDate', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['ProductID'], ['Product.ProductID'], ),
+    sa.ForeignKeyConstraint(['ReviewerID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('LogID')
+    )
+    op.create_index('ix_ProductReviewLog_LogID', 'ProductReviewLog', ['LogID'], unique=False)
+
+
+def downgrade() -> None:
+    for table in (
+        'ProductReviewLog', 'Review', 'Transaction', 'OrderDetail', 'Order', 'SystemLog',
+        'ShoppingCartItem', 'ShoppingCart', 'ProductImage', 'Product', 'ContactInfo',
+        'UserRole', 'User', 'Role', 'PaymentMethod', 'Category'
+    ):
+        op.drop_table(table)
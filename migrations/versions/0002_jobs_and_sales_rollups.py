@@ -0,0 +1,79 @@
+"""hàng đợi BackgroundJob, bảng tổng hợp doanh số theo ngày và index lịch sử đơn hàng
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 16:20:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lịch sử mua hàng / bán hàng (keyset pagination)
+    op.create_index('IX_Order_BuyerID_OrderDate', 'Order', ['BuyerID', 'OrderDate'], unique=False)
+    op.create_index('IX_OrderDetail_SellerID_OrderID', 'OrderDetail', ['SellerID', 'OrderID'], unique=False)
+
+    op.create_table('BackgroundJob',
+    sa.Column('JobID', sa.Integer(), nullable=False),
+    sa.Column('JobType', sa.String(length=100), nullable=False),
+    sa.Column('Payload', sa.Text(), nullable=False),
+    sa.Column('Status', sa.SmallInteger(), nullable=False),
+    sa.Column('Attempts', sa.Integer(), nullable=False),
+    sa.Column('MaxAttempts', sa.Integer(), nullable=False),
+    sa.Column('RunAfter', sa.DateTime(), nullable=False),
+    sa.Column('LockedAt', sa.DateTime(), nullable=True),
+    sa.Column('LastError', sa.Text(), nullable=True),
+    sa.Column('CreatedAt', sa.DateTime(), nullable=False),
+    sa.Column('UpdatedAt', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('JobID')
+    )
+    op.create_index('ix_BackgroundJob_JobID', 'BackgroundJob', ['JobID'], unique=False)
+    op.create_index('IX_BackgroundJob_Status_RunAfter', 'BackgroundJob', ['Status', 'RunAfter'], unique=False)
+
+    op.create_table('SellerDailySales',
+    sa.Column('SellerID', sa.Integer(), nullable=False),
+    sa.Column('SalesDate', sa.Date(), nullable=False),
+    sa.Column('OrderCount', sa.Integer(), nullable=False),
+    sa.Column('UnitsSold', sa.Integer(), nullable=False),
+    sa.Column('Revenue', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['SellerID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('SellerID', 'SalesDate')
+    )
+
+    op.create_table('ProductDailySales',
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('SalesDate', sa.Date(), nullable=False),
+    sa.Column('SellerID', sa.Integer(), nullable=False),
+    sa.Column('OrderCount', sa.Integer(), nullable=False),
+    sa.Column('UnitsSold', sa.Integer(), nullable=False),
+    sa.Column('Revenue', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['ProductID'], ['Product.ProductID'], ),
+    sa.ForeignKeyConstraint(['SellerID'], ['User.UserID'], ),
+    sa.PrimaryKeyConstraint('ProductID', 'SalesDate')
+    )
+    op.create_index('IX_ProductDailySales_SellerID_SalesDate', 'ProductDailySales', ['SellerID', 'SalesDate'], unique=False)
+
+    op.create_table('CategoryDailySales',
+    sa.Column('CategoryID', sa.Integer(), nullable=False),
+    sa.Column('SalesDate', sa.Date(), nullable=False),
+    sa.Column('OrderCount', sa.Integer(), nullable=False),
+    sa.Column('UnitsSold', sa.Integer(), nullable=False),
+    sa.Column('Revenue', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['CategoryID'], ['Category.CategoryID'], ),
+    sa.PrimaryKeyConstraint('CategoryID', 'SalesDate')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('CategoryDailySales')
+    op.drop_table('ProductDailySales')
+    op.drop_table('SellerDailySales')
+    op.drop_table('BackgroundJob')
+    op.drop_index('IX_OrderDetail_SellerID_OrderID', table_name='OrderDetail')
+    op.drop_index('IX_Order_BuyerID_OrderDate', table_name='Order')
@@ -0,0 +1,43 @@
+"""index cho các truy vấn nóng (danh sách sản phẩm, ảnh sản phẩm, chi tiết đơn hàng)
+
+Các index partial chỉ chứa dòng chưa xóa mềm (WHERE IsDeleted = 0), khớp với điều kiện
+`IsDeleted == False` mà các truy vấn luôn có. Những truy vấn nóng khác đã có index bao phủ:
+  ShoppingCartItem(CartID) -> uq_cart_product (CartID, ProductID)
+  Order(BuyerID)           -> IX_Order_BuyerID_OrderDate
+  OrderDetail(SellerID)    -> IX_OrderDetail_SellerID_OrderID
+  Review(ProductID)        -> UQ_Review_BuyerProduct (ProductID, BuyerID)
+Kiểm tra bằng EXPLAIN: python -m app.manage check-indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 16:30:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+NOT_DELETED = sa.text('IsDeleted = 0')
+
+
+def upgrade() -> None:
+    # Danh sách sản phẩm theo trạng thái (trang chủ, trang kiểm duyệt) và ứng viên thịnh hành
+    # (Status + CreatedAt trong cửa sổ thời gian): dùng chung 1 index
+    op.create_index(
+        'IX_Product_Status_CreatedAt', 'Product', ['Status', 'CreatedAt'], unique=False,
+        sqlite_where=NOT_DELETED, mssql_where=NOT_DELETED
+    )
+    # Tải ảnh theo danh sách sản phẩm (selectinload / joinedload)
+    op.create_index('IX_ProductImage_ProductID', 'ProductImage', ['ProductID'], unique=False)
+    # Tải chi tiết theo đơn hàng (lịch sử mua hàng, tổng hợp doanh số)
+    op.create_index('IX_OrderDetail_OrderID', 'OrderDetail', ['OrderID'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('IX_OrderDetail_OrderID', table_name='OrderDetail')
+    op.drop_index('IX_ProductImage_ProductID', table_name='ProductImage')
+    op.drop_index('IX_Product_Status_CreatedAt', table_name='Product')
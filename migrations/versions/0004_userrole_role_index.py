@@ -0,0 +1,25 @@
+"""index UserRole(RoleID, UserID) cho danh sách người dùng theo vai trò
+
+Khóa chính của UserRole là (UserID, RoleID) nên không dùng được khi lọc theo RoleID.
+Danh sách Moderator/Khách hàng lọc theo RoleID và phân trang keyset theo UserID:
+index (RoleID, UserID) trả về đúng thứ tự, không cần quét và sắp xếp lại.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 18:00:00
+"""
+from alembic import op
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('IX_UserRole_RoleID_UserID', 'UserRole', ['RoleID', 'UserID'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('IX_UserRole_RoleID_UserID', table_name='UserRole')
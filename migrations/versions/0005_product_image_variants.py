@@ -0,0 +1,27 @@
+"""cột ProductImage.Variants: ảnh thu nhỏ / nhiều kích thước (WebP, AVIF)
+
+Danh sách JSON các bản đã tạo ở nền cho mỗi ảnh gốc:
+  [{"Width": 320, "Format": "webp", "Url": "/static/images/products/variants/...", "Bytes": 18234}, ...]
+NULL = chưa tạo (job đang chờ), [] = không tạo được (ảnh ngoài hệ thống / file không còn).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 20:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('ProductImage', sa.Column('Variants', sa.JSON(none_as_null=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('ProductImage') as batch_op:
+        batch_op.drop_column('Variants')
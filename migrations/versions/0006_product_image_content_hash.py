@@ -0,0 +1,28 @@
+"""cột ProductImage.ContentHash: lưu ảnh theo hash nội dung (khử trùng lặp, URL bất biến)
+
+File ảnh nằm ở static/images/products/sha256/ab/cd/<sha256><đuôi>; số ProductImage chưa xóa
+có cùng ContentHash là số tham chiếu tới file. NULL = ảnh cũ lưu theo tên product_{id}_{index}.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 21:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('ProductImage', sa.Column('ContentHash', sa.String(length=64), nullable=True))
+    op.create_index('IX_ProductImage_ContentHash', 'ProductImage', ['ContentHash'])
+
+
+def downgrade() -> None:
+    op.drop_index('IX_ProductImage_ContentHash', table_name='ProductImage')
+    with op.batch_alter_table('ProductImage') as batch_op:
+        batch_op.drop_column('ContentHash')
@@ -0,0 +1,26 @@
+# Ngân sách thời gian import app.main và các module nặng phải import lười (xem benchmarks/check_import_time.py).
+# Đo 1 lần cho cả 2 test: mỗi lần đo chạy 2 process `python -X importtime` mới.
+# Chạy: python -m pytest tests/test_import_time.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import check_import_time as import_time # noqa: E402
+
+@pytest.fixture(scope="module")
+def measurement():
+    return import_time.measure_ratio(runs=3)
+
+def test_lazy_modules_not_imported_at_startup(measurement):
+    _, _, _, modules = measurement
+    eager = import_time.eager_lazy_modules(modules)
+    assert not eager, "Import lúc khởi động: " + ", ".join(f"{name} (chỉ nên import trong {import_time.LAZY_MODULES[name]})" for name in eager)
+
+def test_import_time_within_budget(measurement):
+    ratio, total_us, baseline_us, _ = measurement
+    assert ratio <= import_time.MAX_RATIO, (
+        f"import app.main mất {total_us / 1000:.0f} ms = {ratio:.2f}x framework ({baseline_us / 1000:.0f} ms), "
+        f"ngân sách {import_time.MAX_RATIO:.2f}x"
+    )
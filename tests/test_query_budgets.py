@@ -0,0 +1,23 @@
+# Ngân sách số câu SQL cho từng API (chống N+1 query), mỗi route 1 test.
+# Dùng chung dữ liệu mẫu và BUDGETS với benchmarks/check_query_budgets.py (database SQLite tạm,
+# ảnh ghi vào thư mục tạm, PayPal giả). Route chạy theo thứ tự trong BUDGETS: các route xóa nằm cuối.
+# Chạy: python -m pytest tests/test_query_budgets.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import check_query_budgets as budgets # noqa: E402 (đặt biến môi trường trước khi import app)
+
+@pytest.fixture(scope="module")
+def budget_run() -> budgets.BudgetRun:
+    return budgets.BudgetRun()
+
+@pytest.mark.parametrize("check", budgets.BUDGETS, ids=lambda check: check.name)
+def test_query_budget(budget_run: budgets.BudgetRun, check: budgets.RouteCheck):
+    res, stats, budget = budget_run.measure(check)
+    assert res.status_code == check.expect, f"Mong đợi HTTP {check.expect}: {res.text[:200]}"
+    assert stats.count <= budget, (
+        f"{check.name}: {stats.count} câu SQL (ngân sách {budget})\n{budgets.format_statements(stats.statements)}"
+    )